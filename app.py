@@ -1,29 +1,114 @@
 ################################################################################
 ### Loading the required modules
+import asyncio
+import hmac
 import json
+import os
 import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
+import click
+import httpx
 import requests
 import urllib.parse
-from flask import Flask, abort, jsonify, render_template, request, Response
+from flask import Flask, abort, jsonify, render_template, request, Response, stream_template
 from flask_caching import Cache
 from jinja2 import TemplateNotFound
 from werkzeug.routing import BaseConverter
 
-# from wikidataintegrator import wdi_core
-from wikibaseintegrator import wbi_helpers
-
 # Import BioStudies extractor
-from data.biostudies.search import BioStudiesExtractor
-from data.zenodo.search import ZenodoExtractor
-from data.mapping import normalize_all
+from data.biostudies.search import AsyncBioStudiesExtractor, BioStudiesExtractor
+from data.zenodo.search import AsyncZenodoExtractor, ZenodoExtractor
+from data.cloud.catalog import SERVICE_DOCS_URL, CatalogHolder, MethodsCatalog, ToolsCatalog
+from data.cloud.details import DetailStore
+from data.cloud.documents import DocumentStore
+from data.cloud.facets import iter_bits
+from data.cloud.snapshot import Snapshot, build_snapshot, diff_snapshots
+from data.cloud.webhook import CloudInvalidator, sign_payload, verify_signature
+from data.compounds.catalog import CompoundCatalog
+from data.compounds.queries import (
+    COMPOUND_SECTIONS,
+    compound_list,
+    compoundcloud,
+    compounds_properties,
+    property_metadata,
+    qlever,
+    vhp_compound_ids,
+    wikidata_expdata,
+    wikidata_mapping,
+    wikidata_qid,
+)
+from data.compounds.tables import IdentifierMap, LocalTable
+from data.mapping import normalize_all, normalize_biostudies, normalize_zenodo
+from data.search_index import SearchIndex
+from utils.api import BadRequest, decode_cursor, encode_cursor, parse_fields, parse_limit, project
+from utils.assets import StaticAssets
+from utils.cache_stats import MISSING, CacheStats
+from utils.compression import ResponseCompressor, precompress_tree, size_report
+from utils.export import export_format, export_response, parse_columns
+from utils.images import ImageProxy
+from utils.jobs import JobQueue
 
 ################################################################################
+# Shared secret of the VHP4Safety/cloud push webhook (see /webhooks/github).
+GITHUB_WEBHOOK_SECRET = os.environ.get("GITHUB_WEBHOOK_SECRET", "")
+# Bearer token for the /admin endpoints; they answer 404 while it is unset.
+ADMIN_TOKEN = os.environ.get("VHP_ADMIN_TOKEN", "")
+
 CACHE_TIMEOUT = 60 * 60 * 24 * 5    # 5 days -- [Ozan] I created a separate
                                     # timeout object for the tools page because
                                     # a 5-day caching is too long for it. 
 CACHE_TIMEOUT_SERVICE = 60          # Separate timeout for the tools page -- 60
                                     # seconds. 
+if GITHUB_WEBHOOK_SECRET:
+    # Pushes to the cloud repo refresh the index caches, so the short TTL is
+    # no longer needed to pick up new services.
+    CACHE_TIMEOUT_SERVICE = CACHE_TIMEOUT
+CACHE_TIMEOUT_DETAIL = 60 * 60  # Per-tool and per-method detail JSON, refreshed
+                                # in the background once it is older than this.
+TOOL_DETAIL_WAIT = 5  # Seconds /tools waits for details it has never fetched.
+# Local copy of the detail documents; defaults to instance/documents.
+DOCUMENTS_DIR = os.environ.get("VHP_DOCUMENTS_DIR", "")
+# Offline bundle of the cloud repo (see `flask snapshot-build`). In "primary"
+# mode it answers all cloud fetches; in "fallback" mode only failed ones.
+SNAPSHOT_PATH = os.environ.get("VHP_SNAPSHOT", "")
+SNAPSHOT_MODE = os.environ.get("VHP_SNAPSHOT_MODE", "fallback")
+# SPARQL results of the compound pages, per compound and section. The default
+# file system backend is shared by all workers on a host; set
+# VHP_COMPOUND_CACHE_TYPE=RedisCache (and CACHE_REDIS_URL) to share it wider.
+COMPOUND_CACHE_TIMEOUT = int(os.environ.get("VHP_COMPOUND_CACHE_TIMEOUT", 60 * 60 * 24 * 7))
+COMPOUND_CACHE_TYPE = os.environ.get("VHP_COMPOUND_CACHE_TYPE", "FileSystemCache")
+COMPOUND_CACHE_DIR = os.environ.get("VHP_COMPOUND_CACHE_DIR", "")
+# Local compound id -> Wikidata map, reloaded in bulk once a day.
+COMPOUND_MAP_PATH = os.environ.get("VHP_COMPOUND_MAP", "")
+COMPOUND_MAP_TIMEOUT = 60 * 60 * 24
+# Local table of all compounds (names, InChIKeys, SMILES) behind the compound
+# search, reloaded in bulk once a day.
+COMPOUND_CATALOG_PATH = os.environ.get("VHP_COMPOUND_CATALOG", "")
+COMPOUND_CATALOG_TIMEOUT = 60 * 60 * 24
+# Labels and formatter URLs of the compound properties; they rarely change.
+COMPOUND_PROPERTIES_PATH = os.environ.get("VHP_COMPOUND_PROPERTIES", "")
+COMPOUND_PROPERTIES_TIMEOUT = 60 * 60 * 24 * 7
+COMPOUND_BATCH_MAX = 200  # Compounds per /api/compounds/properties request
+COMPOUND_BATCH_CHUNK = 25  # Compounds per VALUES query; chunks run concurrently
+# Directory of recorded SPARQL results that stand in for compoundcloud and
+# QLever (tests, benchmarks, offline work). With VHP_SPARQL_RECORD=1 queries
+# missing from it are sent to the endpoint and their results saved.
+SPARQL_FIXTURES = os.environ.get("VHP_SPARQL_FIXTURES", "")
+SPARQL_RECORD = os.environ.get("VHP_SPARQL_RECORD", "") == "1"
+# Upstream calls of the async views (BioStudies, Zenodo): read timeout in
+# seconds, and how many connections one request may have open at once.
+UPSTREAM_TIMEOUT = 30
+UPSTREAM_CONNECTIONS = int(os.environ.get("VHP_UPSTREAM_CONNECTIONS", 100))
+EXPORT_PAGE_SIZE = 100  # Repository hits fetched per request by /export/datasets
+# Cached tool logos and their thumbnails; defaults to instance/images.
+IMAGES_DIR = os.environ.get("VHP_IMAGES_DIR", "")
+# Table of the background jobs (file checks of dataset pages); defaults to
+# instance/jobs.sqlite3. Finished jobs are reused for JOB_TIMEOUT seconds.
+JOBS_PATH = os.environ.get("VHP_JOBS_DB", "")
+JOB_TIMEOUT = 60 * 60 * 24
+JOB_WORKERS = 4
 ### Configuration for BioStudies Integration
 # Change these variables to switch between collections
 BIOSTUDIES_COLLECTION = "VHP4Safety"  # Replace with "EU-ToxRisk" to test
@@ -49,9 +134,15 @@ STAGE_EXPLANATIONS = {
     "(External) exposure": "External exposure assessment.",
     "Generic": "Generic category.",
 }
-METHODS_URL = "https://raw.githubusercontent.com/VHP4Safety/cloud/refs/heads/main/cap/methods_index.json"
+CLOUD_REPOSITORY = "VHP4Safety/cloud"
+CLOUD_RAW_URL = f"https://raw.githubusercontent.com/{CLOUD_REPOSITORY}"
+METHODS_PATH = "cap/methods_index.json"
+METHODS_URL = f"{CLOUD_RAW_URL}/refs/heads/main/{METHODS_PATH}"
 # TOOLS and SERVICES are synonymous
-SERVICES_URL = "https://raw.githubusercontent.com/VHP4Safety/cloud/refs/heads/main/cap/service_index.json"
+SERVICES_PATH = "cap/service_index.json"
+SERVICES_URL = f"{CLOUD_RAW_URL}/refs/heads/main/{SERVICES_PATH}"
+TOOL_DETAIL_URL = "https://cloud.vhp4safety.nl/service/{}.json"
+METHOD_DETAIL_URL = f"{CLOUD_RAW_URL}/refs/heads/main/docs/methods/{{}}.json"
 
 REG_QUESTIONS = {
     "reg_q_1a": {
@@ -111,11 +202,42 @@ cache_config = {
 app = Flask(__name__)
 app.config.from_mapping(cache_config)
 cache = Cache(app)
+cache_stats = CacheStats(cache)  # hit/miss/fill counters, see /admin/cache/stats
+compound_cache = Cache(
+    app,
+    config={
+        "CACHE_TYPE": COMPOUND_CACHE_TYPE,
+        "CACHE_DIR": COMPOUND_CACHE_DIR or os.path.join(app.instance_path, "compounds"),
+        "CACHE_DEFAULT_TIMEOUT": COMPOUND_CACHE_TIMEOUT,
+        "CACHE_THRESHOLD": 100000,
+        "CACHE_REDIS_URL": os.environ.get("CACHE_REDIS_URL", ""),
+    },
+)
+ResponseCompressor(app)  # gzip/brotli for large responses, precompressed static files
+StaticAssets(app)  # fingerprinted static URLs and per-template heavy assets
+if IMAGES_DIR:
+    app.config["IMAGE_PROXY_DIR"] = IMAGES_DIR
+images = ImageProxy(app)  # tool logos fetched once, served as hashed thumbnails
 
 
-@cache.memoize(timeout=CACHE_TIMEOUT)
-def get_json_dict(url: str, timeout: int = 5) -> dict:
-    """Fetch xxxx_index.json from the cloud repo and return as a dictionary.
+snapshot = Snapshot.load(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+snapshot_primary = snapshot is not None and SNAPSHOT_MODE == "primary"
+
+
+def fetch_json_dict(url: str, timeout: int = 5) -> dict:
+    """Fetch a JSON object without caching, using the snapshot bundle if loaded.
+    Return an empty dict on any error to avoid breaking pages that depend on it.
+    """
+    if snapshot_primary and snapshot.get_json(url) is not None:
+        return snapshot.get_json(url)
+    data = fetch_json_live(url, timeout)
+    if not data and snapshot is not None:
+        data = snapshot.get_json(url) or {}
+    return data
+
+
+def fetch_json_live(url: str, timeout: int = 5) -> dict:
+    """Fetch a JSON object over HTTP.
     Return an empty dict on any error to avoid breaking pages that depend on it.
     """
     try:
@@ -131,26 +253,62 @@ def get_json_dict(url: str, timeout: int = 5) -> dict:
         return {}
 
 
+@cache_stats.memoize(timeout=CACHE_TIMEOUT, response_filter=bool)
+def get_json_dict(url: str, timeout: int = 5) -> dict:
+    """Fetch xxxx_index.json from the cloud repo and return as a dictionary.
+    Return an empty dict on any error to avoid breaking pages that depend on it;
+    that empty dict is not cached, so the next call tries again.
+    """
+    return fetch_json_dict(url, timeout)
+
+
 # A separate get_json_dict function for the tools page with its own timeout. 
-@cache.memoize(timeout=CACHE_TIMEOUT_SERVICE)
+@cache_stats.memoize(timeout=CACHE_TIMEOUT_SERVICE, response_filter=bool)
 def get_json_dict_service(url: str, timeout: int = 5) -> dict:
     """Fetch xxxx_index.json from the cloud repo and return as a dictionary.
-    Return an empty dict on any error to avoid breaking pages that depend on it.
+    Return an empty dict on any error to avoid breaking pages that depend on it;
+    that empty dict is not cached, so the next call tries again.
     """
-    try:
-        resp = requests.get(url, timeout=timeout)
-        if resp.status_code != 200:
-            return {}
-        data = resp.json()
-        if isinstance(data, dict):
-            return data
-        else:
-            return {}
-    except Exception:
-        return {}
+    return fetch_json_dict(url, timeout)
+
+
+def biostudies_page(
+    extractor, search_query: str, page: int, page_size: int, filters: list | None, load_metadata: bool
+):
+    """Search or list BioStudies; a coroutine with ``AsyncBioStudiesExtractor``."""
+    if search_query:
+        return extractor.search_studies(
+            search_query,
+            page=page,
+            page_size=page_size,
+            filters=filters,
+            load_metadata=load_metadata,
+        )
+    return extractor.list_studies(
+        page=page,
+        page_size=page_size,
+        include_urls=True,
+        filters=filters,
+        load_metadata=load_metadata,
+    )
 
 
-@cache.memoize(timeout=CACHE_TIMEOUT)
+def zenodo_page(extractor, search_query: str, page: int, page_size: int, load_metadata: bool):
+    """Search or list Zenodo; a coroutine with ``AsyncZenodoExtractor``."""
+    if search_query:
+        return extractor.search_records(
+            search_query, page=page, size=page_size, load_metadata=load_metadata
+        )
+    # load metadata needed for is_rocrate filtering in template
+    return extractor.list_records(
+        page=page,
+        size=page_size,
+        include_urls=True,
+        load_metadata=load_metadata,
+    )
+
+
+@cache_stats.memoize(timeout=CACHE_TIMEOUT)
 def get_repository_data(
     search_query: str,
     page: int = 1,
@@ -161,114 +319,417 @@ def get_repository_data(
     """
     Extract data from respositories
     """
-    # Initialize extractor for BIOSTUDIES
     bs_extractor = BioStudiesExtractor(collection=BIOSTUDIES_COLLECTION)
+    bs_results = biostudies_page(bs_extractor, search_query, page, page_size, filters, load_metadata)
 
-    # Fetch data based on search query or list all
-    if search_query:
-        bs_results = bs_extractor.search_studies(
-            search_query,
-            page=page,
-            page_size=page_size,
-            filters=filters,
-            load_metadata=load_metadata,
+    if not filters:
+        # We currently do no filter Zenodo datasets.
+        zen_extractor = ZenodoExtractor(
+            community=ZENODO_COMMUNITY, record_type=ZENODO_RECORD_TYPE
         )
+        zen_result = zenodo_page(zen_extractor, search_query, page, page_size, load_metadata)
     else:
-        bs_results = bs_extractor.list_studies(
-            page=page,
-            page_size=page_size,
-            include_urls=True,
-            filters=filters,
-            load_metadata=load_metadata,
-        )
+        zen_result = {"hits": [], "total": 0, "error": None}
+
+    return bs_results, zen_result
 
-    # Initialize extractor for Zenodo
-    zen_extractor = ZenodoExtractor(
-        community=ZENODO_COMMUNITY, record_type=ZENODO_RECORD_TYPE
+
+def upstream_client() -> httpx.AsyncClient:
+    """HTTP client for the upstream calls of one async view."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(UPSTREAM_TIMEOUT, connect=5),
+        limits=httpx.Limits(max_connections=UPSTREAM_CONNECTIONS),
     )
 
-    if not filters:
+
+async def fetch_repository_data(
+    client: httpx.AsyncClient,
+    search_query: str,
+    page: int = 1,
+    page_size: int = 18,
+    filters: list | None = None,
+    load_metadata: bool = True,
+    validate_files: bool = True,
+) -> tuple[dict, dict]:
+    """``get_repository_data`` on the async extractors.
+
+    BioStudies and Zenodo are queried concurrently, and so are the metadata
+    of all studies on the page.
+    """
+    bs_extractor = AsyncBioStudiesExtractor(
+        client, collection=BIOSTUDIES_COLLECTION, validate_files=validate_files
+    )
+    bs_request = biostudies_page(bs_extractor, search_query, page, page_size, filters, load_metadata)
+    if filters:
         # We currently do no filter Zenodo datasets.
-        if search_query:
-            zen_result = zen_extractor.search_records(
-                search_query, page=page, size=page_size, load_metadata=load_metadata
+        return await bs_request, {"hits": [], "total": 0, "error": None}
+
+    zen_extractor = AsyncZenodoExtractor(
+        client, community=ZENODO_COMMUNITY, record_type=ZENODO_RECORD_TYPE
+    )
+    zen_request = zenodo_page(zen_extractor, search_query, page, page_size, load_metadata)
+    bs_results, zen_result = await asyncio.gather(bs_request, zen_request)
+    return bs_results, zen_result
+
+
+async def repository_data(
+    search_query: str,
+    page: int = 1,
+    page_size: int = 18,
+    filters: list | None = None,
+    load_metadata: bool = True,
+) -> tuple[dict, dict]:
+    """``get_repository_data`` for async views.
+
+    Shares its cache entries; on a miss the repositories are queried with
+    ``fetch_repository_data`` and the result is stored for both.
+    """
+    args = (search_query, page, page_size, filters, load_metadata)
+    cached = cache_stats.get_memoized(get_repository_data, *args)
+    if cached is not MISSING:
+        return cached
+    start = time.perf_counter()
+    async with upstream_client() as client:
+        result = await fetch_repository_data(client, *args)
+    cache_stats.set_memoized(get_repository_data, result, *args, elapsed=time.perf_counter() - start)
+    return result
+
+
+def dataset_id(dataid: str) -> tuple | None:
+    """``("zenodo", recid or DOI)`` or ``("biostudies", accession)`` for a dataset id.
+
+    None for ids of neither repository. Zenodo recids and DOIs are tried
+    first, as they never look like a BioStudies accession.
+    """
+    is_valid, record_id, _ = ZenodoExtractor.validate_record_id(dataid)
+    if is_valid:
+        return "zenodo", record_id
+    is_valid, accession, _ = BioStudiesExtractor.validate_study_id(dataid)
+    if is_valid:
+        return "biostudies", accession
+    return None
+
+
+def dataset_metadata(bs_extractor, zen_extractor, source: str, record_id):
+    """Metadata of one record; a coroutine with the async extractors."""
+    if source == "zenodo":
+        return zen_extractor.get_record_metadata(record_id)
+    return bs_extractor.get_study_metadata(record_id)
+
+
+class RepositoryUnavailable(Exception):
+    """A repository failed to answer for a record, as opposed to not having it."""
+
+
+def dataset_hit(source: str, metadata: dict) -> dict | None:
+    """A fetched record shaped like a search hit of its repository, normalized.
+
+    None for unknown records and for records outside the VHP4Safety
+    collection or community, which a search would not have found either.
+    Other errors raise ``RepositoryUnavailable``, so they are not cached.
+    """
+    if not metadata:
+        raise RepositoryUnavailable(f"empty response from {source}")
+    if "error" in metadata:
+        if metadata.get("not_found"):
+            return None
+        raise RepositoryUnavailable(metadata["error"])
+    if source == "biostudies":
+        if (metadata.get("collection") or "").lower() != BIOSTUDIES_COLLECTION.lower():
+            return None
+        hit = {
+            "accession": metadata.get("accession"),
+            "title": metadata.get("title"),
+            "type": "study",
+            "release_date": metadata.get("release_date"),
+            "url": metadata.get("url"),
+            "metadata": metadata,
+        }
+        normalize_all([hit], [])
+    else:
+        communities = [c.get("id") for c in metadata.get("communities") or [] if isinstance(c, dict)]
+        if ZENODO_COMMUNITY not in communities:
+            return None
+        hit = dict(metadata.get("raw") or {}, parsed_metadata=metadata, url=metadata.get("url"))
+        normalize_all([], [hit])
+    return hit
+
+
+@cache_stats.memoize(timeout=CACHE_TIMEOUT, cache_none=True)
+def get_dataset_record(dataid: str) -> dict | None:
+    """The dataset behind a BioStudies accession, Zenodo recid or DOI.
+
+    Only that one record is fetched; None when the id is unknown, which is
+    cached as well. Its files are checked by a background job
+    (``dataset_files_job``).
+    """
+    found = dataset_id(dataid)
+    if found is None:
+        return None
+    bs_extractor = BioStudiesExtractor(collection=BIOSTUDIES_COLLECTION, validate_files=False)
+    zen_extractor = ZenodoExtractor(community=ZENODO_COMMUNITY, record_type=ZENODO_RECORD_TYPE)
+    source, record_id = found
+    return dataset_hit(source, dataset_metadata(bs_extractor, zen_extractor, source, record_id))
+
+
+async def dataset_record(dataid: str) -> dict | None:
+    """``get_dataset_record`` for async views, sharing its cache entries."""
+    cached = cache_stats.get_memoized(get_dataset_record, dataid)
+    if cached is not MISSING:
+        return cached
+    found = dataset_id(dataid)
+    if found is None:
+        return None
+    source, record_id = found
+    start = time.perf_counter()
+    async with upstream_client() as client:
+        bs_extractor = AsyncBioStudiesExtractor(
+            client, collection=BIOSTUDIES_COLLECTION, validate_files=False
+        )
+        zen_extractor = AsyncZenodoExtractor(
+            client, community=ZENODO_COMMUNITY, record_type=ZENODO_RECORD_TYPE
+        )
+        metadata = await dataset_metadata(bs_extractor, zen_extractor, source, record_id)
+    hit = dataset_hit(source, metadata)
+    cache_stats.set_memoized(get_dataset_record, hit, dataid, elapsed=time.perf_counter() - start)
+    return hit
+
+
+jobs = JobQueue(
+    JOBS_PATH or os.path.join(app.instance_path, "jobs.sqlite3"),
+    workers=JOB_WORKERS,
+    ttl=JOB_TIMEOUT,
+)
+
+
+@jobs.task("study_files")
+def check_study_files(payload: dict, report) -> dict:
+    """Whether each file of a BioStudies study exists, and its size.
+
+    The files are checked concurrently without downloading them, and the
+    checks made so far are reported about once a second.
+    """
+    files = payload["files"]
+    checks: dict[str, dict] = {}
+
+    async def check_all() -> None:
+        async with upstream_client() as client:
+            extractor = AsyncBioStudiesExtractor(client)
+            slots = asyncio.Semaphore(UPSTREAM_CONNECTIONS)
+
+            async def check(f: dict) -> tuple[str, dict]:
+                async with slots:
+                    return f["path"], await extractor.url_exists_no_download(f["url"])
+
+            reported = time.monotonic()
+            for next_check in asyncio.as_completed([check(f) for f in files]):
+                path, result = await next_check
+                length = result.get("content_length")
+                checks[path] = {
+                    "exists": result["exists"],
+                    "size": int(length) if str(length or "").isdigit() else None,
+                }
+                if time.monotonic() - reported >= 1:
+                    report(len(checks), len(files), {"files": checks})
+                    reported = time.monotonic()
+
+    report(0, len(files))
+    asyncio.run(check_all())
+    report(len(checks), len(files))
+    return {"files": checks}
+
+
+def dataset_files_job(dataset: dict | None) -> dict | None:
+    """The file check job of a BioStudies dataset; None for other datasets."""
+    if not dataset or not dataset.get("accession"):
+        return None
+    files = [
+        {"path": f["path"], "url": f["url"]}
+        for f in dataset["norm_metadata"].get("files") or []
+        if f.get("path") and f.get("url")
+    ]
+    if not files:
+        return None
+    return jobs.submit("study_files", dataset["accession"], {"files": files})
+
+
+def done_future(result) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+# Fetches the repositories behind streamed data pages, one event loop each
+repository_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="repository")
+
+
+def repository_source(
+    source: str,
+    search_query: str,
+    page: int = 1,
+    page_size: int = 18,
+    filters: list | None = None,
+    load_metadata: bool = True,
+) -> dict:
+    """The BioStudies or Zenodo half of ``fetch_repository_data``."""
+
+    async def fetch() -> dict:
+        async with upstream_client() as client:
+            if source == "biostudies":
+                extractor = AsyncBioStudiesExtractor(client, collection=BIOSTUDIES_COLLECTION)
+                return await biostudies_page(extractor, search_query, page, page_size, filters, load_metadata)
+            if filters:
+                # We currently do no filter Zenodo datasets.
+                return {"hits": [], "total": 0, "error": None}
+            extractor = AsyncZenodoExtractor(
+                client, community=ZENODO_COMMUNITY, record_type=ZENODO_RECORD_TYPE
             )
-        else:
-            # load metadata needed for is_rocrate filtering in template
-            zen_result = zen_extractor.list_records(
-                page=page,
-                size=page_size,
-                include_urls=True,
-                load_metadata=load_metadata,
+            return await zenodo_page(extractor, search_query, page, page_size, load_metadata)
+
+    return asyncio.run(fetch())
+
+
+def repository_futures(
+    search_query: str,
+    page: int = 1,
+    page_size: int = 18,
+    filters: list | None = None,
+    load_metadata: bool = True,
+) -> tuple[Future, Future]:
+    """``get_repository_data`` as one future per repository.
+
+    Both repositories are queried at once on ``repository_executor``, so a
+    streamed page can render each as soon as it has answered. The pair is
+    cached for ``get_repository_data`` when both are done.
+    """
+    args = (search_query, page, page_size, filters, load_metadata)
+    cached = cache_stats.get_memoized(get_repository_data, *args)
+    if cached is not MISSING:
+        return done_future(cached[0]), done_future(cached[1])
+
+    start = time.perf_counter()
+    futures = tuple(
+        repository_executor.submit(repository_source, source, *args)
+        for source in ("biostudies", "zenodo")
+    )
+
+    def store(_):
+        if all(future.done() and future.exception() is None for future in futures):
+            result = tuple(future.result() for future in futures)
+            cache_stats.set_memoized(
+                get_repository_data, result, *args, elapsed=time.perf_counter() - start
             )
-    else:
-        zen_result = {"hits": [], "total": 0, "error": None}
 
-    return bs_results, zen_result
+    for future in futures:
+        future.add_done_callback(store)
+    return futures
+
+
+async def render_page(template_name: str, **context):
+    """``render_template`` for async views.
+
+    The navbar's dataset menu is awaited first, so that rendering finds it
+    in the cache instead of fetching it synchronously.
+    """
+    await repository_data("")
+    return render_template(template_name, **context)
+
+
+def fetch_tool_detail(tool_id: str) -> dict | None:
+    """Fetch the detail JSON of a single tool; None when it is unavailable."""
+    return fetch_json_dict(TOOL_DETAIL_URL.format(urllib.parse.quote(tool_id, safe=""))) or None
+
+
+def fetch_method_detail(method_id: str) -> dict | None:
+    """Fetch docs/methods/<id>.json of a single method; None when it is unavailable."""
+    return fetch_json_dict(METHOD_DETAIL_URL.format(urllib.parse.quote(method_id, safe=""))) or None
+
+
+# Detail documents are kept in memory and on disk; a new index triggers a
+# bulk prefetch of all of them, single fetches only fill in the gaps.
+documents = DocumentStore(DOCUMENTS_DIR or os.path.join(app.instance_path, "documents"))
+tool_detail_store = DetailStore(
+    fetch_tool_detail, ttl=CACHE_TIMEOUT_DETAIL, kind="service", documents=documents
+)
+method_detail_store = DetailStore(
+    fetch_method_detail, ttl=CACHE_TIMEOUT_DETAIL, kind="methods", documents=documents
+)
+
+# Normalized and indexed service_index.json; rebuilt only when the index changes.
+tools_catalog = CatalogHolder(
+    lambda: get_json_dict_service(SERVICES_URL),
+    lambda index: ToolsCatalog(
+        index,
+        flag_fields=REG_QUESTIONS,
+        metadata_url="/snapshot/docs/service" if snapshot_primary else SERVICE_DOCS_URL,
+    ),
+    ttl=CACHE_TIMEOUT_SERVICE,
+    on_build=lambda catalog: (
+        tool_detail_store.prefetch_in_background(catalog.by_id),
+        images.warm(tool["png"] for tool in catalog.entries),
+    ),
+)
+# Normalized and indexed methods_index.json, with pre-split stages.
+methods_catalog = CatalogHolder(
+    lambda: get_json_dict(METHODS_URL),
+    lambda index: MethodsCatalog(index, flag_fields=REG_QUESTIONS),
+    ttl=CACHE_TIMEOUT,
+    on_build=lambda catalog: method_detail_store.prefetch_in_background(catalog.by_id),
+)
+
+
+def is_vhp_hosted(detail: dict) -> bool:
+    """Whether a tool's instance runs on the VHP4Safety platform."""
+    vhp_platform = (detail.get("instance") or {}).get("vhp-platform") or ""
+    return vhp_platform.lower() not in ("external", "independent", "")
 
 
 # Provide methods list to all templates for the Methods dropdown in the navbar
 @app.context_processor
 def inject_methods_menu():
-    """Fetch methods_index.json and expose a simple list of {id, title} to templates.
+    """Expose the methods as a simple list of {id, title} to templates.
     Return an empty list on any error to avoid breaking pages.
     """
-    data = get_json_dict(METHODS_URL)
-    if data:
-        items = []
-        for key, val in data.items() if isinstance(data, dict) else []:
-            title = (
-                val.get("method")
-                or val.get("method_name_content")
-                or val.get("method_name")
-                or key
-            )
-            items.append({"id": key, "title": title})
-        # sort by title
-        items = sorted(items, key=lambda x: x["title"].lower())
-        return {"methods_menu": items}
-    else:
-        return {"methods_menu": []}
+    return {"methods_menu": list(methods_catalog.get().menu)}
 
 
 @app.context_processor
 def inject_tools_menu():
-    """Fetch methods_index.json and expose a simple list of {id, title} to templates.
+    """Expose the tools as a simple list of {id, title} to templates.
     Return an empty list on any error to avoid breaking pages.
     """
-    data = get_json_dict_service(SERVICES_URL)
-    if data:
-        items = []
-        for key, val in data.items() if isinstance(data, dict) else []:
-            title = val.get("service") or key
-            items.append({"id": key, "title": title})
-        # sort by title
-        items = sorted(items, key=lambda x: x["title"].lower())
-        return {"tools_menu": items}
-    else:
-        return {"tools_menu": []}
+    return {"tools_menu": list(tools_catalog.get().menu)}
 
 
 @app.context_processor
 def inject_data_menu():
-    """Fetch methods_index.json and expose a simple list of {id, title} to templates.
-    Return an empty list on any error to avoid breaking pages.
+    """Expose the datasets as a list of {id, title} to templates.
+    base.html calls it at the end of the page, so streamed pages flush
+    their header before the repositories have answered.
     """
-    bs_results, zen_results = get_repository_data(search_query="")
-    hits: list = bs_results.get("hits", [])
+    return {"data_menu": dataset_menu}
+
+
+def dataset_menu(with_description: bool = False, results: tuple[dict, dict] | None = None) -> list[dict]:
+    """All BioStudies and Zenodo datasets as {id, title, url}, sorted by title.
+
+    ``results`` are those of ``get_repository_data("")``, fetched when not given.
+    """
+    bs_results, zen_results = results or get_repository_data(search_query="")
+    hits: list = list(bs_results.get("hits", []))
     hits.extend(zen_results.get("hits", []))
-    if hits:
-        items = []
-        for hit in hits:
-            title = hit.get("title")
-            id = hit.get("accession", "") or hit.get("doi_url", "") or hit.get("id", "")
-            url = hit.get("url", "") or hit.get("doi_url")
-            items.append({"id": id, "title": title, "url": url})
-        # sort by title
-        items = sorted(items, key=lambda x: x["title"].lower())
-        return {"data_menu": items}
-    else:
-        return {"data_menu": []}
+    items = []
+    for hit in hits:
+        title = hit.get("title")
+        id = hit.get("accession", "") or hit.get("doi_url", "") or hit.get("id", "")
+        url = hit.get("url", "") or hit.get("doi_url")
+        item = {"id": id, "title": title, "url": url}
+        if with_description:
+            item["description"] = hit.get("description") or ""
+            item["keywords"] = hit.get("keywords") or []
+        items.append(item)
+    # sort by title
+    return sorted(items, key=lambda x: (x["title"] or "").lower())
 
 
 ################################################################################
@@ -345,58 +806,25 @@ def data():
     if filter_flow_step:
         filters.append(("flow_step", filter_flow_step))
 
-    bs_results, zen_results = get_repository_data(
-        search_query, page, page_size, filters=filters
-    )
-
-    # Extract studies and metadata
-    studies = bs_results.get("hits", [])
-    bs_total = bs_results.get("total", 0)
-    bs_error: str | None = bs_results.get("error", None)
-
-    # Extract datasets and metadata from Zenodo
-    datasets = zen_results.get("hits", [])
-    zen_total = zen_results.get("total", 0)
-    zen_error: str | None = zen_results.get("error", None)
-
-    # enrich with normalized metadata mapping:
-
-    # studies, datasets = normalize_all([studies],[datasets])
-
-    # combine totals for pagination
-    total = bs_total + zen_total
+    # Both repositories and the dataset menu of the navbar are fetched in the
+    # background; the page streams each block as soon as its source is done.
+    biostudies, zenodo = repository_futures(search_query, page, page_size, filters)
+    menu = repository_futures("")
 
-    # Get filtering metadata (if filters were applied)
-    filters_applied = bs_results.get("filters_applied", False)
-    hits_returned = bs_results.get("hits_returned", len(studies))
-    pages_fetched = bs_results.get("pages_fetched", 1)
-    page_size_met = bs_results.get("page_size_met", True)
-
-    # Calculate pagination info
-    has_next = (page * page_size) < total
-    has_prev = page > 1
-
-    # Pass data to template
-    return render_template(
+    return stream_template(
         "data/data.html",
-        studies=studies,
-        datasets=datasets,
-        total=total,
+        biostudies=biostudies.result,
+        zenodo=zenodo.result,
+        data_menu=lambda: dataset_menu(results=tuple(future.result() for future in menu)),
         page=page,
         page_size=page_size,
         search_query=search_query,
         collection_name=BIOSTUDIES_COLLECTION_NAME,
         collection=BIOSTUDIES_COLLECTION,
-        errors={"zenodo": zen_error, "biostudies": bs_error},
-        has_next=has_next,
-        has_prev=has_prev,
+        has_prev=page > 1,
         filter_case_study=filter_case_study,
         filter_regulatory_question=filter_regulatory_question,
         filter_flow_step=filter_flow_step,
-        filters_applied=filters_applied,
-        hits_returned=hits_returned,
-        pages_fetched=pages_fetched,
-        page_size_met=page_size_met,
         stage_explanations=STAGE_EXPLANATIONS,
         reg_question_explanations=REG_QUESTION_EXPLANATIONS,
     )
@@ -426,32 +854,21 @@ def split_text_int(value: None|str) -> tuple[str, None|int]:
     return (m.group(1), int(m.group(2)))
 
 
-@app.route("/data/<dataid>")
+@app.route("/data/<path:dataid>")
 def data_detail(dataid):
-    bs_results, zen_results = get_repository_data(dataid)
-
-    studies = bs_results.get("hits", [])
-    bs_total = bs_results.get("total", 0)
-    bs_error: str | None = bs_results.get("error", None)
-
-    # Extract datasets and metadata from Zenodo
-    datasets = zen_results.get("hits", [])
-    zen_total = zen_results.get("total", 0)
-    zen_error: str | None = zen_results.get("error", None)
-
-    studies, datasets = normalize_all(studies, datasets)
-
-    if bs_error and not zen_error:
-        if zen_total != 1:
-            return abort(404)
-    elif zen_error and not bs_error:
-        if bs_total != 1:
-            return abort(404)
-    if studies:
-        return render_template("data/data_details.html", data=studies[0])
-    elif datasets:
-        return render_template("data/data_details.html", data=datasets[0])
-    return abort(404)
+    try:
+        dataset = asyncio.run(dataset_record(dataid))
+    except RepositoryUnavailable:
+        return abort(503)
+    if dataset is None:
+        return abort(404)
+    menu = repository_futures("")
+    return stream_template(
+        "data/data_details.html",
+        data=dataset,
+        job=dataset_files_job(dataset),
+        data_menu=lambda: dataset_menu(results=tuple(future.result() for future in menu)),
+    )
 
 ################################################################################
 ### Pages under 'Models'
@@ -537,126 +954,51 @@ def models():
 
 ### Here begins the updated version for creating the tool list page.
 @app.route("/tools")
-def tools():
+async def tools():
     try:
-        tools = get_json_dict_service(
-            SERVICES_URL
-        )  # Geting the service_list.json in the dictionary format.
-        tools = list(tools.values())  # Converting the dictionary to a list object.
-
-        # Mapping the URLs with glossary IDs to their text values.
-        stage_mapping = {
-            "https://vhp4safety.github.io/glossary#VHP0000153": "Chemical Characteristics and Hazard Identification",
-            "https://vhp4safety.github.io/glossary#VHP0000154": "Exposure",
-            "https://vhp4safety.github.io/glossary#VHP0000155": "Toxicokinetics",
-            "https://vhp4safety.github.io/glossary#VHP0000156": "Toxicodynamics",
-            "https://vhp4safety.github.io/glossary#VHP0000158": "Adverse Outcome",
-            # Legacy mappings (superseded by the Process Flow Step URIs above)
-            "https://vhp4safety.github.io/glossary#VHP0000056": "ADME",
-            "https://vhp4safety.github.io/glossary#VHP0000102": "Hazard Assessment",
-            "https://vhp4safety.github.io/glossary#VHP0000148": "Chemical Information",
-            "https://vhp4safety.github.io/glossary#VHP0000149": "General",
-        }
-
-        for tool in tools:
-            full_stage_url = tool.get("stage", "")
-
-            # Writing the service name and stage values in the logs for troubleshooting.
-            # print(f"Tool: {tool['service']}, Stage URL: {full_stage_url}")  # Log the full URL
-
-            # Checking if the full URL is in the mapping and updating the stage.
-            if full_stage_url in stage_mapping:
-                # print(f"Mapping stage URL {full_stage_url} to {stage_mapping[full_stage_url]}")  # Log the mapping
-                tool["stage"] = stage_mapping[full_stage_url]
-            elif tool["stage"] in ["NA", "Unknown"]:
-                tool["stage"] = (
-                    "Other"  # Combining "NA" and "Unknown" stages in a single stage-type, "Other".
-                )
-
-            html_name = tool.get("html_name")
-            md_name = tool.get("md_file_name")
-            png_name = tool.get("png_file_name")
-
-            tool["url"] = f"https://cloud.vhp4safety.nl/service/{html_name}"
-            tool["meta_data"] = (
-                f"https://raw.githubusercontent.com/VHP4Safety/cloud/main/docs/service/{md_name}"
-                if md_name
-                else "md file not found"
-            )
+        catalog = tools_catalog.get()
 
-            # Check if the tool has the placeholder logo
-            placeholder_logo = "https://github.com/VHP4Safety/ui-design/blob/main/static/images/logo.png"
-            if png_name == placeholder_logo:
-                tool["png"] = None  # set to None if it's the common placeholder
-            else:
-                tool["png"] = (
-                    f"https://raw.githubusercontent.com/VHP4Safety/cloud/main/docs/service/{png_name}"
-                    if not png_name.startswith("http")
-                    else png_name
-                )
-
-            inst_url = tool.get("inst_url", "no_url")
-            if not inst_url:  # catches "" as well
-                inst_url = "no_url"
-            tool["inst_url"] = inst_url
-
-            # Fetch per-tool detail JSON to check hosting status
-            tool_id = tool.get("id", "")
-            vhp_hosted = False
-            if inst_url != "no_url" and tool_id:
-                try:
-                    detail_url = f"https://cloud.vhp4safety.nl/service/{tool_id}.json"
-                    detail_resp = requests.get(detail_url, timeout=5)
-                    if detail_resp.status_code == 200:
-                        detail = detail_resp.json()
-                        vhp_platform = detail.get("instance", {}).get("vhp-platform", "").lower()
-                        vhp_hosted = vhp_platform not in ("external", "independent", "")
-                except Exception:
-                    pass
-            tool["vhp_hosted"] = vhp_hosted
-
-        # Getting selected stages from the URL.
+        # Getting selected stages and regulatory questions from the URL.
         selected_stages = request.args.getlist("stage")
-
-        # Filtering tools by selected stages.
-        if selected_stages:
-            tools = [tool for tool in tools if tool.get("stage") in selected_stages]
-
-        # Getting all unique stages from the tools for the filter options.
-        stages = sorted(set(tool.get("stage") for tool in tools if tool.get("stage")))
-
-        # Forcing "Other" to be the last item in the list of stages.
-        if "Other" in stages:
-            stages.remove("Other")
-            stages.append("Other")
-
-        # Filtering over the regulatory questions.
         reg_questions = {v["label"]: k for k, v in REG_QUESTIONS.items()}
-
         selected_questions = request.args.getlist("reg_q")
-
-        for question in selected_questions:
-            field = reg_questions.get(question)
-            if field:
-                tools = [
-                    tool for tool in tools if str(tool.get(field, "")).lower() == "true"
-                ]
+        flags = [reg_questions[q] for q in selected_questions if q in reg_questions]
 
         # Getting the search query from URL to add a search bar based on tool names.
         search_query = request.args.get("search", "").strip().lower()
 
-        # Filtering tools by search query.
-        if search_query:
-            tools = [
-                tool
-                for tool in tools
-                if search_query in tool.get("service", "").lower()
-            ]
+        selected = catalog.records(
+            catalog.select(selected_stages, flags, search_query)
+        )
 
-        return render_template(
+        # Stages for the filter options ("Other" is kept last by the catalog)
+        # and the number of tools each filter option would return.
+        stages = list(catalog.stages)
+        counts = catalog.facet_counts(selected_stages, flags, search_query)
+        facet_counts = {
+            "stage": counts["stage"],
+            "reg_q": {label: counts["reg_q"].get(field, 0) for label, field in reg_questions.items()},
+        }
+
+        # Per-tool detail JSON (for the hosting status) comes from the tool
+        # detail store; only details that were never fetched are waited for.
+        details = await tool_detail_store.get_many_async(
+            (tool.get("id", "") for tool in selected if tool["inst_url"] != "no_url"),
+            wait_seconds=TOOL_DETAIL_WAIT,
+        )
+        tools = []
+        for tool in selected:
+            detail = details.get(tool.get("id", ""))
+            vhp_hosted = (
+                tool["inst_url"] != "no_url" and detail is not None and is_vhp_hosted(detail)
+            )
+            tools.append({**tool, "vhp_hosted": vhp_hosted})
+
+        return await render_page(
             "tools/tools.html",
             tools=tools,
             stages=stages,
+            facet_counts=facet_counts,
             selected_stages=selected_stages,
             reg_questions=reg_questions,
             selected_questions=selected_questions,
@@ -672,104 +1014,33 @@ def tools():
 @app.route("/methods")
 @app.route("/methods/")
 def methods():
-    """Fetch methods_index.json from the cloud repo, normalize fields and render a methods list page."""
-    url = "https://raw.githubusercontent.com/VHP4Safety/cloud/refs/heads/main/cap/methods_index.json"
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        return f"Error fetching methods list: {response.status_code}", 503
-
+    """Render the methods list page from the cached methods catalog."""
     try:
-        methods = response.json()
-        methods = list(methods.values())  # convert dict to list
-
-        # Normalize fields for the template and collect stages
-        stages_set = set()
-        normalized = []
-        for m in methods:
-            norm = {}
-            norm["id"] = m.get("id", "")
-            # template expects 'service' and 'description'
-            norm["service"] = (
-                m.get("method")
-                or m.get("method_name_content")
-                or m.get("method_name")
-                or ""
-            )
-            norm["description"] = (
-                m.get("method_description_content") or m.get("method_description") or ""
-            )
-            # main_url used for method webpage (catalog page)
-            norm["main_url"] = m.get("catalog_webpage_url") or "no_url"
-            # interactive instance not present in methods index
-            norm["inst_url"] = m.get("inst_url") or "no_url"
-            # metadata md file not available in index; keep empty string
-            norm["meta_data"] = m.get("meta_data") or ""
-            # placeholder/no png
-            norm["png"] = None
-            # keep original raw data for potential details page
-            norm["raw"] = m
-
-            # collect stages (split comma-separated values)
-            stage_field = (m.get("vhp4safety_workflow_stage_content") or "").strip()
-            if stage_field:
-                for part in [s.strip() for s in stage_field.split(",")]:
-                    if part:
-                        stages_set.add(part)
-
-            normalized.append(norm)
+        catalog = methods_catalog.get()
 
         # Apply search and filters similar to /tools
         selected_stages = request.args.getlist("stage")
         selected_questions = request.args.getlist("reg_q")
         search_query = request.args.get("search", "").strip().lower()
-
-        methods_filtered = normalized
-
-        if selected_stages:
-            methods_filtered = [
-                m
-                for m in methods_filtered
-                if any(
-                    s
-                    in (
-                        (m["raw"].get("vhp4safety_workflow_stage_content") or "").split(
-                            ","
-                        )
-                    )
-                    for s in selected_stages
-                )
-            ]
-
-        # Filter by regulatory questions if provided (REG_QUESTIONS keys map to internal fields)
         reg_questions = {v["label"]: k for k, v in REG_QUESTIONS.items()}
-        if selected_questions:
-            for question in selected_questions:
-                field = reg_questions.get(question)
-                if field:
-                    methods_filtered = [
-                        m
-                        for m in methods_filtered
-                        if str(m["raw"].get(field, "")).lower() == "true"
-                    ]
-
-        if search_query:
-            methods_filtered = [
-                m
-                for m in methods_filtered
-                if search_query in m.get("service", "").lower()
-            ]
-
-        stages = sorted(stages_set)
-        if "Other" in stages:
-            stages.remove("Other")
-            stages.append("Other")
+        flags = [reg_questions[q] for q in selected_questions if q in reg_questions]
+
+        methods_filtered = catalog.records(
+            catalog.select(selected_stages, flags, search_query)
+        )
+        stages = list(catalog.stages)
+        counts = catalog.facet_counts(selected_stages, flags, search_query)
+        facet_counts = {
+            "stage": counts["stage"],
+            "reg_q": {label: counts["reg_q"].get(field, 0) for label, field in reg_questions.items()},
+        }
 
         # Pass everything the template expects
         return render_template(
             "methods/methods.html",
             methods=methods_filtered,
             stages=stages,
+            facet_counts=facet_counts,
             selected_stages=selected_stages,
             reg_questions=reg_questions,
             selected_questions=selected_questions,
@@ -782,40 +1053,23 @@ def methods():
 
 
 @app.route("/methods/<methodid>")
-def method_page(methodid):
+async def method_page(methodid):
     """Render a single method page using templates/methods/method.html
     Method details are taken from methods_index.json (keyed by method id).
     """
-    try:
-        methods = get_json_dict(METHODS_URL)
-        # methods_index.json is a dict keyed by method id
-        if methodid not in methods:
-            abort(404)
-        method_details = methods[methodid]
-    except Exception as e:
-        return f"Error processing methods data: {e}", 500
+    record = methods_catalog.get().get(methodid)
+    if record is None:
+        abort(404)
+    method_details = dict(record["raw"])
 
-    # Try to load the full method JSON from the docs/methods folder (raw github)
-    method_json = None
-    # URL-encode the filename part to be safe
-    encoded = urllib.parse.quote(methodid, safe="")
-    raw_url = (
-        "https://raw.githubusercontent.com/VHP4Safety/cloud/refs/heads/main/docs/methods/"
-        + f"{encoded}.json"
+    # The full method JSON from the docs/methods folder; fall back to the
+    # index entry as minimal data when it is not available
+    method_json = (
+        await method_detail_store.get_async(methodid, wait_seconds=TOOL_DETAIL_WAIT) or method_details
     )
-    try:
-        r = requests.get(raw_url, timeout=5)
-        if r.status_code == 200:
-            method_json = r.json()
-        else:
-            # fall back to using the index entry as minimal data
-            method_json = method_details
-    except Exception as exc:
-        # on any error, fall back to index entry
-        method_json = method_details
 
     # Pass both to the template: some templates expect method_json, others method_details
-    return render_template(
+    return await render_page(
         "methods/method.html",
         method=method_details,
         method_details=method_details,
@@ -824,38 +1078,25 @@ def method_page(methodid):
 
 
 @app.route("/tools/<toolname>")
-def tool_page(toolname):
+async def tool_page(toolname):
     # get the tools metadata:
     try:
-        tools = get_json_dict_service(SERVICES_URL)
-        tools = dict(tools)
-        # Geting the service_list.json in the dictionary format.
-        # Converting the dictionary to a list object.
+        tool_json = tools_catalog.get().get_raw(toolname)
     except Exception as e:
         return f"Error processing service data: {e}", 500
 
     # Map toolname to the correct JSON file in the new tool folder
-    if toolname not in tools:
+    if tool_json is None:
         abort(404)
 
-    # get the tools metadata:
-    url = "https://cloud.vhp4safety.nl/service/" + toolname + ".json"
-    response = requests.get(url)
-
-    if response.status_code != 200:
-        return f"Error fetching service list: {response.status_code}", 503
-
-    try:
-        tool_details = response.json()
-        tool_details = dict(tool_details)
-        # Geting the service_list.json in the dictionary format.
-        # Converting the dictionary to a list object.
-    except Exception as e:
-        return f"Error processing service data: {e}", 500
+    # get the tool details (shared with the /tools page):
+    detail = await tool_detail_store.get_async(toolname, wait_seconds=TOOL_DETAIL_WAIT)
+    if detail is None:
+        return "Error fetching service details", 503
 
     # Pass the json filename to the template (for JS to pick up)
-    return render_template(
-        "tools/tool.html", tool_json=tools[toolname], tool_details=tool_details
+    return await render_page(
+        "tools/tool.html", tool_json=dict(tool_json), tool_details=dict(detail)
     )
 
 
@@ -917,223 +1158,932 @@ def show_compound(cwid):
         abort(404)
 
 
-@app.route("/get_compound_properties/<cwid>")
-def show_compounds_properties_as_json(cwid):
+if SPARQL_FIXTURES:
+    for sparql_client in (compoundcloud, qlever):
+        sparql_client.use_fixtures(SPARQL_FIXTURES, record=SPARQL_RECORD)
+
+# Runs the sections of /api/compound/<cwid> concurrently
+compound_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="compound")
+
+
+wikidata_ids = IdentifierMap(
+    COMPOUND_MAP_PATH or os.path.join(app.instance_path, "wikidata_ids.json"),
+    wikidata_mapping,
+    ttl=COMPOUND_MAP_TIMEOUT,
+)
+
+compound_catalog = LocalTable(
+    COMPOUND_CATALOG_PATH or os.path.join(app.instance_path, "compound_catalog.json"),
+    compound_list,
+    ttl=COMPOUND_CATALOG_TIMEOUT,
+    build=CompoundCatalog,
+)
+
+property_dictionary = LocalTable(
+    COMPOUND_PROPERTIES_PATH or os.path.join(app.instance_path, "compound_properties.json"),
+    property_metadata,
+    ttl=COMPOUND_PROPERTIES_TIMEOUT,
+)
+
+
+@cache_stats.memoize(timeout=COMPOUND_CACHE_TIMEOUT, cache=compound_cache)
+def get_compound_wikidata(cwid: str) -> str:
+    """Wikidata entity IRI of a compound, or "" if it has none."""
+    # compounds added after the last reload of the map are looked up one by one
+    return wikidata_ids.lookup(cwid) or wikidata_qid(cwid) or ""
+
+
+@cache_stats.memoize(timeout=COMPOUND_CACHE_TIMEOUT, cache=compound_cache)
+def get_wikidata_expdata(qid: str) -> list[dict]:
+    """QLever results for a Wikidata entity, shared by compounds mapped to it."""
+    return wikidata_expdata(qid)
+
+
+def compute_compound_section(section: str, cwid: str) -> list[dict]:
+    if section == "expdata":
+        qid = wikidata_ids.lookup(cwid) or get_compound_wikidata(cwid)
+        return get_wikidata_expdata(qid) if qid else []
+    if section in ("identifiers", "toxicology"):
+        # property labels are joined locally; None makes the query load them
+        return COMPOUND_SECTIONS[section](cwid, property_dictionary.get())
+    return COMPOUND_SECTIONS[section](cwid)
+
+
+@cache_stats.memoize(timeout=COMPOUND_CACHE_TIMEOUT, cache=compound_cache)
+def get_compound_section(section: str, cwid: str) -> list[dict]:
+    """One section of a compound page (see COMPOUND_SECTIONS), cached per compound."""
+    return compute_compound_section(section, cwid)
+
+
+async def compound_section(section: str, cwid: str) -> list[dict]:
+    """``get_compound_section`` for async views; misses are queried on the compound executor."""
+    cached = cache_stats.get_memoized(get_compound_section, section, cwid)
+    if cached is not MISSING:
+        return cached
+    return await asyncio.wrap_future(
+        compound_executor.submit(cache_stats.fill_memoized, get_compound_section, section, cwid)
+    )
+
+
+def compound_sections(cwid: str):
+    """Yield ``(section, data, error)`` for every section, as soon as each is ready."""
+    futures = {
+        compound_executor.submit(get_compound_section, section, cwid): section
+        for section in COMPOUND_SECTIONS
+    }
+    for future in as_completed(futures):
+        try:
+            yield futures[future], future.result(), None
+        except Exception as e:
+            yield futures[future], None, str(e)
+
+
+async def compound_section_response(section: str, cwid: str):
     if not is_valid_qid(cwid):
         return jsonify({"error": "Invalid compound identifier"}), 400
-    compoundwikiEP = "https://compoundcloud.wikibase.cloud/query/sparql"
-    sparqlquery = (
-        "PREFIX wd: <https://compoundcloud.wikibase.cloud/entity/>\n"
-        "PREFIX wdt: <https://compoundcloud.wikibase.cloud/prop/direct/>\n\n"
-        "SELECT ?cmp ?cmpLabel ?formula ?mass ?inchi ?inchiKey ?SMILES WHERE {\n"
-        "  VALUES ?cmp { wd:" + cwid + " }\n"
-        "  ?cmp wdt:P9 ?inchi ;\n"
-        "       wdt:P10 ?inchiKey .\n"
-        "  OPTIONAL { ?cmp wdt:P2 ?mass }\n"
-        "  OPTIONAL { ?cmp wdt:P3 ?formula }\n"
-        "  OPTIONAL { ?cmp wdt:P7 ?chiralSMILES }\n"
-        "  OPTIONAL { ?cmp wdt:P12 ?nonchiralSMILES }\n"
-        '  BIND (COALESCE(IF(BOUND(?chiralSMILES), ?chiralSMILES, 1/0), IF(BOUND(?nonchiralSMILES), ?nonchiralSMILES, 1/0), "") AS ?SMILES)\n'
-        '  SERVICE wikibase:label { bd:serviceParam wikibase:language "[AUTO_LANGUAGE],en". }\n'
-        "}"
-    )
     try:
-        compound_dat = wbi_helpers.execute_sparql_query(
-            sparqlquery, endpoint=compoundwikiEP
-        )
+        compound_list = await compound_section(section, cwid)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    if not bool(compound_dat):
+    if not compound_list:
         return jsonify({"error": "No data found"}), 404
-    compound_dat = compound_dat["results"]["bindings"][0]
-    # return jsonify(compound_dat);
-    compound_list = [
-        {
-            "wcid": compound_dat["cmp"]["value"],
-            "label": compound_dat["cmpLabel"]["value"],
-            "inchi": compound_dat["inchi"]["value"],
-            "inchikey": compound_dat["inchiKey"]["value"],
-            "SMILES": compound_dat["SMILES"]["value"],
-            "formula": compound_dat["formula"]["value"],
-            "mass": compound_dat["mass"]["value"],
-        }
-    ]
     return jsonify(compound_list), 200
 
 
+@app.route("/get_compound_properties/<cwid>")
+async def show_compounds_properties_as_json(cwid):
+    return await compound_section_response("properties", cwid)
+
+
 @app.route("/get_compound_identifiers/<cwid>")
-def show_compounds_identifiers_as_json(cwid):
+async def show_compounds_identifiers_as_json(cwid):
+    return await compound_section_response("identifiers", cwid)
+
+
+@app.route("/get_compound_toxicology/<cwid>")
+async def show_compounds_toxicology_as_json(cwid):
+    return await compound_section_response("toxicology", cwid)
+
+
+@app.route("/get_compound_expdata/<cwid>")
+async def show_compounds_expdata_as_json(cwid):
+    return await compound_section_response("expdata", cwid)
+
+
+@app.route("/api/compound/<cwid>")
+async def api_compound(cwid):
+    """All sections of a compound page in one response.
+
+    The sections are fetched concurrently. With ``?stream=1`` (or
+    ``Accept: application/x-ndjson``) each one is sent as a JSON line,
+    ``{"section": ..., "data": [...]}`` or ``{"section": ..., "error": ...}``,
+    as soon as it is ready, so clients can render them progressively.
+    """
     if not is_valid_qid(cwid):
         return jsonify({"error": "Invalid compound identifier"}), 400
-    compoundwikiEP = "https://compoundcloud.wikibase.cloud/query/sparql"
-    sparqlquery = (
-        "PREFIX wd: <https://compoundcloud.wikibase.cloud/entity/>\n"
-        "PREFIX wdt: <https://compoundcloud.wikibase.cloud/prop/direct/>\n\n"
-        "SELECT DISTINCT ?propertyLabel ?value ?formatterURL\n"
-        "WHERE {\n"
-        "  VALUES ?property { wd:P13 wd:P22 wd:P23 wd:P26 wd:P27 wd:P28 wd:P36 wd:P41 wd:P43 wd:P44 wd:P45 }\n"
-        "  ?property wikibase:directClaim ?valueProp .\n"
-        "  OPTIONAL { wd:" + cwid + " ?valueProp ?value }\n"
-        "  OPTIONAL { ?property wdt:P6 ?formatterURL }\n"
-        '  SERVICE wikibase:label { bd:serviceParam wikibase:language "[AUTO_LANGUAGE],en". }\n'
-        "}"
+
+    if request.args.get("stream") == "1" or request.accept_mimetypes.best == "application/x-ndjson":
+        def lines():
+            for section, data, error in compound_sections(cwid):
+                if error is None:
+                    yield json.dumps({"section": section, "data": data}) + "\n"
+                else:
+                    yield json.dumps({"section": section, "error": error}) + "\n"
+
+        return Response(lines(), mimetype="application/x-ndjson")
+
+    result = {"cwid": cwid}
+    errors = {}
+    sections = await asyncio.gather(
+        *(compound_section(section, cwid) for section in COMPOUND_SECTIONS), return_exceptions=True
     )
-    try:
-        compound_dat = wbi_helpers.execute_sparql_query(
-            sparqlquery, endpoint=compoundwikiEP
-        )
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    if len(compound_dat["results"]["bindings"]) == 0:
+    for section, data in zip(COMPOUND_SECTIONS, sections):
+        if isinstance(data, Exception):
+            result[section] = []
+            errors[section] = str(data)
+        else:
+            result[section] = data
+    result["errors"] = errors
+    if len(errors) == len(COMPOUND_SECTIONS):
+        return jsonify(result), 502
+    if not any(result[section] for section in COMPOUND_SECTIONS):
         return jsonify({"error": "No data found"}), 404
-    compound_dat = compound_dat["results"]["bindings"]
-    # return jsonify(compound_dat)
-
-    compound_list = []
-    for expProp in compound_dat:
-        if "value" in expProp:
-            compound_list.append(
-                {
-                    "propertyLabel": expProp["propertyLabel"]["value"],
-                    "value": expProp["value"]["value"],
-                    "formatterURL": expProp["formatterURL"]["value"],
-                }
-            )
+    return jsonify(result), 200
+
+
+def parse_compound_ids(values) -> list[str]:
+    """Validated, de-duplicated compound ids from a list or a comma-separated string."""
+    if isinstance(values, str):
+        values = values.split(",")
+    if not isinstance(values, list):
+        raise BadRequest("ids must be a list of compound identifiers")
+    cwids = list(dict.fromkeys(str(value).strip() for value in values if str(value).strip()))
+    if not cwids:
+        raise BadRequest("no compound identifiers given")
+    invalid = [cwid for cwid in cwids if not is_valid_qid(cwid)]
+    if invalid:
+        raise BadRequest(f"invalid compound identifiers: {', '.join(invalid[:10])}")
+    if len(cwids) > COMPOUND_BATCH_MAX:
+        raise BadRequest(f"at most {COMPOUND_BATCH_MAX} compounds per request")
+    return cwids
+
+
+def get_compounds_properties(cwids: list[str]) -> tuple[dict[str, list[dict]], dict[str, str]]:
+    """Properties of many compounds; returns ``(results, errors)`` keyed by id.
+
+    Cached compounds are answered from the compound cache. The others are
+    queried in chunks of ``COMPOUND_BATCH_CHUNK`` with one VALUES query each,
+    run concurrently, and their results are stored in the cache.
+    """
+    results = {}
+    missing = []
+    for cwid in cwids:
+        cached = cache_stats.get_memoized(get_compound_section, "properties", cwid)
+        if cached is MISSING:
+            missing.append(cwid)
         else:
-            compound_list.append(
-                {
-                    "propertyLabel": expProp["propertyLabel"]["value"],
-                    "value": "",
-                    "formatterURL": "",
-                }
+            results[cwid] = cached
+
+    errors = {}
+    chunks = [missing[i : i + COMPOUND_BATCH_CHUNK] for i in range(0, len(missing), COMPOUND_BATCH_CHUNK)]
+
+    def fetch(chunk):
+        start = time.perf_counter()
+        return compounds_properties(chunk), time.perf_counter() - start
+
+    futures = [compound_executor.submit(fetch, chunk) for chunk in chunks]
+    for chunk, future in zip(chunks, futures):
+        try:
+            fetched, elapsed = future.result()
+        except Exception as e:
+            errors.update((cwid, str(e)) for cwid in chunk)
+            continue
+        for cwid in chunk:
+            results[cwid] = fetched.get(cwid, [])
+            # the compounds of a chunk share the time of its one query
+            cache_stats.set_memoized(
+                get_compound_section, results[cwid], "properties", cwid, elapsed=elapsed / len(chunk)
             )
-    return jsonify(compound_list), 200
+    return {cwid: results[cwid] for cwid in cwids if cwid in results}, errors
 
 
-@app.route("/get_compound_toxicology/<cwid>")
-def show_compounds_toxicology_as_json(cwid):
-    if not is_valid_qid(cwid):
-        return jsonify({"error": "Invalid compound identifier"}), 400
-    compoundwikiEP = "https://compoundcloud.wikibase.cloud/query/sparql"
-    sparqlquery = (
-        "PREFIX wd: <https://compoundcloud.wikibase.cloud/entity/>\n"
-        "PREFIX wdt: <https://compoundcloud.wikibase.cloud/prop/direct/>\n\n"
-        "SELECT DISTINCT ?propertyLabel ?value ?formatterURL\n"
-        "WHERE {\n"
-        "  VALUES ?property { wd:P17 wd:P19 wd:P4 }\n"
-        "  ?property wikibase:directClaim ?valueProp .\n"
-        "  OPTIONAL { wd:" + cwid + " ?valueProp ?value }\n"
-        "  OPTIONAL { ?property wdt:P6 ?formatterURL }\n"
-        '  SERVICE wikibase:label { bd:serviceParam wikibase:language "[AUTO_LANGUAGE],en". }\n'
-        "}"
+@app.route("/api/compounds/properties", methods=["GET", "POST"])
+def api_compounds_properties():
+    """Properties of up to COMPOUND_BATCH_MAX compounds at once.
+
+    Ids are passed as ``?ids=Q1,Q2`` or as ``{"ids": ["Q1", "Q2"]}`` in a
+    POST body. Compounds without data map to an empty list.
+    """
+    if request.method == "POST":
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise BadRequest('expected a JSON body like {"ids": ["Q1", "Q2"]}')
+        cwids = parse_compound_ids(body.get("ids"))
+    else:
+        cwids = parse_compound_ids(request.args.get("ids", ""))
+    results, errors = get_compounds_properties(cwids)
+    return jsonify({"results": results, "errors": errors}), 200 if results else 502
+
+
+@app.route("/api/compounds/search")
+def api_compounds_search():
+    """Compound autocomplete and identity lookup from the local catalog.
+
+    ``q`` is a name prefix, a compound id, an InChIKey (or its first block),
+    an InChI or a SMILES; ``limit`` defaults to 10, at most 50.
+    """
+    query = request.args.get("q", "").strip()
+    limit = min(max(request.args.get("limit", 10, type=int) or 10, 1), 50)
+    catalog = compound_catalog.get()
+    if catalog is None:
+        return jsonify({"error": "The compound catalog is still loading"}), 503
+    response = jsonify({"query": query, "results": catalog.search(query, limit) if query else []})
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
+
+
+@app.cli.command("compounds-precompute")
+@click.option("--section", "sections", multiple=True, type=click.Choice(list(COMPOUND_SECTIONS)),
+              help="Only fill these sections (default: all).")
+@click.option("--workers", default=4, show_default=True, help="Concurrent SPARQL queries.")
+def compounds_precompute(sections, workers):
+    """Fill the compound cache for every compound in the VHP subset."""
+    sections = sections or tuple(COMPOUND_SECTIONS)
+    click.echo(f"{len(wikidata_ids.refresh() or {})} compounds mapped to Wikidata")
+    click.echo(f"{len(compound_catalog.refresh() or ())} compounds in the local catalog")
+    property_dictionary.refresh()
+    cwids = vhp_compound_ids()
+    work = [(section, cwid) for cwid in cwids for section in sections]
+
+    def fill(item):
+        section, cwid = item
+        try:
+            cache_stats.set_memoized(
+                get_compound_section, compute_compound_section(section, cwid), section, cwid
+            )
+            return None
+        except Exception as e:
+            return f"{section}/{cwid}: {e}"
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        errors = [error for error in pool.map(fill, work) if error]
+    for error in errors:
+        click.echo(error, err=True)
+    click.echo(f"{len(work) - len(errors)}/{len(work)} sections cached for {len(cwids)} compounds")
+
+
+################################################################################
+### Site search API
+def search_documents() -> dict[str, dict]:
+    """Everything the site search covers, keyed by '<kind>/<id>'."""
+    documents = {}
+    for case in CASESTUDIES:
+        documents[f"casestudy/{case}"] = {
+            "kind": "casestudy",
+            "id": case,
+            "title": f"{case.capitalize()} Case Study",
+            "url": f"/casestudies/{case}",
+            "name": f"{case} case study",
+        }
+    tools = tools_catalog.get()
+    for key, tool in zip(tools.keys, tools.entries):
+        documents[f"tool/{key}"] = {
+            "kind": "tool",
+            "id": key,
+            "title": tool.get("service") or key,
+            "url": f"/tools/{key}",
+            "name": tool.get("service") or key,
+            "description": tool.get("description") or "",
+            "keywords": [tool.get("stage") or "", tool.get("keywords") or ""],
+        }
+    methods = methods_catalog.get()
+    for key, method in zip(methods.keys, methods.entries):
+        documents[f"method/{key}"] = {
+            "kind": "method",
+            "id": key,
+            "title": method.get("service") or key,
+            "url": f"/methods/{key}",
+            "name": method.get("service") or key,
+            "description": method.get("description") or "",
+            "keywords": [*method["stages"], method["raw"].get("keywords") or ""],
+        }
+    for item in dataset_menu(with_description=True):
+        documents[f"dataset/{item['id']}"] = {
+            "kind": "dataset",
+            "id": item["id"],
+            "title": item["title"] or item["id"],
+            "url": item["url"],
+            "name": item["title"] or "",
+            "description": item["description"],
+            "keywords": item["keywords"],
+        }
+    compounds = compound_catalog.get()
+    for cwid, label, *_ in compounds.records if compounds else ():
+        documents[f"compound/{cwid}"] = {
+            "kind": "compound",
+            "id": cwid,
+            "title": label or cwid,
+            "url": f"/compound/{cwid}",
+            "name": label,
+            "keywords": cwid,
+        }
+    return documents
+
+
+def load_search_documents() -> dict[str, dict]:
+    """``search_documents`` for the rebuilds on the catalog worker thread."""
+    with app.app_context():
+        return search_documents()
+
+
+# Rebuilt in the background when one of the catalogs behind it has changed;
+# searches keep using the previous index until then.
+search_index = CatalogHolder(load_search_documents, SearchIndex, ttl=60, background=True)
+
+
+@app.route("/api/search")
+def api_search():
+    """Ranked search over case studies, tools, methods, datasets and compounds.
+
+    Query arguments: ``q`` (the query), ``limit`` (default 10, at most 50)
+    and ``kind`` (repeatable; casestudy, tool, method, dataset or compound).
+    """
+    query = request.args.get("q", "").strip()
+    limit = min(max(request.args.get("limit", 10, type=int) or 10, 1), 50)
+    kinds = request.args.getlist("kind")
+    index = search_index.get()
+    start = time.perf_counter()
+    results = index.search(query, limit=limit, kinds=kinds) if query else []
+    took_ms = (time.perf_counter() - start) * 1000
+    response = jsonify(
+        {"query": query, "results": results, "took_ms": round(took_ms, 3)}
     )
-    try:
-        compound_dat = wbi_helpers.execute_sparql_query(
-            sparqlquery, endpoint=compoundwikiEP
-        )
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    if len(compound_dat["results"]["bindings"]) == 0:
-        return jsonify({"error": "No data found"}), 404
-    compound_dat = compound_dat["results"]["bindings"]
-    # return jsonify(compound_dat)
-
-    compound_list = []
-    for expProp in compound_dat:
-        print(expProp)
-        if "value" in expProp:
-            compound_list.append(
-                {
-                    "propertyLabel": expProp["propertyLabel"]["value"],
-                    "value": expProp["value"]["value"],
-                }
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response
+
+
+################################################################################
+### JSON API for the catalogs
+def api_response(payload: dict):
+    """JSON response with an ETag, answering If-None-Match with 304."""
+    response = jsonify(payload)
+    response.add_etag()
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response.make_conditional(request)
+
+
+@app.errorhandler(BadRequest)
+def api_bad_request(e):
+    return jsonify({"error": str(e)}), 400
+
+
+def catalog_page(catalog, exclude: tuple[str, ...] = ()) -> dict:
+    """One page of a tools or methods catalog, filtered like the HTML pages.
+
+    Query arguments: ``stage`` and ``reg_q`` (repeatable; regulatory
+    questions by label or field name), ``search``, ``fields``, ``limit``
+    and ``cursor``.
+    """
+    reg_questions = {v["label"]: k for k, v in REG_QUESTIONS.items()}
+    stages = request.args.getlist("stage")
+    selected_questions = request.args.getlist("reg_q")
+    flags = [
+        reg_questions.get(q, q)
+        for q in selected_questions
+        if q in reg_questions or q in REG_QUESTIONS
+    ]
+    search = request.args.get("search", "").strip().lower()
+    fields = parse_fields(request.args.get("fields"))
+    limit = parse_limit(request.args.get("limit"))
+
+    bits = catalog.select(stages, flags, search)
+    total = bits.bit_count()
+    after = decode_cursor(request.args.get("cursor")).get("after")
+    if after is not None:
+        position = catalog.by_id.get(after)
+        if position is None:
+            raise BadRequest("cursor is no longer valid, start again without it")
+        bits &= ~((1 << (position + 1)) - 1)
+
+    items = []
+    has_more = False
+    for position in iter_bits(bits):
+        if len(items) == limit:
+            has_more = True
+            break
+        key = catalog.keys[position]
+        items.append({"id": key, **project(catalog.entries[position], fields, exclude)})
+    next_cursor = encode_cursor({"after": items[-1]["id"]}) if has_more else None
+
+    counts = catalog.facet_counts(stages, flags, search)
+    return {
+        "items": items,
+        "total": total,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "facets": {
+            "stage": counts["stage"],
+            "reg_q": {label: counts["reg_q"].get(field, 0) for label, field in reg_questions.items()},
+        },
+    }
+
+
+@app.route("/api/tools")
+def api_tools():
+    """Tools from service_index.json, see ``catalog_page`` for the arguments."""
+    return api_response(catalog_page(tools_catalog.get()))
+
+
+@app.route("/api/methods")
+def api_methods():
+    """Methods from methods_index.json; the raw index entry only with fields=raw."""
+    return api_response(catalog_page(methods_catalog.get(), exclude=("raw",)))
+
+
+@app.route("/api/data")
+def api_data():
+    """BioStudies studies and Zenodo datasets, filtered like the /data page.
+
+    Query arguments: ``query``, ``filter_case_study``,
+    ``filter_regulatory_question``, ``filter_flow_step``, ``fields``,
+    ``limit`` (at most 100) and ``cursor``.
+    """
+    search_query = request.args.get("query", "", type=str)
+    filters = [
+        (name, request.args.get(f"filter_{name}", "", type=str))
+        for name in ("case_study", "regulatory_question", "flow_step")
+    ]
+    filters = [(name, value) for name, value in filters if value]
+    fields = parse_fields(request.args.get("fields"))
+    limit = min(parse_limit(request.args.get("limit")), 100)
+    page = decode_cursor(request.args.get("cursor")).get("page", 1)
+    if not isinstance(page, int) or page < 1:
+        raise BadRequest("invalid cursor")
+
+    bs_results, zen_results = get_repository_data(
+        search_query, page, limit, filters=filters
+    )
+    items = [
+        {"source": "biostudies", **project(hit, fields)}
+        for hit in bs_results.get("hits", [])
+    ] + [
+        {"source": "zenodo", **project(hit, fields)}
+        for hit in zen_results.get("hits", [])
+    ]
+    total = bs_results.get("total", 0) + zen_results.get("total", 0)
+    return api_response(
+        {
+            "items": items,
+            "total": total,
+            "limit": limit,
+            "next_cursor": encode_cursor({"page": page + 1}) if page * limit < total else None,
+            "errors": {
+                "biostudies": bs_results.get("error"),
+                "zenodo": zen_results.get("error"),
+            },
+        }
+    )
+
+
+@app.route("/api/jobs/<job_id>")
+def api_job(job_id):
+    """Status, progress (``done`` of ``total``) and result of a background job.
+
+    The result fills in while the job runs; pages poll this until
+    ``status`` is "done" or "failed".
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "No such job"}), 404
+    return jsonify(job)
+
+
+################################################################################
+### Bulk exports
+COMPOUND_EXPORT_COLUMNS = ("id", "label", "inchi", "inchikey", "smiles", "formula", "mass")
+DATASET_EXPORT_COLUMNS = (
+    "source",
+    "id",
+    "title",
+    "type",
+    "release_date",
+    "license",
+    "doi",
+    "url",
+    "authors",
+    "case_study",
+    "regulatory_question",
+    "flow_step",
+    "description",
+)
+# Columns that need the full metadata of every BioStudies study
+DATASET_METADATA_COLUMNS = {
+    "license", "doi", "authors", "case_study", "regulatory_question", "flow_step", "description"
+}
+
+
+def compound_export_rows(catalog: CompoundCatalog, positions: list[int], columns: list[str]):
+    """Catalog records, with formula and mass joined in per batch when asked for."""
+    with_properties = "formula" in columns or "mass" in columns
+    for start in range(0, len(positions), COMPOUND_BATCH_MAX):
+        records = [catalog.record(position) for position in positions[start : start + COMPOUND_BATCH_MAX]]
+        properties = {}
+        if with_properties:
+            properties, _ = get_compounds_properties([record["id"] for record in records])
+        for record in records:
+            found = (properties.get(record["id"]) or [{}])[0]
+            yield {**record, "formula": found.get("formula", ""), "mass": found.get("mass", "")}
+
+
+@app.route("/export/compounds")
+def export_compounds():
+    """All compounds of the local catalog as NDJSON or CSV.
+
+    Query arguments: ``format`` (ndjson or csv, else from ``Accept``),
+    ``columns``, ``q`` (name prefix or identifier, as in the compound
+    search) and ``ids`` (comma-separated compound ids).
+    """
+    fmt = export_format(request.args.get("format"), request.accept_mimetypes)
+    columns = parse_columns(request.args.get("columns"), COMPOUND_EXPORT_COLUMNS)
+    catalog = compound_catalog.get()
+    if catalog is None:
+        return jsonify({"error": "The compound catalog is still loading"}), 503
+
+    positions = range(len(catalog))
+    query = request.args.get("q", "").strip()
+    if query:
+        positions = [catalog.by_id[match["id"]] for match in catalog.search(query, len(catalog))]
+    ids = parse_fields(request.args.get("ids"))
+    if ids is not None:
+        wanted = {catalog.by_id[cwid] for cwid in ids if cwid in catalog.by_id}
+        positions = [position for position in positions if position in wanted]
+    return export_response(
+        compound_export_rows(catalog, list(positions), columns), columns, fmt, "compounds"
+    )
+
+
+def dataset_export_row(source: str, hit: dict) -> dict:
+    norm = normalize_biostudies(hit) if source == "biostudies" else normalize_zenodo(hit)
+    metadata = hit.get("metadata") if source == "biostudies" else None
+    metadata = metadata if isinstance(metadata, dict) else {}
+    return {
+        "source": source,
+        "id": norm["id"],
+        "title": norm["title"],
+        "type": norm["type"],
+        "release_date": norm["ReleaseDate"],
+        "license": norm["license"],
+        "doi": norm["doi"],
+        "url": norm["url"],
+        "authors": [author["name"] for author in norm["authors"] if author.get("name")],
+        "case_study": metadata.get("case_study", ""),
+        "regulatory_question": metadata.get("regulatory_question", ""),
+        "flow_step": metadata.get("flow_step", ""),
+        "description": norm["description"],
+    }
+
+
+async def fetch_export_page(
+    source: str, search_query: str, page: int, filters: list, load_metadata: bool
+) -> dict:
+    """One page of ``EXPORT_PAGE_SIZE`` hits from BioStudies or Zenodo, uncached.
+
+    Study metadata is fetched concurrently, without the file checks.
+    """
+    async with upstream_client() as client:
+        if source == "biostudies":
+            extractor = AsyncBioStudiesExtractor(
+                client, collection=BIOSTUDIES_COLLECTION, validate_files=False
             )
-        else:
-            compound_list.append(
-                {"propertyLabel": expProp["propertyLabel"]["value"], "value": ""}
+            return await biostudies_page(
+                extractor, search_query, page, EXPORT_PAGE_SIZE, filters, load_metadata
             )
-    return jsonify(compound_list), 200
+        extractor = AsyncZenodoExtractor(
+            client, community=ZENODO_COMMUNITY, record_type=ZENODO_RECORD_TYPE
+        )
+        return await zenodo_page(extractor, search_query, page, EXPORT_PAGE_SIZE, load_metadata)
+
+
+def dataset_export_hits(source: str, first: dict, search_query: str, filters: list, load_metadata: bool):
+    """Hits of one repository, page by page, starting with the already fetched ``first``."""
+    page, result = 1, first
+    while True:
+        hits = result.get("hits") or []
+        if result.get("error") or not hits:
+            return
+        yield from (dataset_export_row(source, hit) for hit in hits)
+        # filtered searches already read ahead to fill their page
+        page += result.get("pages_fetched", 1)
+        total = result.get("total") or result.get("totalHits") or 0
+        if (page - 1) * EXPORT_PAGE_SIZE >= total or result.get("page_size_met") is False:
+            return
+        result = asyncio.run(fetch_export_page(source, search_query, page, filters, load_metadata))
+
+
+@app.route("/export/datasets")
+def export_datasets():
+    """All BioStudies studies and Zenodo datasets as NDJSON or CSV.
+
+    Takes the filters of ``/api/data`` (``query``, ``filter_case_study``,
+    ``filter_regulatory_question``, ``filter_flow_step``) plus ``format``
+    and ``columns``. The repositories are read ``EXPORT_PAGE_SIZE`` hits at
+    a time while the response is sent; study metadata is only loaded when a
+    filter or one of ``DATASET_METADATA_COLUMNS`` needs it.
+    """
+    fmt = export_format(request.args.get("format"), request.accept_mimetypes)
+    columns = parse_columns(request.args.get("columns"), DATASET_EXPORT_COLUMNS)
+    search_query = request.args.get("query", "", type=str)
+    filters = [
+        (name, request.args.get(f"filter_{name}", "", type=str))
+        for name in ("case_study", "regulatory_question", "flow_step")
+    ]
+    filters = [(name, value) for name, value in filters if value]
+    load_metadata = bool(filters) or not DATASET_METADATA_COLUMNS.isdisjoint(columns)
 
+    # Zenodo datasets are not filtered, like on /data
+    sources = ["biostudies"] if filters else ["biostudies", "zenodo"]
 
-@app.route("/get_compound_expdata/<cwid>")
-def show_compounds_expdata_as_json(cwid):
-    if not is_valid_qid(cwid):
-        return jsonify({"error": "Invalid compound identifier"}), 400
-    compoundwikiEP = "https://compoundcloud.wikibase.cloud/query/sparql"
-    sparqlquery = (
-        "PREFIX wd: <https://compoundcloud.wikibase.cloud/entity/>\n"
-        "PREFIX wdt: <https://compoundcloud.wikibase.cloud/prop/direct/>\n"
-        "PREFIX wid: <http://www.wikidata.org/entity/>\n"
-        "PREFIX widt: <http://www.wikidata.org/prop/direct/>\n"
-        "PREFIX prov: <http://www.w3.org/ns/prov#>\n\n"
-        "SELECT ?qid WHERE {\n"
-        "  wd:P5 wikibase:directClaim ?identifierProp .\n"
-        "  wd:" + cwid + " ?identifierProp ?wikidata .\n"
-        '  BIND (iri(CONCAT("http://www.wikidata.org/entity/", ?wikidata)) AS ?qid)\n'
-        "}"
-    )
-    try:
-        compound_dat = wbi_helpers.execute_sparql_query(
-            sparqlquery, endpoint=compoundwikiEP
+    async def first_pages():
+        return await asyncio.gather(
+            *(fetch_export_page(source, search_query, 1, filters, load_metadata) for source in sources)
         )
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    if not bool(compound_dat):
-        return jsonify({"error": "No data found"}), 404
-    if len(compound_dat["results"]["bindings"]) == 0:
-        return jsonify({"error": "No data found"}), 404
-    compound_dat = compound_dat["results"]["bindings"][0]
-    qid = compound_dat["qid"]["value"]
-    # the next query may be affected by https://github.com/ad-freiburg/qlever-control/issues/187
-    sparqlquery = (
-        "PREFIX wd: <http://www.wikidata.org/entity/>\n"
-        "PREFIX wdt: <http://www.wikidata.org/prop/direct/>\n"
-        "PREFIX prov: <http://www.w3.org/ns/prov#>\n"
-        "PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>\n"
-        "PREFIX pr: <http://www.wikidata.org/prop/reference/>\n"
-        "PREFIX wikibase: <http://wikiba.se/ontology#>\n\n"
-        "SELECT DISTINCT ?propEntityLabel ?value ?unitsLabel ?source ?doi ?statement\n"
-        "WHERE {\n"
-        "    <" + qid + "> ?propp ?statement .\n"
-        "    ?statement a wikibase:BestRank ;\n"
-        "      ?proppsv [ wikibase:quantityAmount ?value ; wikibase:quantityUnit ?units ] .\n"
-        "    #OPTIONAL { ?statement prov:wasDerivedFrom/pr:P248 ?sourceTmp . OPTIONAL { ?sourceTmp wdt:P356 ?doiTmp . } }\n"
-        "    ?property wikibase:claim ?propp ; wikibase:statementValue ?proppsv ; wdt:P1629 ?propEntity ; wdt:P31 wd:Q21077852 .\n"
-        "    ?propEntity @en@rdfs:label ?propEntityLabel .\n"
-        "    ?units @en@rdfs:label ?unitsLabel .\n"
-        '    BIND (COALESCE(IF(BOUND(?sourceTmp), ?sourceTmp, 1/0), "") AS ?source)\n'
-        '    BIND (COALESCE(IF(BOUND(?doiTmp), ?doiTmp, 1/0), "") AS ?doi)\n'
-        "}"
+
+    firsts = asyncio.run(first_pages())
+    errors = [first["error"] for first in firsts if first.get("error") and first["error"] != "No results found."]
+    if len(errors) == len(sources):
+        return jsonify({"error": "; ".join(errors)}), 502
+
+    def rows():
+        for source, first in zip(sources, firsts):
+            yield from dataset_export_hits(source, first, search_query, filters, load_metadata)
+
+    return export_response(rows(), columns, fmt, "datasets")
+
+
+################################################################################
+### Cache invalidation on pushes to the cloud repo
+cloud_invalidator = CloudInvalidator(CLOUD_REPOSITORY)
+
+
+def refresh_index(fetcher, index_url: str, path: str, catalog=None):
+    """Webhook handler factory for one of the xxxx_index.json caches.
+
+    The refresh reads the file pinned to the pushed commit, because the
+    refs/heads/main URL is served from a CDN that lags behind for minutes.
+    A catalog built from the index is rebuilt right after, so no request
+    has to wait for it.
+    """
+
+    def handler(match, sha):
+        def refresh():
+            data = fetch_json_dict(f"{CLOUD_RAW_URL}/{sha}/{path}") if sha else {}
+            with app.app_context():
+                if data:
+                    cache_stats.set_memoized(fetcher, data, index_url)
+                else:
+                    cache_stats.delete_memoized(fetcher, index_url)
+                    fetcher(index_url)
+                if catalog is not None:
+                    catalog.invalidate()
+                    catalog.get()
+
+        return refresh
+
+    return handler
+
+
+cloud_invalidator.register(
+    "services_index",
+    re.escape(SERVICES_PATH),
+    refresh_index(get_json_dict_service, SERVICES_URL, SERVICES_PATH, tools_catalog),
+)
+
+
+def refresh_detail(store: DetailStore, folder: str):
+    """Webhook handler factory for docs/<folder>/<id>.json: replace one item's details."""
+
+    def handler(match, sha):
+        item_id = match.group("item_id")
+        store.invalidate(item_id)
+
+        def refresh():
+            path = f"docs/{folder}/{urllib.parse.quote(item_id)}.json"
+            data = fetch_json_dict(f"{CLOUD_RAW_URL}/{sha}/{path}") if sha else {}
+            if data:
+                store.put(item_id, data)
+            else:
+                store.warm([item_id])
+
+        return refresh
+
+    return handler
+
+
+cloud_invalidator.register(
+    "tool_details",
+    r"docs/service/(?P<item_id>[^/]+)\.json",
+    refresh_detail(tool_detail_store, "service"),
+)
+cloud_invalidator.register(
+    "method_details",
+    r"docs/methods/(?P<item_id>[^/]+)\.json",
+    refresh_detail(method_detail_store, "methods"),
+)
+cloud_invalidator.register(
+    "methods_index",
+    re.escape(METHODS_PATH),
+    refresh_index(get_json_dict, METHODS_URL, METHODS_PATH, methods_catalog),
+)
+
+
+@app.route("/webhooks/github", methods=["POST"])
+def github_webhook():
+    """Receive push events from the cloud repo and refresh the affected caches."""
+    if not GITHUB_WEBHOOK_SECRET:
+        abort(404)
+    body = request.get_data()
+    signature = request.headers.get("X-Hub-Signature-256")
+    if not verify_signature(GITHUB_WEBHOOK_SECRET, body, signature):
+        abort(401)
+
+    event = request.headers.get("X-GitHub-Event", "")
+    if event == "ping":
+        return jsonify({"pong": True})
+    if event != "push":
+        return jsonify({"ignored": f"event {event or '?'} is not handled"}), 202
+
+    # GitHub sends either application/json or a form field named 'payload'
+    try:
+        if request.mimetype == "application/x-www-form-urlencoded":
+            body = urllib.parse.parse_qs(body.decode()).get("payload", [""])[0]
+        payload = json.loads(body)
+    except ValueError:
+        abort(400)
+    if not isinstance(payload, dict):
+        abort(400)
+    return jsonify(cloud_invalidator.handle_push(payload))
+
+
+@app.cli.command("prefetch-details")
+def prefetch_details():
+    """Fetch every tool and method detail document into the local store."""
+    for name, catalog, store in (
+        ("tools", tools_catalog, tool_detail_store),
+        ("methods", methods_catalog, method_detail_store),
+    ):
+        result = store.prefetch(catalog.get().by_id)
+        click.echo(f"{name}: {result['fetched']} fetched, {result['failed']} failed")
+    click.echo(f"{documents.gc()} unreferenced documents removed from {documents.root}")
+
+
+@app.cli.command("replay-webhook")
+@click.argument("fixture", type=click.Path(exists=True, dir_okay=False))
+def replay_webhook(fixture):
+    """Replay a stored GitHub push payload against /webhooks/github."""
+    if not GITHUB_WEBHOOK_SECRET:
+        raise click.ClickException("GITHUB_WEBHOOK_SECRET is not set.")
+    with open(fixture, "rb") as fh:
+        body = fh.read()
+    response = app.test_client().post(
+        "/webhooks/github",
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": "push",
+            "X-Hub-Signature-256": sign_payload(GITHUB_WEBHOOK_SECRET, body),
+        },
     )
-    # return sparqlquery
+    click.echo(f"{response.status_code} {response.get_data(as_text=True)}")
+
+
+################################################################################
+### Offline snapshot bundles
+def fetch_text_live(url: str, timeout: int = 5) -> str | None:
+    """Fetch a text file over HTTP; None on any error."""
     try:
-        sparqlqueryURL = (
-            "https://qlever.cs.uni-freiburg.de/api/wikidata?format=json&query="
-            + urllib.parse.quote_plus(sparqlquery)
-        )
-        # return sparqlqueryURL
-        compound_dat = requests.get(sparqlqueryURL)
-        # return json.loads(compound_dat.content)
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
-    if not bool(compound_dat):
-        return jsonify({"error": "No data found"}), 404
-    compound_dat = json.loads(compound_dat.content)["results"]["bindings"]
-    # return jsonify(compound_dat)
-    compound_list = []
-    for expProp in compound_dat:
-        # return jsonify(expProp)
-        compound_list.append(
-            {
-                "propEntityLabel": expProp["propEntityLabel"]["value"],
-                "value": expProp["value"]["value"],
-                "unitsLabel": expProp["unitsLabel"]["value"],
-                "source": expProp["source"]["value"],
-                "doi": expProp["doi"]["value"],
-                "seeAlso": expProp["statement"]["value"],
-            }
+        resp = requests.get(url, timeout=timeout)
+        return resp.text if resp.status_code == 200 else None
+    except requests.RequestException:
+        return None
+
+
+def snapshot_references(index_url: str, index: dict) -> tuple[list[str], list[str]]:
+    """Detail JSON and metadata markdown URLs referenced by an index."""
+    entries = [entry for entry in index.values() if isinstance(entry, dict)]
+    if index_url == SERVICES_URL:
+        json_urls = [TOOL_DETAIL_URL.format(urllib.parse.quote(key, safe="")) for key in index]
+        text_urls = [
+            f"{SERVICE_DOCS_URL}/{entry['md_file_name']}"
+            for entry in entries
+            if entry.get("md_file_name")
+        ]
+        return json_urls, text_urls
+    if index_url == METHODS_URL:
+        json_urls = [METHOD_DETAIL_URL.format(urllib.parse.quote(key, safe="")) for key in index]
+        text_urls = [
+            entry["meta_data"]
+            for entry in entries
+            if str(entry.get("meta_data") or "").startswith("http")
+        ]
+        return json_urls, text_urls
+    return [], []
+
+
+@app.route("/snapshot/docs/service/<path:name>")
+def snapshot_service_doc(name):
+    """Metadata markdown of a tool, served from the snapshot bundle."""
+    text = snapshot.get_text(f"{SERVICE_DOCS_URL}/{name}") if snapshot else None
+    if text is None:
+        abort(404)
+    return Response(text, mimetype="text/markdown")
+
+
+@app.cli.command("snapshot-build")
+@click.option("--output", default="snapshots", show_default=True, help="Directory to write to.")
+def snapshot_build(output):
+    """Fetch the cloud indexes and everything they reference into one bundle."""
+    bundle, failed = build_snapshot(
+        [SERVICES_URL, METHODS_URL], snapshot_references, fetch_json_live, fetch_text_live
+    )
+    path = bundle.save(output)
+    summary = bundle.summary()
+    click.echo(
+        f"{path}: {summary['documents']} documents, {summary['texts']} text files, "
+        f"{os.path.getsize(path)} bytes"
+    )
+    for url in failed:
+        click.echo(f"  not fetched: {url}", err=True)
+
+
+@app.cli.command("snapshot-diff")
+@click.argument("old", type=click.Path(exists=True, dir_okay=False))
+@click.argument("new", type=click.Path(exists=True, dir_okay=False))
+def snapshot_diff(old, new):
+    """List the files added, removed and changed between two bundles."""
+    before, after = Snapshot.load(old), Snapshot.load(new)
+    click.echo(f"{before.version} -> {after.version}")
+    for section, changes in diff_snapshots(before, after).items():
+        for change, urls in changes.items():
+            for url in urls:
+                click.echo(f"{change:8} {section:9} {url}")
+    if before.digest() == after.digest():
+        click.echo("no differences")
+
+
+################################################################################
+### Static asset build steps
+
+
+@app.cli.command("precompress-static")
+@click.option("--force", is_flag=True, help="Rewrite siblings that are up to date.")
+def precompress_static(force):
+    """Write .gz/.br siblings next to the compressible files in static/."""
+    rows = precompress_tree(app.static_folder, force=force)
+    click.echo(f"Precompressed {len(rows)} files in {app.static_folder}")
+
+
+@app.cli.command("compression-report")
+def compression_report():
+    """Print raw vs. precompressed sizes of static/ per top-level folder."""
+    totals = size_report(app.static_folder)
+    click.echo(f"{'folder':<12}{'files':>8}{'raw':>14}{'gzip':>14}{'br':>14}")
+    for folder, row in sorted(totals.items()):
+        click.echo(
+            f"{folder:<12}{row['files']:>8}{row['raw']:>14,}{row['gzip']:>14,}{row['br']:>14,}"
         )
-    return jsonify(compound_list), 200
+
+
+################################################################################
+### Admin endpoints
+
+
+def require_admin_token():
+    """Abort unless the request carries the configured admin bearer token."""
+    if not ADMIN_TOKEN:
+        abort(404)
+    header = request.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        abort(401)
+
+
+@app.route("/admin/cache/stats")
+def admin_cache_stats():
+    """Per-function cache counters as JSON."""
+    require_admin_token()
+    return jsonify(cache_stats.snapshot())
+
+
+@app.route("/admin/cache/metrics")
+def admin_cache_metrics():
+    """Per-function cache counters in the Prometheus text format."""
+    require_admin_token()
+    return Response(
+        cache_stats.prometheus(), mimetype="text/plain; version=0.0.4"
+    )
 
 
 ################################################################################
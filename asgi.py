@@ -0,0 +1,15 @@
+"""ASGI entry point: ``uvicorn asgi:application``.
+
+Flask runs each request on a worker thread (``VHP_ASGI_THREADS`` of them);
+the async views await their upstream calls concurrently on that request's
+event loop. Flask stays a WSGI app here: a request holds its thread until
+it is done, so a process serves at most ``VHP_ASGI_THREADS`` requests at
+once, async views included. Scale with more threads or ``--workers``.
+"""
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from app import app
+
+application = WSGIMiddleware(app, workers=int(os.environ.get("VHP_ASGI_THREADS", 64)))
@@ -1,16 +1,31 @@
+import asyncio
 import requests
 import json
 import time
 import re
 from urllib.parse import quote
 
+import httpx
+
+from data.transport import run_flow, run_flow_async
+
 
 class BioStudiesExtractor:
     """Class to handle BioStudies API interactions"""
 
     _SPLIT_RE = re.compile(r"^(.*?)(\d+)$")
 
-    def __init__(self, collection: str = ""):
+    HEADERS = {
+        "Accept": "application/json",
+        "User-Agent": "BioStudies-VHP4Safety-App/1.0",
+    }
+
+    # Errors of the transport methods, see ``_get``
+    REQUEST_ERRORS = (requests.exceptions.RequestException,)
+
+    def __init__(self, collection: str = "", validate_files: bool = True):
+        # validate_files: check that every file of a study exists (one HEAD each)
+        self.validate_files = validate_files
         self.base_url = "https://www.ebi.ac.uk/biostudies/api/v1"
         self.ftp_base = "https://ftp.ebi.ac.uk/pub/databases/biostudies/"
         self.studies_url = self.base_url + "/studies"
@@ -23,7 +38,8 @@ class BioStudiesExtractor:
     # -----------------------------
     # ID validation / URL building
     # -----------------------------
-    def validate_study_id(self, study_id):
+    @staticmethod
+    def validate_study_id(study_id):
         """
         Validate BioStudies ID format
 
@@ -180,6 +196,13 @@ class BioStudiesExtractor:
             and f["exists_check"].get("exists") is True
         ]
         return verified[0] if verified else matches[0]
+
+    def _with_rocrate(self, metadata: dict) -> dict:
+        # pick ro-crate link from available files -> requires filename to contain "rocrate"
+        rocrate = self._pick_rocrate_file(metadata.get("files", []))
+        metadata["rocrate_file"] = rocrate  # full dict (name/path/url/size/exists_check...)
+        metadata["rocrate_url"] = rocrate.get("url") if isinstance(rocrate, dict) else None
+        return metadata
     
     # -----------------------------
     # API operations
@@ -194,57 +217,35 @@ class BioStudiesExtractor:
         Returns:
             dict: Parsed metadata or error information
         """
+        return run_flow(self._study_metadata_flow(study_id))
+
+    def _study_metadata_flow(self, study_id):
         try:
             # Validate study ID format
             is_valid, verified_id, validation_error = self.validate_study_id(study_id)
             if not is_valid:
                 return {"error": validation_error}
 
-            url = self.studies_url + f"/{verified_id}"
+            response = yield self._get, self.studies_url + f"/{verified_id}"
+            if response.status_code != 200:
+                return self._study_status_error(response.status_code, verified_id)
 
-            headers = {
-                "Accept": "application/json",
-                "User-Agent": "BioStudies-VHP4Safety-App/1.0",
-            }
+            try:
+                data = response.json()
+            except json.JSONDecodeError as e:
+                return {"error": f"Invalid JSON response from BioStudies API: {str(e)}"}
+            if not data:
+                return {"error": f"Empty response received for study {verified_id}"}
+
+            # Parse metadata first, then build URL using the derived collection (no extra API calls)
+            md = self.parse_metadata(data, validate_files=False)
+            if "error" not in md and self.validate_files:
+                md = yield self._check_files, md
+            web_url = self.build_study_url(verified_id, md.get("collection", "")).get("url", "")
+            return md | {"url": web_url}
 
-            response = requests.get(url, headers=headers, timeout=30)
-
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    if not data:
-                        return {"error": f"Empty response received for study {verified_id}"}
-
-                    # Parse metadata first, then build URL using the derived collection (no extra API calls)
-                    md = self.parse_metadata(data)
-                    collection = md.get("collection", "")
-                    web_url = self.build_study_url(verified_id, collection).get("url", "")
-                    return md | {"url": web_url}
-
-                except json.JSONDecodeError as e:
-                    return {"error": f"Invalid JSON response from BioStudies API: {str(e)}"}
-
-            elif response.status_code == 404:
-                return {
-                    "error": f"Study '{verified_id}' not found in BioStudies database. Please check the ID and try again."
-                }
-            elif response.status_code == 403:
-                return {"error": "Access forbidden. The study may be restricted or private."}
-            elif response.status_code == 500:
-                return {"error": "BioStudies server error. Please try again later."}
-            elif response.status_code == 503:
-                return {"error": "BioStudies service temporarily unavailable. Please try again later."}
-            else:
-                return {"error": f"BioStudies API returned status {response.status_code}. Please try again later."}
-
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. BioStudies server may be slow. Please try again."}
-        except requests.exceptions.ConnectionError:
-            return {"error": "Cannot connect to BioStudies server. Please check your internet connection."}
-        except requests.exceptions.RequestException as e:
-            return {"error": f"Network error: {str(e)}"}
         except Exception as e:
-            return {"error": f"Unexpected error occurred: {str(e)}"}
+            return self._network_error(e)
 
     def get_study_collection(self, study_id):
         """
@@ -271,9 +272,39 @@ class BioStudiesExtractor:
 
         return {"accession": verified_id, "url": url}
 
+    def _study_status_error(self, status_code: int, verified_id: str) -> dict:
+        """Error of a study request that did not answer 200.
+
+        A study that does not exist is also flagged with ``"not_found": True``.
+        """
+        if status_code == 404:
+            return {
+                "error": f"Study '{verified_id}' not found in BioStudies database. Please check the ID and try again.",
+                "not_found": True,
+            }
+        elif status_code == 403:
+            return {"error": "Access forbidden. The study may be restricted or private."}
+        elif status_code == 500:
+            return {"error": "BioStudies server error. Please try again later."}
+        elif status_code == 503:
+            return {"error": "BioStudies service temporarily unavailable. Please try again later."}
+        return {"error": f"BioStudies API returned status {status_code}. Please try again later."}
+
     # -----------------------------
     # Search / list
     # -----------------------------
+    def _search_status_error(self, status_code: int) -> dict:
+        """Error of a search request that did not answer 200."""
+        if status_code == 400:
+            return {"error": "Bad request. Please check your search parameters."}
+        elif status_code == 403:
+            return {"error": "Access forbidden. The collection may be restricted."}
+        elif status_code == 500:
+            return {"error": "BioStudies server error. Please try again later."}
+        elif status_code == 503:
+            return {"error": "BioStudies service temporarily unavailable. Please try again later."}
+        return {"error": f"BioStudies API returned status {status_code}. Please try again later."}
+
     def search_studies(
         self,
         query,
@@ -285,82 +316,41 @@ class BioStudiesExtractor:
         """
         Search for studies in BioStudies database
         """
+        return run_flow(self._search_flow(query, page, page_size, load_metadata, filters))
+
+    def _search_flow(self, query, page, page_size, load_metadata, filters):
         try:
             if not query or not isinstance(query, str):
                 return {"error": "Search query must be a non-empty string."}
 
-            filters_applied = bool(filters)
-            if filters_applied:
+            if filters:
                 load_metadata = True
 
             params = {"query": query, "page": page, "pageSize": page_size}
+            response = yield self._get, self.search_url, params
+            if response.status_code != 200:
+                return self._search_status_error(response.status_code)
 
-            headers = {
-                "Accept": "application/json",
-                "User-Agent": "BioStudies-VHP4Safety-App/1.0",
-            }
-
-            response = requests.get(self.search_url, headers=headers, params=params, timeout=30)
-
-            if response.status_code == 200:
-                try:
-                    data = response.json()
-                    hits = data.get("hits", [])
-                    total_hits = data.get("totalHits", 0)
-
-                    if not data or total_hits == 0:
-                        return {"error": "No results found."}
-
-                    if load_metadata:
-                        hits = self._hit_metadata(hits)
-                    hits = self._hit_url(hits)
-
-                    if filters_applied:
-                        hits = self._apply_filters(hits, filters)
-
-                        page_size_met = len(hits) >= page_size
-                        pages_fetched = 1
-
-                        if not page_size_met:
-                            hits, page_size_met, pages_fetched = self._backfill_filtered_results(
-                                hits, page, page_size, filters, query
-                            )
-
-                        return {
-                            "totalHits": total_hits,
-                            "hits": hits,
-                            "hits_returned": len(hits),
-                            "page": page,
-                            "pageSize": page_size,
-                            "pages_fetched": pages_fetched,
-                            "filters_applied": True,
-                            "page_size_met": page_size_met,
-                        }
+            try:
+                data = response.json()
+            except json.JSONDecodeError as e:
+                return {"error": f"Invalid JSON response from BioStudies API: {str(e)}"}
 
-                    return data | {"hits": hits, "total": total_hits}
+            hits = data.get("hits", [])
+            total_hits = data.get("totalHits", 0)
+            if not data or total_hits == 0:
+                return {"error": "No results found."}
 
-                except json.JSONDecodeError as e:
-                    return {"error": f"Invalid JSON response from BioStudies API: {str(e)}"}
+            if load_metadata:
+                hits = yield self._hit_metadata, hits
+            hits = self._hit_url(hits)
 
-            elif response.status_code == 400:
-                return {"error": "Bad request. Please check your search parameters."}
-            elif response.status_code == 403:
-                return {"error": "Access forbidden. The collection may be restricted."}
-            elif response.status_code == 500:
-                return {"error": "BioStudies server error. Please try again later."}
-            elif response.status_code == 503:
-                return {"error": "BioStudies service temporarily unavailable. Please try again later."}
-            else:
-                return {"error": f"BioStudies API returned status {response.status_code}. Please try again later."}
+            if filters:
+                return (yield from self._filtered_flow(hits, total_hits, page, page_size, filters, query))
+            return data | {"hits": hits, "total": total_hits}
 
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. BioStudies server may be slow. Please try again."}
-        except requests.exceptions.ConnectionError:
-            return {"error": "Cannot connect to BioStudies server. Please check your internet connection."}
-        except requests.exceptions.RequestException as e:
-            return {"error": f"Network error: {str(e)}"}
         except Exception as e:
-            return {"error": f"Unexpected error occurred: {str(e)}"}
+            return self._network_error(e)
 
     def list_studies(
         self,
@@ -373,20 +363,18 @@ class BioStudiesExtractor:
         """
         List studies in the configured BioStudies collection for a specific page.
         """
-        filters_applied = bool(filters)
-        if filters_applied:
+        return run_flow(self._list_flow(page, page_size, include_urls, load_metadata, filters))
+
+    def _list_flow(self, page, page_size, include_urls, load_metadata, filters):
+        if filters:
             load_metadata = True
             include_urls = True
 
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "BioStudies-VHP4Safety-App/1.0",
-        }
         params = {"page": page, "pageSize": page_size}
 
         try:
-            response = requests.get(self.search_url, headers=headers, params=params, timeout=30)
-        except requests.exceptions.RequestException as e:
+            response = yield self._get, self.search_url, params
+        except self.REQUEST_ERRORS as e:
             return {"error": f"Network error during listing: {e}", "total": 0, "hits": []}
 
         if response.status_code != 200:
@@ -407,30 +395,11 @@ class BioStudiesExtractor:
         if include_urls:
             hits = self._hit_url(hits)
         if load_metadata:
-            hits = self._hit_metadata(hits)
-
-        if filters_applied:
-            hits = self._apply_filters(hits, filters)
+            hits = yield self._hit_metadata, hits
 
-            page_size_met = len(hits) >= page_size
-            pages_fetched = 1
-
-            if not page_size_met:
-                hits, page_size_met, pages_fetched = self._backfill_filtered_results(
-                    hits, page, page_size, filters, query=None
-                )
-
-            return {
-                "totalHits": total_hits,
-                "total": total_hits,
-                "hits": hits,
-                "hits_returned": len(hits),
-                "page": page,
-                "pageSize": page_size,
-                "pages_fetched": pages_fetched,
-                "filters_applied": True,
-                "page_size_met": page_size_met,
-            }
+        if filters:
+            result = yield from self._filtered_flow(hits, total_hits, page, page_size, filters, None)
+            return result | {"total": total_hits}
 
         return {"total": total_hits, "hits": hits}
 
@@ -441,13 +410,6 @@ class BioStudiesExtractor:
                 hit["url"] = self.build_study_url(acc).get("url", "")
         return hits
 
-    def _hit_metadata(self, hits: list) -> list:
-        for hit in hits:
-            acc = hit.get("accession") or hit.get("accno")
-            if acc:
-                hit["metadata"] = self.get_study_metadata(acc)
-        return hits
-
     def _apply_filters(self, hits: list, filters: list[tuple]) -> list:
         """
         Filter hits based on metadata field values (case-insensitive AND logic)
@@ -474,14 +436,37 @@ class BioStudiesExtractor:
 
         return filtered
 
-    def _backfill_filtered_results(
+    def _filtered_flow(self, hits, total_hits, page, page_size, filters, query):
+        """Filter a page of hits, backfilling from the next pages if it came up short."""
+        hits = self._apply_filters(hits, filters)
+
+        page_size_met = len(hits) >= page_size
+        pages_fetched = 1
+
+        if not page_size_met:
+            hits, page_size_met, pages_fetched = yield from self._backfill_flow(
+                hits, page, page_size, filters, query
+            )
+
+        return {
+            "totalHits": total_hits,
+            "hits": hits,
+            "hits_returned": len(hits),
+            "page": page,
+            "pageSize": page_size,
+            "pages_fetched": pages_fetched,
+            "filters_applied": True,
+            "page_size_met": page_size_met,
+        }
+
+    def _backfill_flow(
         self,
         initial_hits: list,
         page: int,
         page_size: int,
         filters: list[tuple],
         query: str = None,
-    ) -> tuple:
+    ):
         """
         Backfill filtered results by fetching additional pages until page_size is met or timeout
         """
@@ -498,12 +483,11 @@ class BioStudiesExtractor:
 
             try:
                 params = {"page": current_page, "pageSize": page_size}
-                headers = {"Accept": "application/json", "User-Agent": "BioStudies-VHP4Safety-App/1.0"}
 
                 if query:
                     params["query"] = query
 
-                response = requests.get(self.search_url, headers=headers, params=params, timeout=30)
+                response = yield self._get, self.search_url, params
                 if response.status_code != 200:
                     break
 
@@ -512,7 +496,7 @@ class BioStudiesExtractor:
                 if not next_hits:
                     break
 
-                next_hits = self._hit_metadata(next_hits)
+                next_hits = yield self._hit_metadata, next_hits
                 next_filtered = self._apply_filters(next_hits, filters)
                 filtered.extend(next_filtered)
                 pages_fetched += 1
@@ -523,6 +507,35 @@ class BioStudiesExtractor:
         page_size_met = len(filtered) >= page_size
         return filtered[:page_size], page_size_met, pages_fetched
 
+    # -----------------------------
+    # Transport (blocking; see AsyncBioStudiesExtractor)
+    # -----------------------------
+    def _get(self, url: str, params: dict | None = None):
+        return requests.get(url, headers=self.HEADERS, params=params, timeout=30)
+
+    def _network_error(self, e: Exception) -> dict:
+        if isinstance(e, requests.exceptions.Timeout):
+            return {"error": "Request timed out. BioStudies server may be slow. Please try again."}
+        if isinstance(e, requests.exceptions.ConnectionError):
+            return {"error": "Cannot connect to BioStudies server. Please check your internet connection."}
+        if isinstance(e, requests.exceptions.RequestException):
+            return {"error": f"Network error: {str(e)}"}
+        return {"error": f"Unexpected error occurred: {str(e)}"}
+
+    def _hit_metadata(self, hits: list) -> list:
+        for hit in hits:
+            acc = hit.get("accession") or hit.get("accno")
+            if acc:
+                hit["metadata"] = self.get_study_metadata(acc)
+        return hits
+
+    def _check_files(self, metadata: dict, file_timeout=(3.05, 10)) -> dict:
+        """Fill in ``exists_check`` of every file of parsed metadata."""
+        for f in metadata.get("files", []):
+            if f.get("url"):
+                f["exists_check"] = self.url_exists_no_download(f["url"], timeout=file_timeout)
+        return self._with_rocrate(metadata)
+
     # -----------------------------
     # Metadata parsing (FIXED)
     # -----------------------------
@@ -732,10 +745,7 @@ class BioStudiesExtractor:
             if section:
                 _add_links(section.get("links"))
 
-            # pick ro-crate link from available files -> requires filename to contain "rocrate"
-            rocrate = self._pick_rocrate_file(metadata.get("files", []))
-            metadata["rocrate_file"] = rocrate  # full dict (name/path/url/size/exists_check...)
-            metadata["rocrate_url"] = rocrate.get("url") if isinstance(rocrate, dict) else None
+            self._with_rocrate(metadata)
 
             
             return metadata
@@ -864,4 +874,124 @@ class BioStudiesExtractor:
 
         elif isinstance(section, list):
             for item in section:
-                self._extract_comprehensive_metadata(item, metadata, organization_lookup)
\ No newline at end of file
+                self._extract_comprehensive_metadata(item, metadata, organization_lookup)
+
+
+class AsyncBioStudiesExtractor(BioStudiesExtractor):
+    """BioStudies extractor for async views, on a shared ``httpx.AsyncClient``.
+
+    Same results as ``BioStudiesExtractor``, whose flows it runs with async
+    transport methods: the metadata of all hits of a page, and the existence
+    checks of all their files, are requested concurrently instead of one
+    after the other. The client's connection limits bound how many requests
+    are in flight.
+    """
+
+    REQUEST_ERRORS = (httpx.HTTPError,)
+
+    def __init__(self, client: httpx.AsyncClient, collection: str = "", validate_files: bool = True):
+        super().__init__(collection=collection, validate_files=validate_files)
+        self.client = client
+
+    async def get_study_metadata(self, study_id):
+        """Async ``BioStudiesExtractor.get_study_metadata``."""
+        return await run_flow_async(self._study_metadata_flow(study_id))
+
+    async def search_studies(
+        self,
+        query,
+        page=1,
+        page_size=10,
+        load_metadata: bool = True,
+        filters: tuple[tuple] | None = None,
+    ) -> dict:
+        """Async ``BioStudiesExtractor.search_studies``."""
+        return await run_flow_async(self._search_flow(query, page, page_size, load_metadata, filters))
+
+    async def list_studies(
+        self,
+        page=1,
+        page_size=50,
+        include_urls: bool = False,
+        load_metadata: bool = False,
+        filters: tuple[tuple] | None = None,
+    ) -> dict:
+        """Async ``BioStudiesExtractor.list_studies``."""
+        return await run_flow_async(self._list_flow(page, page_size, include_urls, load_metadata, filters))
+
+    # -----------------------------
+    # Transport
+    # -----------------------------
+    async def _get(self, url: str, params: dict | None = None):
+        return await self.client.get(url, headers=self.HEADERS, params=params)
+
+    def _network_error(self, e: Exception) -> dict:
+        if isinstance(e, httpx.TimeoutException):
+            return {"error": "Request timed out. BioStudies server may be slow. Please try again."}
+        if isinstance(e, httpx.ConnectError):
+            return {"error": "Cannot connect to BioStudies server. Please check your internet connection."}
+        if isinstance(e, httpx.HTTPError):
+            return {"error": f"Network error: {str(e)}"}
+        return {"error": f"Unexpected error occurred: {str(e)}"}
+
+    async def _hit_metadata(self, hits: list) -> list:
+        with_accession = [hit for hit in hits if hit.get("accession") or hit.get("accno")]
+        metadata = await asyncio.gather(
+            *(self.get_study_metadata(hit.get("accession") or hit.get("accno")) for hit in with_accession)
+        )
+        for hit, md in zip(with_accession, metadata):
+            hit["metadata"] = md
+        return hits
+
+    async def _check_files(self, metadata: dict, file_timeout=(3.05, 10)) -> dict:
+        """Fill in ``exists_check`` of every file of parsed metadata, concurrently."""
+        files = [f for f in metadata.get("files", []) if f.get("url")]
+        checks = await asyncio.gather(
+            *(self.url_exists_no_download(f["url"], timeout=file_timeout) for f in files)
+        )
+        for f, check in zip(files, checks):
+            f["exists_check"] = check
+        return self._with_rocrate(metadata)
+
+    async def url_exists_no_download(self, url: str, timeout=(3.05, 10)):
+        """Async ``BioStudiesExtractor.url_exists_no_download``."""
+        result = {
+            "url": url,
+            "exists": False,
+            "status_code": None,
+            "content_length": None,
+            "final_url": None,
+            "error": None,
+            "method": None,
+        }
+        if not url:
+            result["error"] = "Empty URL"
+            return result
+
+        connect, read = timeout
+        timeout = httpx.Timeout(read, connect=connect)
+        try:
+            r = await self.client.head(url, follow_redirects=True, timeout=timeout)
+            result["status_code"] = r.status_code
+            result["final_url"] = str(r.url)
+            result["method"] = "HEAD"
+            if r.status_code == 200:
+                result["exists"] = True
+                result["content_length"] = r.headers.get("Content-Length")
+                return result
+
+            if r.status_code in (403, 405):
+                async with self.client.stream(
+                    "GET", url, follow_redirects=True, headers={"Range": "bytes=0-0"}, timeout=timeout
+                ) as rg:
+                    result["status_code"] = rg.status_code
+                    result["final_url"] = str(rg.url)
+                    result["method"] = "GET_RANGE"
+                    if rg.status_code in (200, 206):
+                        result["exists"] = True
+                        result["content_length"] = rg.headers.get("Content-Length")
+            return result
+
+        except httpx.HTTPError as e:
+            result["error"] = str(e)
+            return result
@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import Any, Callable, Generic, Iterable, TypeVar
+
+from data.cloud.facets import ALL, ANY, FacetIndex, iter_bits
+
+# Mapping the URLs with glossary IDs to their text values.
+STAGE_MAPPING = {
+    "https://vhp4safety.github.io/glossary#VHP0000153": "Chemical Characteristics and Hazard Identification",
+    "https://vhp4safety.github.io/glossary#VHP0000154": "Exposure",
+    "https://vhp4safety.github.io/glossary#VHP0000155": "Toxicokinetics",
+    "https://vhp4safety.github.io/glossary#VHP0000156": "Toxicodynamics",
+    "https://vhp4safety.github.io/glossary#VHP0000158": "Adverse Outcome",
+    # Legacy mappings (superseded by the Process Flow Step URIs above)
+    "https://vhp4safety.github.io/glossary#VHP0000056": "ADME",
+    "https://vhp4safety.github.io/glossary#VHP0000102": "Hazard Assessment",
+    "https://vhp4safety.github.io/glossary#VHP0000148": "Chemical Information",
+    "https://vhp4safety.github.io/glossary#VHP0000149": "General",
+}
+
+SERVICE_DOCS_URL = "https://raw.githubusercontent.com/VHP4Safety/cloud/main/docs/service"
+PLACEHOLDER_LOGO = "https://github.com/VHP4Safety/ui-design/blob/main/static/images/logo.png"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens of a name or search query."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def order_stages(stages: Iterable[str]) -> tuple[str, ...]:
+    """Sort stage names, forcing "Other" to be the last one."""
+    ordered = sorted(stages)
+    if "Other" in ordered:
+        ordered.remove("Other")
+        ordered.append("Other")
+    return tuple(ordered)
+
+
+def normalize_tool(raw: dict[str, Any], metadata_url: str = SERVICE_DOCS_URL) -> dict[str, Any]:
+    """Derive the fields the tools templates expect from a service_index.json entry.
+
+    ``metadata_url`` is where the metadata markdown files are served from.
+    """
+    tool = dict(raw)
+
+    # Checking if the full URL is in the mapping and updating the stage.
+    stage = tool.get("stage", "")
+    if stage in STAGE_MAPPING:
+        tool["stage"] = STAGE_MAPPING[stage]
+    elif stage in ("NA", "Unknown"):
+        # Combining "NA" and "Unknown" stages in a single stage-type, "Other".
+        tool["stage"] = "Other"
+
+    md_name = tool.get("md_file_name")
+    png_name = tool.get("png_file_name") or ""
+
+    tool["url"] = f"https://cloud.vhp4safety.nl/service/{tool.get('html_name')}"
+    tool["meta_data"] = f"{metadata_url}/{md_name}" if md_name else "md file not found"
+
+    # The common placeholder logo is not shown
+    if png_name == PLACEHOLDER_LOGO:
+        tool["png"] = None
+    else:
+        tool["png"] = png_name if png_name.startswith("http") else f"{SERVICE_DOCS_URL}/{png_name}"
+
+    tool["inst_url"] = tool.get("inst_url") or "no_url"
+    return tool
+
+
+def split_stages(value: str | None) -> tuple[str, ...]:
+    """Split a comma-separated stage field into trimmed stage names."""
+    return tuple(part.strip() for part in (value or "").split(",") if part.strip())
+
+
+def normalize_method(raw: dict[str, Any]) -> dict[str, Any]:
+    """Derive the fields the methods templates expect from a methods_index.json entry."""
+    return {
+        "id": raw.get("id", ""),
+        # template expects 'service' and 'description'
+        "service": raw.get("method") or raw.get("method_name_content") or raw.get("method_name") or "",
+        "description": raw.get("method_description_content") or raw.get("method_description") or "",
+        # main_url used for method webpage (catalog page)
+        "main_url": raw.get("catalog_webpage_url") or "no_url",
+        # interactive instance not present in methods index
+        "inst_url": raw.get("inst_url") or "no_url",
+        # metadata md file not available in index; keep empty string
+        "meta_data": raw.get("meta_data") or "",
+        # placeholder/no png
+        "png": None,
+        "stages": split_stages(raw.get("vhp4safety_workflow_stage_content")),
+        # keep original raw data for potential details page
+        "raw": MappingProxyType(raw),
+    }
+
+
+class Catalog(ABC):
+    """Normalized records with bitset indexes, built once per index.
+
+    Records are read-only mappings in index order. Stages and the
+    regulatory-question flags that are "true" are kept in a ``FacetIndex``
+    (facets ``stage`` and ``reg_q``); ``by_token`` maps each lowercase word
+    of a record name to the bitset of records having it.
+    """
+
+    def __init__(self, index: dict[str, Any], flag_fields: Iterable[str] = ()):
+        raws = [
+            (key, raw)
+            for key, raw in (index.items() if isinstance(index, dict) else [])
+            if isinstance(raw, dict)
+        ]
+        flag_fields = list(flag_fields)
+        facets = FacetIndex(len(raws), {"stage": ANY, "reg_q": ALL})
+        facets.declare("reg_q", flag_fields)
+        by_token: dict[str, int] = {}
+        records = []
+        for position, (_, raw) in enumerate(raws):
+            record = self.normalize(raw)
+            records.append(MappingProxyType(record))
+            for stage in self.stages_of(record):
+                facets.add("stage", stage, position)
+            for field in flag_fields:
+                if str(raw.get(field, "")).lower() == "true":
+                    facets.add("reg_q", field, position)
+            for token in tokenize(record.get("service", "")):
+                by_token[token] = by_token.get(token, 0) | (1 << position)
+
+        self.entries: tuple[MappingProxyType, ...] = tuple(records)
+        # the index entries the records were normalized from, same order
+        self.raws: tuple[MappingProxyType, ...] = tuple(MappingProxyType(raw) for _, raw in raws)
+        # keyed like the index itself, which is what the detail routes look up
+        self.keys = tuple(key for key, _ in raws)
+        self.by_id = MappingProxyType({key: position for position, key in enumerate(self.keys)})
+        self.facets = facets
+        self.by_token = MappingProxyType(by_token)
+        self.stages = order_stages(facets.facets["stage"])
+        self.all = facets.all
+        # (id, title) for the navbar dropdowns, sorted by title
+        self.menu = tuple(
+            sorted(
+                (
+                    {"id": key, "title": record.get("service") or key}
+                    for key, record in zip(self.keys, records)
+                ),
+                key=lambda item: item["title"].lower(),
+            )
+        )
+
+    @abstractmethod
+    def normalize(self, raw: dict[str, Any]) -> dict[str, Any]:
+        """The record the templates expect for an index entry."""
+
+    @abstractmethod
+    def stages_of(self, record: dict[str, Any]) -> Iterable[str]:
+        """The stage names a normalized record is listed under."""
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, record_id: str) -> MappingProxyType | None:
+        position = self.by_id.get(record_id)
+        return None if position is None else self.entries[position]
+
+    def get_raw(self, record_id: str) -> MappingProxyType | None:
+        """The index entry of a record, as it was before normalizing."""
+        position = self.by_id.get(record_id)
+        return None if position is None else self.raws[position]
+
+    def match_name(self, query: str) -> int:
+        """Bitset of records whose name contains ``query`` (case-insensitive).
+
+        Every query token narrows the candidates to records with a name token
+        containing it; the remaining few are checked against the full query.
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.all
+        candidates = self.all
+        for part in tokenize(query):
+            hits = 0
+            for token, bits in self.by_token.items():
+                if part in token:
+                    hits |= bits
+            candidates &= hits
+            if not candidates:
+                return 0
+        matched = 0
+        for position in iter_bits(candidates):
+            if query in (self.entries[position].get("service") or "").lower():
+                matched |= 1 << position
+        return matched
+
+    def selection(self, stages: Iterable[str] = (), flags: Iterable[str] = ()) -> dict:
+        return {"stage": list(stages), "reg_q": list(flags)}
+
+    def select(
+        self,
+        stages: Iterable[str] = (),
+        flags: Iterable[str] = (),
+        search: str = "",
+    ) -> int:
+        """Bitset of records matching any of ``stages``, all of ``flags`` and the name search."""
+        base = self.match_name(search) if search else self.all
+        return self.facets.select(self.selection(stages, flags), base)
+
+    def facet_counts(
+        self,
+        stages: Iterable[str] = (),
+        flags: Iterable[str] = (),
+        search: str = "",
+    ) -> dict[str, dict[str, int]]:
+        """Number of results per stage and per flag for the current selection."""
+        base = self.match_name(search) if search else self.all
+        return self.facets.counts(self.selection(stages, flags), base)
+
+    def records(self, bits: int | None = None) -> list[MappingProxyType]:
+        """Records of the set bits (all records by default), in catalog order."""
+        if bits is None:
+            return list(self.entries)
+        return [self.entries[position] for position in iter_bits(bits)]
+
+
+class ToolsCatalog(Catalog):
+    """Catalog of service_index.json; one stage per tool."""
+
+    def __init__(
+        self,
+        index: dict[str, Any],
+        flag_fields: Iterable[str] = (),
+        metadata_url: str = SERVICE_DOCS_URL,
+    ):
+        self.metadata_url = metadata_url
+        super().__init__(index, flag_fields)
+
+    def normalize(self, raw):
+        return normalize_tool(raw, self.metadata_url)
+
+    def stages_of(self, record):
+        return (record["stage"],) if record.get("stage") else ()
+
+
+class MethodsCatalog(Catalog):
+    """Catalog of methods_index.json; stages are pre-split per method."""
+
+    def normalize(self, raw):
+        return normalize_method(raw)
+
+    def stages_of(self, record):
+        return record["stages"]
+
+
+T = TypeVar("T")
+
+
+def index_digest(index: dict[str, Any]) -> str:
+    """Content hash of an index, used to tell whether a rebuild is needed."""
+    encoded = json.dumps(index, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class CatalogHolder(Generic[T]):
+    """Keeps a catalog built from an index until the index changes.
+
+    After ``ttl`` seconds (or an explicit ``invalidate``) the index is loaded
+    again, and the catalog is only rebuilt if its content hash differs. When
+    loading fails (an empty index) the previous catalog is kept, or an empty
+    one is built if there is none yet, and the index is loaded again after
+    ``retry_after`` seconds instead of ``ttl``.
+    ``on_build`` is called with every newly built catalog.
+
+    With ``background`` only the first ``get`` waits for a build: later
+    checks run on a worker thread, and the previous catalog is returned
+    until the new one is ready.
+    """
+
+    def __init__(
+        self,
+        load_index: Callable[[], dict],
+        build: Callable[[dict], T],
+        ttl: int,
+        on_build: Callable[[T], None] | None = None,
+        background: bool = False,
+        retry_after: int = 30,
+    ):
+        self.load_index = load_index
+        self.build = build
+        self.ttl = ttl
+        self.retry_after = min(retry_after, ttl)
+        self.on_build = on_build
+        self._catalog: T | None = None
+        self._digest: str | None = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-refresh") if background else None
+        )
+        self._refresh: Future | None = None
+        # not self._lock, which a running check holds while it loads
+        self._refresh_lock = threading.Lock()
+
+    def get(self) -> T:
+        catalog = self._catalog
+        if catalog is not None and time.time() < self._next_check:
+            return catalog
+        if catalog is not None and self._executor is not None:
+            self.refresh_in_background()
+            return catalog
+        return self._check()
+
+    def refresh_in_background(self) -> Future:
+        """Check the index on the worker thread, unless a check is running."""
+        with self._refresh_lock:
+            if self._refresh is None or self._refresh.done():
+                self._refresh = self._executor.submit(self._check)
+            return self._refresh
+
+    def _check(self) -> T:
+        with self._lock:
+            if self._catalog is not None and time.time() < self._next_check:
+                return self._catalog
+            index = self.load_index()
+            if index or self._catalog is None:
+                digest = index_digest(index)
+                if digest != self._digest:
+                    self._catalog = self.build(index)
+                    self._digest = digest
+                    if self.on_build is not None:
+                        self.on_build(self._catalog)
+            self._next_check = time.time() + (self.ttl if index else self.retry_after)
+            return self._catalog
+
+    def invalidate(self) -> None:
+        """Check the index again on the next ``get``."""
+        self._next_check = 0.0
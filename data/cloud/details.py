@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable
+
+from data.cloud.documents import DocumentStore
+
+
+class DetailStore:
+    """Per-item cache of the detail JSON documents of tools or methods.
+
+    Entries are fetched concurrently on a small thread pool. A fresh entry is
+    returned as is; a stale one is returned too, while a refresh runs in the
+    background. Only items that were never fetched make a caller wait, and
+    only up to the given deadline. Failed fetches keep the previous document
+    and are retried after ``retry_after`` seconds instead of on every request.
+
+    With a ``DocumentStore`` every fetched document is also kept on disk
+    under ``kind``, and items missing from memory are read from there first,
+    so after a restart pages render from local data while refreshing.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], dict | None],
+        ttl: int,
+        kind: str = "",
+        documents: DocumentStore | None = None,
+        retry_after: int = 60,
+        max_workers: int = 8,
+    ):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.kind = kind
+        self.documents = documents
+        self.retry_after = retry_after
+        # item id -> (fetched_at, document or None)
+        self._entries: dict[str, tuple[float, dict | None]] = {}
+        # item id -> time of the last failed fetch
+        self._failures: dict[str, float] = {}
+        self._pending: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{kind or 'detail'}-fetch"
+        )
+        # runs bulk prefetches one at a time, outside the fetch pool
+        self._bulk = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{kind or 'detail'}-bulk")
+
+    def _fetch(self, item_id: str) -> dict | None:
+        try:
+            return self.fetch(item_id)
+        except Exception:
+            return None
+
+    def _store(self, documents: dict[str, dict], failed: Iterable[str], now: float) -> None:
+        failed = list(failed)
+        self._hydrate(failed)
+        with self._lock:
+            for item_id, document in documents.items():
+                self._failures.pop(item_id, None)
+                self._entries[item_id] = (now, document)
+            for item_id in failed:
+                self._failures[item_id] = now
+                self._entries.setdefault(item_id, (now, None))
+        if self.documents is not None and documents:
+            self.documents.put_many(self.kind, documents, now)
+
+    def _load(self, item_id: str) -> None:
+        try:
+            document = self._fetch(item_id)
+            if document is None:
+                self._store({}, [item_id], time.time())
+            else:
+                self._store({item_id: document}, [], time.time())
+        finally:
+            with self._lock:
+                self._pending.pop(item_id, None)
+
+    def _hydrate(self, item_ids: Iterable[str]) -> None:
+        """Copy items missing from memory in from the document store.
+
+        Must be called without the lock: the documents are read from disk
+        unlocked, and only added if no fetch stored a newer one meanwhile.
+        """
+        if self.documents is None:
+            return
+        with self._lock:
+            missing = [item_id for item_id in item_ids if item_id not in self._entries]
+        stored = {}
+        for item_id in missing:
+            entry = self.documents.get(self.kind, item_id)
+            if entry is not None:
+                stored[item_id] = entry
+        if stored:
+            with self._lock:
+                for item_id, entry in stored.items():
+                    self._entries.setdefault(item_id, entry)
+
+    def _schedule(self, item_id: str, now: float):
+        """Start a fetch for ``item_id`` unless one is running or it just failed.
+
+        Must be called with the lock held. Returns the future of the fetch, or
+        None when nothing was scheduled.
+        """
+        if item_id in self._pending:
+            return self._pending[item_id]
+        failed_at = self._failures.get(item_id)
+        if failed_at is not None and now - failed_at < self.retry_after:
+            return None
+        future = self._executor.submit(self._load, item_id)
+        self._pending[item_id] = future
+        return future
+
+    def _request(self, item_ids: list[str]) -> list:
+        """Schedule fetches of missing and stale entries.
+
+        Returns the futures of the items that have no document yet, which
+        are the ones worth waiting for.
+        """
+        self._hydrate(item_ids)
+        now = time.time()
+        waiting = []
+        with self._lock:
+            for item_id in item_ids:
+                entry = self._entries.get(item_id)
+                # an item that never fetched is retried once retry_after has passed
+                if entry is not None and entry[1] is not None and now - entry[0] < self.ttl:
+                    continue
+                future = self._schedule(item_id, now)
+                if future is not None and (entry is None or entry[1] is None):
+                    waiting.append(future)
+        return waiting
+
+    def _documents(self, item_ids: list[str]) -> dict[str, dict]:
+        with self._lock:
+            return {
+                item_id: self._entries[item_id][1]
+                for item_id in item_ids
+                if item_id in self._entries and self._entries[item_id][1] is not None
+            }
+
+    def get_many(self, item_ids: Iterable[str], wait_seconds: float = 0) -> dict[str, dict]:
+        """Return the cached documents for ``item_ids``.
+
+        Missing and stale entries are fetched in the background. Callers that
+        cannot do without the missing ones may wait up to ``wait_seconds``
+        for them; items that are still missing after that are left out.
+        """
+        item_ids = [item_id for item_id in dict.fromkeys(item_ids) if item_id]
+        waiting = self._request(item_ids)
+        if waiting and wait_seconds > 0:
+            wait(waiting, timeout=wait_seconds)
+        return self._documents(item_ids)
+
+    async def get_many_async(self, item_ids: Iterable[str], wait_seconds: float = 0) -> dict[str, dict]:
+        """``get_many`` for async views: waiting does not block the event loop."""
+        item_ids = [item_id for item_id in dict.fromkeys(item_ids) if item_id]
+        waiting = self._request(item_ids)
+        if waiting and wait_seconds > 0:
+            await asyncio.wait([asyncio.wrap_future(future) for future in waiting], timeout=wait_seconds)
+        return self._documents(item_ids)
+
+    def get(self, item_id: str, wait_seconds: float = 5) -> dict | None:
+        """Return the document of a single item, or None if it cannot be fetched."""
+        return self.get_many([item_id], wait_seconds).get(item_id)
+
+    async def get_async(self, item_id: str, wait_seconds: float = 5) -> dict | None:
+        """``get`` for async views."""
+        return (await self.get_many_async([item_id], wait_seconds)).get(item_id)
+
+    def warm(self, item_ids: Iterable[str]) -> None:
+        """Fetch missing and stale entries in the background."""
+        self.get_many(item_ids)
+
+    def prefetch(self, item_ids: Iterable[str]) -> dict[str, int]:
+        """Fetch all ``item_ids`` at once, regardless of their age.
+
+        Used after an index refresh. The fetches run concurrently and their
+        results are written to the document store in one go. Blocks until
+        done; ``prefetch_in_background`` does not.
+        """
+        item_ids = [item_id for item_id in dict.fromkeys(item_ids) if item_id]
+        documents = dict(zip(item_ids, self._executor.map(self._fetch, item_ids)))
+        fetched = {item_id: doc for item_id, doc in documents.items() if doc is not None}
+        failed = [item_id for item_id, doc in documents.items() if doc is None]
+        self._store(fetched, failed, time.time())
+        return {"fetched": len(fetched), "failed": len(failed)}
+
+    def prefetch_in_background(self, item_ids: Iterable[str]):
+        """Run ``prefetch`` on the bulk worker; returns its future."""
+        return self._bulk.submit(self.prefetch, list(item_ids))
+
+    def put(self, item_id: str, document: dict) -> None:
+        """Store a document that is known to be current, e.g. from a webhook."""
+        self._store({item_id: document}, [], time.time())
+
+    def invalidate(self, item_id: str) -> None:
+        """Mark an entry stale so the next lookup refreshes it.
+
+        The old document is kept, so pages keep rendering from it until the
+        refresh has finished.
+        """
+        self._hydrate([item_id])
+        with self._lock:
+            self._failures.pop(item_id, None)
+            entry = self._entries.get(item_id)
+            if entry is not None:
+                self._entries[item_id] = (0.0, entry[1])
+
+    def snapshot(self) -> dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "entries": sum(1 for _, doc in self._entries.values() if doc is not None),
+                "fresh": sum(
+                    1
+                    for fetched_at, doc in self._entries.values()
+                    if doc is not None and now - fetched_at < self.ttl
+                ),
+                "failing": len(self._failures),
+                "pending": len(self._pending),
+                "stored": len(self.documents.ids(self.kind)) if self.documents else None,
+            }
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any
+from urllib.parse import quote, unquote
+
+
+def canonical_json(document: Any) -> bytes:
+    """Stable encoding of a document, so equal documents hash equally."""
+    return json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class DocumentStore:
+    """Local content-addressed store for the cloud repo's detail documents.
+
+    Documents are written once under ``blobs/<aa>/<sha256>.json``; a small
+    ref file per document, ``refs/<kind>/<id>.json``, holds the digest of its
+    current version and the time it was fetched. Unchanged documents
+    therefore cost nothing to store again, storing one document writes one
+    ref, and each ref is replaced atomically, so several processes can share
+    the store. It survives restarts, so detail pages can be rendered from
+    local data straight away.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._refs_root = os.path.join(root, "refs")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], f"{digest}.json")
+
+    def _ref_path(self, kind: str, doc_id: str) -> str:
+        return os.path.join(self._refs_root, quote(kind, safe=""), f"{quote(doc_id, safe='')}.json")
+
+    def _ref(self, kind: str, doc_id: str) -> dict[str, Any] | None:
+        try:
+            with open(self._ref_path(kind, doc_id), encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def put_many(self, kind: str, documents: dict[str, Any], fetched_at: float | None = None) -> int:
+        """Store documents by id; returns how many of them changed."""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        changed = 0
+        for doc_id, document in documents.items():
+            data = canonical_json(document)
+            digest = hashlib.sha256(data).hexdigest()
+            path = self._blob_path(digest)
+            if not os.path.exists(path):
+                _write_atomic(path, data)
+            if (self._ref(kind, doc_id) or {}).get("digest") != digest:
+                changed += 1
+            ref = {"digest": digest, "fetched_at": fetched_at}
+            _write_atomic(self._ref_path(kind, doc_id), json.dumps(ref).encode())
+        return changed
+
+    def put(self, kind: str, doc_id: str, document: Any, fetched_at: float | None = None) -> None:
+        self.put_many(kind, {doc_id: document}, fetched_at)
+
+    def get(self, kind: str, doc_id: str) -> tuple[float, Any] | None:
+        """Return ``(fetched_at, document)`` of the stored version, if any."""
+        ref = self._ref(kind, doc_id)
+        if ref is None:
+            return None
+        try:
+            with open(self._blob_path(ref["digest"]), "rb") as fh:
+                return ref["fetched_at"], json.loads(fh.read())
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def ids(self, kind: str) -> list[str]:
+        try:
+            names = os.listdir(os.path.join(self._refs_root, quote(kind, safe="")))
+        except OSError:
+            return []
+        return sorted(unquote(name[:-5]) for name in names if name.endswith(".json"))
+
+    def refs(self) -> dict[str, dict[str, Any]]:
+        try:
+            kinds = os.listdir(self._refs_root)
+        except OSError:
+            return {}
+        refs = {}
+        for kind in map(unquote, kinds):
+            for doc_id in self.ids(kind):
+                ref = self._ref(kind, doc_id)
+                if ref is not None:
+                    refs[f"{kind}/{doc_id}"] = ref
+        return refs
+
+    def gc(self) -> int:
+        """Delete blobs no ref points to; returns how many were removed."""
+        live = {value.get("digest") for value in self.refs().values()}
+        removed = 0
+        for root, _, files in os.walk(os.path.join(self.root, "blobs")):
+            for name in files:
+                if name.endswith(".json") and name[:-5] not in live:
+                    os.remove(os.path.join(root, name))
+                    removed += 1
+        return removed
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Iterable, Iterator
+
+# How the selected values of one facet combine
+ANY = "any"  # an item matches if it has any selected value (stages)
+ALL = "all"  # an item matches only if it has all selected values (reg. questions)
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class FacetIndex:
+    """Facet values stored as bitsets (Python ints) over catalog positions.
+
+    Bit ``i`` of ``facets[name][value]`` is set when the item at position
+    ``i`` has that value. Selections and counts are then a handful of bitwise
+    operations per facet value, independent of the number of items.
+    """
+
+    def __init__(self, size: int, modes: dict[str, str]):
+        self.size = size
+        self.all = (1 << size) - 1
+        self.modes = dict(modes)
+        self.facets: dict[str, dict[str, int]] = {name: {} for name in modes}
+
+    def add(self, facet: str, value: str, position: int) -> None:
+        values = self.facets[facet]
+        values[value] = values.get(value, 0) | (1 << position)
+
+    def declare(self, facet: str, values: Iterable[str]) -> None:
+        """Make sure ``values`` are listed, even if no item has them."""
+        for value in values:
+            self.facets[facet].setdefault(value, 0)
+
+    def mask(self, facet: str, values: Iterable[str]) -> int:
+        """Items matching the selected ``values`` of one facet."""
+        values = list(values)
+        if not values:
+            return self.all
+        lookup = self.facets[facet]
+        if self.modes[facet] == ANY:
+            bits = 0
+            for value in values:
+                bits |= lookup.get(value, 0)
+            return bits
+        bits = self.all
+        for value in values:
+            bits &= lookup.get(value, 0)
+        return bits
+
+    def select(self, selection: dict[str, Iterable[str]], base: int | None = None) -> int:
+        """Items matching every facet of ``selection`` and the ``base`` bitset."""
+        bits = self.all if base is None else base
+        for facet, values in selection.items():
+            bits &= self.mask(facet, values)
+        return bits
+
+    def counts(
+        self, selection: dict[str, Iterable[str]], base: int | None = None
+    ) -> dict[str, dict[str, int]]:
+        """Result size for every facet value, given the current selection.
+
+        For an ``ANY`` facet the count of a value ignores the facet's own
+        selection (what picking that value as well would add up to); for an
+        ``ALL`` facet it is the current result narrowed to that value.
+        """
+        base = self.all if base is None else base
+        masks = {facet: self.mask(facet, selection.get(facet, ())) for facet in self.facets}
+        counts = {}
+        for facet, values in self.facets.items():
+            bits = base
+            for other, mask in masks.items():
+                if other != facet or self.modes[facet] == ALL:
+                    bits &= mask
+            counts[facet] = {value: (bits & vbits).bit_count() for value, vbits in values.items()}
+        return counts
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+# Bumped when the layout of a bundle changes incompatibly
+SNAPSHOT_FORMAT = 1
+
+
+class Snapshot:
+    """Versioned bundle of everything the app fetches from the cloud repo.
+
+    A bundle is one gzip-compressed JSON file holding the JSON documents
+    (indexes, tool and method details) and text files (metadata markdown)
+    keyed by the URL they were fetched from, so the app can answer those
+    fetches from the bundle instead of the network.
+    """
+
+    def __init__(
+        self,
+        documents: dict[str, Any],
+        texts: dict[str, str],
+        created_at: str | None = None,
+        version: str | None = None,
+    ):
+        self.documents = documents
+        self.texts = texts
+        self.created_at = created_at or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        self.version = version or f"{self.created_at}-{self.digest()[:12]}"
+
+    def digest(self) -> str:
+        encoded = json.dumps(
+            {"documents": self.documents, "texts": self.texts}, sort_keys=True
+        ).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get_json(self, url: str) -> Any | None:
+        return self.documents.get(url)
+
+    def get_text(self, url: str) -> str | None:
+        return self.texts.get(url)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "version": self.version,
+            "created_at": self.created_at,
+            "documents": len(self.documents),
+            "texts": len(self.texts),
+        }
+
+    def save(self, directory: str) -> str:
+        """Write the bundle as ``vhp-cloud-<version>.json.gz``; returns its path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"vhp-cloud-{self.version}.json.gz")
+        payload = {
+            "format": SNAPSHOT_FORMAT,
+            "version": self.version,
+            "created_at": self.created_at,
+            "documents": self.documents,
+            "texts": self.texts,
+        }
+        tmp = path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=9) as fh:
+            json.dump(payload, fh, sort_keys=True, separators=(",", ":"))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "Snapshot":
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            payload = json.load(fh)
+        if payload.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(
+                f"{path}: snapshot format {payload.get('format')} is not supported "
+                f"(expected {SNAPSHOT_FORMAT})"
+            )
+        return cls(
+            payload.get("documents") or {},
+            payload.get("texts") or {},
+            created_at=payload.get("created_at"),
+            version=payload.get("version"),
+        )
+
+
+def build_snapshot(
+    index_urls: Iterable[str],
+    expand: Callable[[str, dict], tuple[list[str], list[str]]],
+    fetch_json: Callable[[str], Any],
+    fetch_text: Callable[[str], str | None],
+    max_workers: int = 16,
+) -> tuple[Snapshot, list[str]]:
+    """Fetch the indexes and everything they reference into a ``Snapshot``.
+
+    Args:
+        index_urls: URLs of the xxxx_index.json files
+        expand: called with each index URL and its content; returns the
+            JSON and text URLs it references
+        fetch_json: returns the document at a URL, or a falsy value on errors
+        fetch_text: returns the text at a URL, or None on errors
+
+    Returns:
+        tuple: the snapshot and the URLs that could not be fetched
+    """
+    documents: dict[str, Any] = {}
+    texts: dict[str, str] = {}
+    failed: list[str] = []
+
+    json_urls: list[str] = []
+    text_urls: list[str] = []
+    for index_url in index_urls:
+        index = fetch_json(index_url)
+        if not index:
+            failed.append(index_url)
+            continue
+        documents[index_url] = index
+        more_json, more_text = expand(index_url, index)
+        json_urls.extend(more_json)
+        text_urls.extend(more_text)
+
+    json_urls = list(dict.fromkeys(json_urls))
+    text_urls = list(dict.fromkeys(text_urls))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot") as pool:
+        for url, document in zip(json_urls, pool.map(fetch_json, json_urls)):
+            if document:
+                documents[url] = document
+            else:
+                failed.append(url)
+        for url, text in zip(text_urls, pool.map(fetch_text, text_urls)):
+            if text is not None:
+                texts[url] = text
+            else:
+                failed.append(url)
+
+    return Snapshot(documents, texts), failed
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> dict[str, dict[str, list[str]]]:
+    """URLs added, removed and changed between two bundles, per section."""
+    result = {}
+    for section in ("documents", "texts"):
+        before = getattr(old, section)
+        after = getattr(new, section)
+        result[section] = {
+            "added": sorted(after.keys() - before.keys()),
+            "removed": sorted(before.keys() - after.keys()),
+            "changed": sorted(
+                url for url in before.keys() & after.keys() if before[url] != after[url]
+            ),
+        }
+    return result
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+
+def verify_signature(secret: str, body: bytes, signature_header: str | None) -> bool:
+    """Check a GitHub ``X-Hub-Signature-256`` header against the raw body."""
+    if not secret or not signature_header:
+        return False
+    scheme, _, digest = signature_header.partition("=")
+    if scheme != "sha256" or not digest:
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected.encode(), digest.encode())
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """Build the signature header GitHub would send for ``body``."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def changed_paths(payload: dict[str, Any]) -> set[str]:
+    """Collect every file added, modified or removed by the pushed commits."""
+    paths: set[str] = set()
+    commits = list(payload.get("commits") or [])
+    if payload.get("head_commit"):
+        commits.append(payload["head_commit"])
+    for commit in commits:
+        if not isinstance(commit, dict):
+            continue
+        for key in ("added", "modified", "removed"):
+            paths.update(p for p in commit.get(key) or [] if isinstance(p, str))
+    return paths
+
+
+class CloudInvalidator:
+    """Map files pushed to the VHP4Safety/cloud repository onto cache entries.
+
+    Handlers are registered per path pattern. For every changed path of a
+    push the matching handlers are called with the regex match and the
+    pushed commit sha; what a handler returns (a callable or None) is run
+    afterwards on a single background worker, so refreshes happen in push
+    order and never block the webhook response.
+    """
+
+    def __init__(self, repository: str, ref: str = "refs/heads/main"):
+        self.repository = repository
+        self.ref = ref
+        self._handlers: list[tuple[str, re.Pattern, Callable]] = []
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cloud-refresh")
+
+    def register(self, name: str, pattern: str, handler: Callable) -> None:
+        """Call ``handler(match, sha)`` for pushed paths matching ``pattern``."""
+        self._handlers.append((name, re.compile(pattern), handler))
+
+    def handle_push(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Invalidate the caches touched by a push event and schedule refreshes.
+
+        Returns:
+            dict: summary with the invalidated targets, or the reason the
+            push was ignored
+        """
+        repository = (payload.get("repository") or {}).get("full_name", "")
+        if repository.lower() != self.repository.lower():
+            return {"ignored": f"repository {repository or '?'} is not watched"}
+        if payload.get("ref") != self.ref:
+            return {"ignored": f"ref {payload.get('ref') or '?'} is not watched"}
+
+        sha = payload.get("after") or ""
+        paths = changed_paths(payload)
+        invalidated = []
+        refreshes = []
+        for path in sorted(paths):
+            for name, pattern, handler in self._handlers:
+                match = pattern.fullmatch(path)
+                if not match:
+                    continue
+                invalidated.append({"path": path, "target": name})
+                refresh = handler(match, sha)
+                if refresh is not None:
+                    refreshes.append(refresh)
+
+        for refresh in refreshes:
+            self._executor.submit(refresh)
+
+        return {
+            "sha": sha,
+            "paths": len(paths),
+            "invalidated": invalidated,
+            "refreshes_scheduled": len(refreshes),
+        }
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import bisect
+import re
+from typing import Any, Iterable
+
+from data.search_index import fold
+
+FIELDS = ("id", "label", "inchi", "inchikey", "smiles")
+
+_INCHIKEY_RE = re.compile(r"^[A-Z]{14}-[A-Z]{10}-[A-Z]$")
+_CONNECTIVITY_RE = re.compile(r"^[A-Z]{14}$")
+_QID_RE = re.compile(r"^Q\d+$")
+_WORD_START_RE = re.compile(r"(?:^|[\s\-,()\[\]/])(\w)")
+
+
+def connectivity(inchikey: str) -> str:
+    """First block of an InChIKey, shared by stereoisomers and salts of a compound."""
+    return inchikey.split("-", 1)[0]
+
+
+class CompoundCatalog:
+    """Local table of the VHP compounds with lookups by name and identity.
+
+    Records are compact tuples in ``FIELDS`` order. Names are matched by
+    prefix, of the whole label or of any word in it ("phenol" finds
+    "4-nitro phenol"), by bisecting one sorted list of
+    ``(folded text, position)`` pairs. Compound ids, InChIKeys, InChIs and
+    SMILES are looked up exactly, and InChIKeys also by their connectivity
+    block to find related forms.
+    """
+
+    def __init__(self, records: Iterable[dict[str, Any]]):
+        self.records: list[tuple[str, ...]] = []
+        self.by_id: dict[str, int] = {}
+        self.by_inchikey: dict[str, int] = {}
+        self.by_connectivity: dict[str, list[int]] = {}
+        self.by_inchi: dict[str, int] = {}
+        self.by_smiles: dict[str, int] = {}
+        self.folded_labels: list[str] = []
+        prefixes: set[tuple[str, int]] = set()
+
+        for record in records:
+            row = tuple(str(record.get(field) or "") for field in FIELDS)
+            cwid, label, inchi, inchikey, smiles = row
+            if not cwid or cwid in self.by_id:
+                continue
+            position = len(self.records)
+            self.records.append(row)
+            folded = fold(label)
+            self.folded_labels.append(folded)
+            self.by_id[cwid] = position
+            if inchikey:
+                self.by_inchikey.setdefault(inchikey, position)
+                self.by_connectivity.setdefault(connectivity(inchikey), []).append(position)
+            if inchi:
+                self.by_inchi.setdefault(inchi, position)
+            if smiles:
+                self.by_smiles.setdefault(smiles, position)
+            if folded:
+                prefixes.add((folded, position))
+                for match in _WORD_START_RE.finditer(folded):
+                    if match.start(1) > 0:
+                        prefixes.add((folded[match.start(1):], position))
+        self.prefixes = sorted(prefixes)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def record(self, position: int) -> dict[str, str]:
+        return dict(zip(FIELDS, self.records[position]))
+
+    def get(self, cwid: str) -> dict[str, str] | None:
+        position = self.by_id.get(cwid)
+        return None if position is None else self.record(position)
+
+    def _by_prefix(self, text: str, limit: int) -> list[int]:
+        """Labels equal to ``text`` first, then labels and then words starting with it."""
+        start = bisect.bisect_left(self.prefixes, (text, -1))
+        ranks: dict[int, int] = {}
+        for folded, position in self.prefixes[start:]:
+            if not folded.startswith(text):
+                break
+            label = self.folded_labels[position]
+            rank = 0 if label == text else 1 if label.startswith(text) else 2
+            ranks[position] = min(rank, ranks.get(position, rank))
+        return sorted(
+            ranks,
+            key=lambda position: (ranks[position], len(self.records[position][1]), self.records[position][1]),
+        )[:limit]
+
+    def search(self, query: str, limit: int = 10) -> list[dict[str, str]]:
+        """Compounds matching ``query`` as an identifier or as a name prefix.
+
+        Each result carries ``match``: id, inchikey, connectivity, inchi,
+        smiles or name.
+        """
+        query = query.strip()
+        if not query:
+            return []
+        results: list[tuple[int, str]] = []
+
+        key = query.upper()
+        if _QID_RE.match(key) and key in self.by_id:
+            results.append((self.by_id[key], "id"))
+        if _INCHIKEY_RE.match(key):
+            if key in self.by_inchikey:
+                results.append((self.by_inchikey[key], "inchikey"))
+            key = connectivity(key)
+        if _CONNECTIVITY_RE.match(key):
+            results.extend((position, "connectivity") for position in self.by_connectivity.get(key, ()))
+        if query.startswith("InChI=") and query in self.by_inchi:
+            results.append((self.by_inchi[query], "inchi"))
+        if query in self.by_smiles:
+            results.append((self.by_smiles[query], "smiles"))
+        if not results:
+            results = [(position, "name") for position in self._by_prefix(fold(query), limit)]
+
+        seen: set[int] = set()
+        matches = []
+        for position, match in results:
+            if position in seen:
+                continue
+            seen.add(position)
+            matches.append(dict(self.record(position), match=match))
+            if len(matches) == limit:
+                break
+        return matches
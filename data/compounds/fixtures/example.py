@@ -0,0 +1,135 @@
+"""Write the SPARQL fixtures of the example compound in this directory.
+
+    python -m data.compounds.fixtures.example
+
+The fixtures are written by hand with ``fixture_results``, not recorded:
+one compound, caffeine, under the id ``EXAMPLE_ID``, with the structure
+and identifiers of its public PubChem entry. They answer every query of
+its compound page and of ``compounds-precompute``, so both run offline
+with ``VHP_SPARQL_FIXTURES=data/compounds/fixtures``. Run this again
+after changing one of the queries, as the file names hash the query.
+"""
+
+import json
+import os
+
+from data.compounds.queries import (
+    COMPOUND_LIST_QUERY,
+    COMPOUND_PROPERTIES,
+    COMPOUNDCLOUD_ENDPOINT,
+    EXPDATA_QUERY,
+    IDENTIFIER_PROPERTIES,
+    PROPERTIES_QUERY,
+    PROPERTY_METADATA_QUERY,
+    PROPERTY_VALUES_QUERY,
+    QLEVER_WIKIDATA_ENDPOINT,
+    TOXICOLOGY_PROPERTIES,
+    VHP_COMPOUNDS_QUERY,
+    WIKIDATA_MAPPING_QUERY,
+    WIKIDATA_QID_QUERY,
+)
+from data.sparql import direct, entity, fixture_key, fixture_results, iri
+
+EXAMPLE_ID = "Q9999"
+ENTITY = "https://compoundcloud.wikibase.cloud/entity/"
+WIKIDATA_ID = "Q60235"
+WIKIDATA = "http://www.wikidata.org/entity/" + WIKIDATA_ID
+
+LABEL = "caffeine"
+INCHI = "InChI=1S/C8H10N4O2/c1-10-4-9-6-5(10)7(13)12(3)8(14)11(6)2/h4H,1-3H3"
+INCHIKEY = "RYYVLZVUVIJVGH-UHFFFAOYSA-N"
+SMILES = "CN1C=NC2=C1C(=O)N(C(=O)N2C)C"
+
+# Labels are only given for the properties whose meaning is known here
+PROPERTY_LABELS = [
+    [ENTITY + "P13", "PubChem CID", "https://pubchem.ncbi.nlm.nih.gov/compound/$1"],
+    [ENTITY + "P23", "CAS Registry Number", "https://commonchemistry.cas.org/detail?cas_rn=$1"],
+]
+
+# (endpoint, query, variables, rows)
+FIXTURES = [
+    (
+        COMPOUNDCLOUD_ENDPOINT,
+        PROPERTIES_QUERY.render(compounds=[entity(EXAMPLE_ID)]),
+        ["cmp", "cmpLabel", "formula", "mass", "inchi", "inchiKey", "SMILES"],
+        [[ENTITY + EXAMPLE_ID, LABEL, "C8H10N4O2", "194.080376", INCHI, INCHIKEY, SMILES]],
+    ),
+    # all properties for the property dictionary, and per table while it loads
+    *(
+        (
+            COMPOUNDCLOUD_ENDPOINT,
+            PROPERTY_METADATA_QUERY.render(properties=[entity(pid) for pid in properties]),
+            ["property", "propertyLabel", "formatterURL"],
+            [row for row in PROPERTY_LABELS if row[0].rsplit("/", 1)[-1] in properties],
+        )
+        for properties in (COMPOUND_PROPERTIES, IDENTIFIER_PROPERTIES, TOXICOLOGY_PROPERTIES)
+    ),
+    (
+        COMPOUNDCLOUD_ENDPOINT,
+        PROPERTY_VALUES_QUERY.render(
+            compound=entity(EXAMPLE_ID), properties=[direct(pid) for pid in IDENTIFIER_PROPERTIES]
+        ),
+        ["valueProp", "value"],
+        [
+            ["https://compoundcloud.wikibase.cloud/prop/direct/P13", "2519"],
+            ["https://compoundcloud.wikibase.cloud/prop/direct/P23", "58-08-2"],
+        ],
+    ),
+    (
+        COMPOUNDCLOUD_ENDPOINT,
+        PROPERTY_VALUES_QUERY.render(
+            compound=entity(EXAMPLE_ID), properties=[direct(pid) for pid in TOXICOLOGY_PROPERTIES]
+        ),
+        ["valueProp", "value"],
+        [],
+    ),
+    (
+        COMPOUNDCLOUD_ENDPOINT,
+        WIKIDATA_QID_QUERY.render(compound=entity(EXAMPLE_ID)),
+        ["qid"],
+        [[WIKIDATA]],
+    ),
+    (
+        COMPOUNDCLOUD_ENDPOINT,
+        WIKIDATA_MAPPING_QUERY,
+        ["cmp", "wikidata"],
+        [[ENTITY + EXAMPLE_ID, WIKIDATA_ID]],
+    ),
+    (
+        COMPOUNDCLOUD_ENDPOINT,
+        VHP_COMPOUNDS_QUERY,
+        ["cmp"],
+        [[ENTITY + EXAMPLE_ID]],
+    ),
+    (
+        COMPOUNDCLOUD_ENDPOINT,
+        COMPOUND_LIST_QUERY,
+        ["cmp", "cmpLabel", "inchi", "inchiKey", "SMILES"],
+        [[ENTITY + EXAMPLE_ID, LABEL, INCHI, INCHIKEY, SMILES]],
+    ),
+    (
+        QLEVER_WIKIDATA_ENDPOINT,
+        EXPDATA_QUERY.render(entity=iri(WIKIDATA)),
+        ["propEntityLabel", "value", "unitsLabel", "source", "doi", "statement"],
+        [["melting point", "235", "degree Celsius", "", "", ""]],
+    ),
+]
+
+
+def write(directory: str = os.path.dirname(os.path.abspath(__file__))) -> list[str]:
+    """Write one ``.json`` result and ``.rq`` query per fixture, as recording does."""
+    paths = []
+    for endpoint, query, variables, rows in FIXTURES:
+        stem = os.path.join(directory, fixture_key(endpoint, query))
+        with open(stem + ".json", "w", encoding="utf-8") as fh:
+            json.dump(fixture_results(variables, rows), fh, indent=1)
+            fh.write("\n")
+        with open(stem + ".rq", "w", encoding="utf-8") as fh:
+            fh.write(f"# {endpoint}\n{query}\n")
+        paths.append(stem + ".json")
+    return paths
+
+
+if __name__ == "__main__":
+    for path in write():
+        print(path)
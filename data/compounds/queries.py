@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+from data.sparql import QueryTemplate, SparqlClient, direct, entity, iri
+
+COMPOUNDCLOUD_ENDPOINT = "https://compoundcloud.wikibase.cloud/query/sparql"
+QLEVER_WIKIDATA_ENDPOINT = "https://qlever.cs.uni-freiburg.de/api/wikidata"
+QLEVER_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+compoundcloud = SparqlClient(COMPOUNDCLOUD_ENDPOINT)
+qlever = SparqlClient(
+    QLEVER_WIKIDATA_ENDPOINT, timeout=QLEVER_TIMEOUT, method="GET", params={"format": "json"}
+)
+
+COMPOUNDCLOUD_PREFIXES = (
+    "PREFIX wd: <https://compoundcloud.wikibase.cloud/entity/>\n"
+    "PREFIX wdt: <https://compoundcloud.wikibase.cloud/prop/direct/>\n"
+)
+
+# Properties shown in the identifier and toxicology tables of compound.html
+IDENTIFIER_PROPERTIES = ("P13", "P22", "P23", "P26", "P27", "P28", "P36", "P41", "P43", "P44", "P45")
+TOXICOLOGY_PROPERTIES = ("P17", "P19", "P4")
+COMPOUND_PROPERTIES = IDENTIFIER_PROPERTIES + TOXICOLOGY_PROPERTIES
+
+
+def local_id(value: str) -> str:
+    """``Q123`` from an entity IRI."""
+    return value.rsplit("/", 1)[-1]
+
+
+PROPERTIES_QUERY = QueryTemplate(
+    COMPOUNDCLOUD_PREFIXES + "\n"
+    "SELECT ?cmp ?cmpLabel ?formula ?mass ?inchi ?inchiKey ?SMILES WHERE {\n"
+    "  VALUES ?cmp { $compounds }\n"
+    "  ?cmp wdt:P9 ?inchi ;\n"
+    "       wdt:P10 ?inchiKey .\n"
+    "  OPTIONAL { ?cmp wdt:P2 ?mass }\n"
+    "  OPTIONAL { ?cmp wdt:P3 ?formula }\n"
+    "  OPTIONAL { ?cmp wdt:P7 ?chiralSMILES }\n"
+    "  OPTIONAL { ?cmp wdt:P12 ?nonchiralSMILES }\n"
+    '  BIND (COALESCE(IF(BOUND(?chiralSMILES), ?chiralSMILES, 1/0), IF(BOUND(?nonchiralSMILES), ?nonchiralSMILES, 1/0), "") AS ?SMILES)\n'
+    '  SERVICE wikibase:label { bd:serviceParam wikibase:language "[AUTO_LANGUAGE],en". }\n'
+    "}"
+)
+
+PROPERTY_METADATA_QUERY = QueryTemplate(
+    COMPOUNDCLOUD_PREFIXES + "\n"
+    "SELECT ?property ?propertyLabel ?formatterURL WHERE {\n"
+    "  VALUES ?property { $properties }\n"
+    "  OPTIONAL { ?property rdfs:label ?propertyLabel . FILTER(lang(?propertyLabel) = 'en') }\n"
+    "  OPTIONAL { ?property wdt:P6 ?formatterURL }\n"
+    "}"
+)
+
+PROPERTY_VALUES_QUERY = QueryTemplate(
+    COMPOUNDCLOUD_PREFIXES + "\n"
+    "SELECT DISTINCT ?valueProp ?value WHERE {\n"
+    "  VALUES ?valueProp { $properties }\n"
+    "  $compound ?valueProp ?value .\n"
+    "}"
+)
+
+WIKIDATA_QID_QUERY = QueryTemplate(
+    COMPOUNDCLOUD_PREFIXES + "\n"
+    "SELECT ?qid WHERE {\n"
+    "  wd:P5 wikibase:directClaim ?identifierProp .\n"
+    "  $compound ?identifierProp ?wikidata .\n"
+    '  BIND (iri(CONCAT("http://www.wikidata.org/entity/", ?wikidata)) AS ?qid)\n'
+    "}"
+)
+
+WIKIDATA_MAPPING_QUERY = COMPOUNDCLOUD_PREFIXES + "\n" "SELECT ?cmp ?wikidata WHERE { ?cmp wdt:P5 ?wikidata . }"
+
+# the QLever query may be affected by https://github.com/ad-freiburg/qlever-control/issues/187
+EXPDATA_QUERY = QueryTemplate(
+    "PREFIX wd: <http://www.wikidata.org/entity/>\n"
+    "PREFIX wdt: <http://www.wikidata.org/prop/direct/>\n"
+    "PREFIX prov: <http://www.w3.org/ns/prov#>\n"
+    "PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>\n"
+    "PREFIX pr: <http://www.wikidata.org/prop/reference/>\n"
+    "PREFIX wikibase: <http://wikiba.se/ontology#>\n\n"
+    "SELECT DISTINCT ?propEntityLabel ?value ?unitsLabel ?source ?doi ?statement\n"
+    "WHERE {\n"
+    "    $entity ?propp ?statement .\n"
+    "    ?statement a wikibase:BestRank ;\n"
+    "      ?proppsv [ wikibase:quantityAmount ?value ; wikibase:quantityUnit ?units ] .\n"
+    "    #OPTIONAL { ?statement prov:wasDerivedFrom/pr:P248 ?sourceTmp . OPTIONAL { ?sourceTmp wdt:P356 ?doiTmp . } }\n"
+    "    ?property wikibase:claim ?propp ; wikibase:statementValue ?proppsv ; wdt:P1629 ?propEntity ; wdt:P31 wd:Q21077852 .\n"
+    "    ?propEntity @en@rdfs:label ?propEntityLabel .\n"
+    "    ?units @en@rdfs:label ?unitsLabel .\n"
+    '    BIND (COALESCE(IF(BOUND(?sourceTmp), ?sourceTmp, 1/0), "") AS ?source)\n'
+    '    BIND (COALESCE(IF(BOUND(?doiTmp), ?doiTmp, 1/0), "") AS ?doi)\n'
+    "}"
+)
+
+VHP_COMPOUNDS_QUERY = COMPOUNDCLOUD_PREFIXES + "\n" "SELECT DISTINCT ?cmp WHERE { ?cmp wdt:P21 wd:Q2059 . }"
+
+# Same selection as static/misc/get_compound_list.py: the VHP subset and the
+# compounds it lists as parts of its members, if they have a labelled type (P1).
+COMPOUND_LIST_QUERY = (
+    COMPOUNDCLOUD_PREFIXES + "\n"
+    "SELECT ?cmp ?cmpLabel ?inchi ?inchiKey ?SMILES WHERE {\n"
+    "  { ?parent wdt:P21 wd:Q2059 ; wdt:P29 ?cmp . } UNION { ?cmp wdt:P21 wd:Q2059 . }\n"
+    "  ?cmp wdt:P1 ?type ; rdfs:label ?cmpLabel . FILTER(lang(?cmpLabel) = 'en')\n"
+    "  ?type rdfs:label ?typeLabel . FILTER(lang(?typeLabel) = 'en')\n"
+    "  OPTIONAL { ?cmp wdt:P9 ?inchi }\n"
+    "  OPTIONAL { ?cmp wdt:P10 ?inchiKey }\n"
+    "  OPTIONAL { ?cmp wdt:P7 ?chiralSMILES }\n"
+    "  OPTIONAL { ?cmp wdt:P12 ?nonchiralSMILES }\n"
+    '  BIND (COALESCE(IF(BOUND(?chiralSMILES), ?chiralSMILES, 1/0), IF(BOUND(?nonchiralSMILES), ?nonchiralSMILES, 1/0), "") AS ?SMILES)\n'
+    "}"
+)
+
+
+def compounds_properties(cwids: list[str]) -> dict[str, list[dict]]:
+    """Properties of several compounds with a single ``VALUES`` query.
+
+    Returns the same lists as ``compound_properties`` keyed by compound id;
+    compounds without an InChI are left out.
+    """
+    query = PROPERTIES_QUERY.render(compounds=[entity(cwid) for cwid in cwids])
+    properties: dict[str, list[dict]] = {}
+    for cmp, label, formula, mass, inchi, inchikey, smiles in compoundcloud.rows(
+        query, ("cmp", "cmpLabel", "formula", "mass", "inchi", "inchiKey", "SMILES")
+    ):
+        # like the single-compound endpoint, only the first row counts
+        properties.setdefault(
+            local_id(cmp),
+            [
+                {
+                    "wcid": cmp,
+                    "label": label,
+                    "inchi": inchi,
+                    "inchikey": inchikey,
+                    "SMILES": smiles,
+                    "formula": formula,
+                    "mass": mass,
+                }
+            ],
+        )
+    return properties
+
+
+def compound_properties(cwid: str) -> list[dict]:
+    """Label, structure identifiers, formula and mass of a compound."""
+    return compounds_properties([cwid]).get(cwid, [])
+
+
+def property_metadata(properties: tuple[str, ...] = COMPOUND_PROPERTIES) -> dict[str, dict]:
+    """English label and formatter URL (P6) of compoundcloud properties."""
+    query = PROPERTY_METADATA_QUERY.render(properties=[entity(pid) for pid in properties])
+    metadata = {}
+    for prop, label, formatter_url in compoundcloud.rows(
+        query, ("property", "propertyLabel", "formatterURL")
+    ):
+        pid = local_id(prop)
+        metadata.setdefault(pid, {"label": label or pid, "formatterURL": formatter_url})
+    return metadata
+
+
+def _property_values(cwid: str, properties: tuple[str, ...]) -> dict[str, list[str]]:
+    """Raw values of some direct properties of a compound, by property id."""
+    query = PROPERTY_VALUES_QUERY.render(
+        compound=entity(cwid), properties=[direct(pid) for pid in properties]
+    )
+    values: dict[str, list[str]] = {}
+    for prop, value in compoundcloud.rows(query, ("valueProp", "value")):
+        values.setdefault(local_id(prop), []).append(value)
+    return values
+
+
+def _property_rows(cwid: str, properties: tuple[str, ...], metadata: dict[str, dict] | None):
+    """``(property metadata, value)`` per value, and ``(metadata, "")`` for unset properties.
+
+    Labels and formatter URLs come from ``metadata`` (see
+    ``property_metadata``), so the per-compound query only fetches values.
+    """
+    if metadata is None:
+        metadata = property_metadata(properties)
+    values = _property_values(cwid, properties)
+    for pid in properties:
+        meta = metadata.get(pid, {"label": pid, "formatterURL": ""})
+        for value in values.get(pid) or [""]:
+            yield meta, value
+
+
+def compound_identifiers(cwid: str, metadata: dict[str, dict] | None = None) -> list[dict]:
+    """External identifiers of a compound with the URL pattern to link them."""
+    return [
+        {
+            "propertyLabel": meta["label"],
+            "value": value,
+            "formatterURL": meta["formatterURL"] if value else "",
+        }
+        for meta, value in _property_rows(cwid, IDENTIFIER_PROPERTIES, metadata)
+    ]
+
+
+def compound_toxicology(cwid: str, metadata: dict[str, dict] | None = None) -> list[dict]:
+    """Toxicological roles and classifications of a compound."""
+    return [
+        {"propertyLabel": meta["label"], "value": value}
+        for meta, value in _property_rows(cwid, TOXICOLOGY_PROPERTIES, metadata)
+    ]
+
+
+def wikidata_qid(cwid: str) -> str | None:
+    """Wikidata entity IRI of a compound, from its P5 identifier."""
+    rows = compoundcloud.rows(WIKIDATA_QID_QUERY.render(compound=entity(cwid)), ("qid",))
+    return rows[0][0] if rows else None
+
+
+def wikidata_mapping() -> dict[str, str]:
+    """Wikidata entity IRI of every compound that has a P5 identifier."""
+    return {
+        local_id(cmp): "http://www.wikidata.org/entity/" + wikidata
+        for cmp, wikidata in compoundcloud.rows(WIKIDATA_MAPPING_QUERY, ("cmp", "wikidata"))
+    }
+
+
+def wikidata_expdata(qid: str) -> list[dict]:
+    """Experimental quantities Wikidata has on an entity, queried on QLever."""
+    variables = ("propEntityLabel", "value", "unitsLabel", "source", "doi", "statement")
+    return [
+        {
+            "propEntityLabel": label,
+            "value": value,
+            "unitsLabel": units,
+            "source": source,
+            "doi": doi,
+            "seeAlso": statement,
+        }
+        for label, value, units, source, doi, statement in qlever.rows(
+            EXPDATA_QUERY.render(entity=iri(qid)), variables
+        )
+    ]
+
+
+def compound_expdata(cwid: str) -> list[dict]:
+    """Experimental quantities Wikidata has on a compound."""
+    qid = wikidata_qid(cwid)
+    return wikidata_expdata(qid) if qid else []
+
+
+def vhp_compound_ids() -> list[str]:
+    """Ids (Q numbers) of all compounds in the VHP4Safety subset."""
+    return sorted(
+        {local_id(cmp) for (cmp,) in compoundcloud.rows(VHP_COMPOUNDS_QUERY, ("cmp",))},
+        key=lambda cwid: int(cwid[1:]) if cwid[1:].isdigit() else 0,
+    )
+
+
+def compound_list() -> list[dict]:
+    """Id, label and structure of every VHP compound, for the local catalog."""
+    return [
+        {"id": local_id(cmp), "label": label, "inchi": inchi, "inchikey": inchikey, "smiles": smiles}
+        for cmp, label, inchi, inchikey, smiles in compoundcloud.rows(
+            COMPOUND_LIST_QUERY, ("cmp", "cmpLabel", "inchi", "inchiKey", "SMILES")
+        )
+    ]
+
+
+# Sections of a compound page, each also served by its own JSON endpoint
+COMPOUND_SECTIONS = {
+    "properties": compound_properties,
+    "identifiers": compound_identifiers,
+    "toxicology": compound_toxicology,
+    "expdata": compound_expdata,
+}
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable
+
+
+class LocalTable:
+    """Locally persisted result of a bulk query, reloaded on a schedule.
+
+    ``load`` runs the query and returns JSON-serializable data, which is
+    kept in a JSON file so lookups never query the endpoint and the table
+    survives restarts. ``build`` turns the data into the object lookups
+    use (an index, a dict, ...). Once the data is older than ``ttl``
+    seconds, ``get`` starts a reload in the background and keeps returning
+    the old object; a failed reload is retried after ``retry_after`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        load: Callable[[], Any],
+        ttl: int,
+        build: Callable[[Any], Any] = lambda data: data,
+        retry_after: int = 300,
+    ):
+        self.path = path
+        self.load = load
+        self.ttl = ttl
+        self.build = build
+        self.retry_after = retry_after
+        self._data: Any = None
+        self._built: Any = None
+        self._fetched_at = 0.0
+        self._failed_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._read()
+
+    def _read(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                stored = json.load(fh)
+            data = stored["data"]
+            fetched_at = float(stored["fetched_at"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self._data, self._built, self._fetched_at = data, self.build(data), fetched_at
+
+    def _write(self) -> None:
+        folder = os.path.dirname(self.path) or "."
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"fetched_at": self._fetched_at, "data": self._data}, fh, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def refresh(self) -> Any:
+        """Reload the table now and return it. Keeps the old data on errors."""
+        try:
+            data = self.load()
+            built = self.build(data) if data else None
+        except Exception:
+            data = built = None
+        with self._lock:
+            self._refreshing = False
+            if not data:
+                self._failed_at = time.time()
+                return self._built
+            self._data, self._built, self._fetched_at = data, built, time.time()
+            self._write()
+            return built
+
+    def _refresh_if_stale(self) -> None:
+        now = time.time()
+        with self._lock:
+            if (
+                self._refreshing
+                or now - self._fetched_at < self.ttl
+                or now - self._failed_at < self.retry_after
+            ):
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="local-table", daemon=True).start()
+
+    def get(self) -> Any:
+        """The built table, or None while it has never been loaded."""
+        self._refresh_if_stale()
+        with self._lock:
+            return self._built
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._data) if self._data is not None else 0,
+                "fetched_at": self._fetched_at or None,
+                "ttl": self.ttl,
+            }
+
+
+class IdentifierMap(LocalTable):
+    """``LocalTable`` of a ``{compound id: identifier}`` dict."""
+
+    def lookup(self, cwid: str) -> str | None:
+        return (self.get() or {}).get(cwid)
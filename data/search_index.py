@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+import unicodedata
+from typing import Any, Iterable
+
+# How much a match in each field counts towards a document's score
+FIELD_WEIGHTS = {"name": 3.0, "keywords": 2.0, "description": 1.0}
+
+# Score of one query term against one indexed token, by kind of match
+EXACT = 1.0
+PREFIX = 0.75
+FUZZY = 0.5
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip accents, so 'Tóxico' matches 'toxico'."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def words(text: Any) -> list[str]:
+    if isinstance(text, (list, tuple, set, frozenset)):
+        return [word for part in text for word in words(part)]
+    return _WORD_RE.findall(fold(str(text or "")))
+
+
+def trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(token: str) -> int:
+    """Edits tolerated for a query term: none for short terms, 2 for long ones."""
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance of ``a`` and ``b``, or ``limit + 1`` once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Ranked site search over tools, methods, datasets and other pages.
+
+    Each document is a dict with ``kind``, ``id``, ``title`` and ``url`` plus
+    the searchable fields of ``FIELD_WEIGHTS``. Query terms match indexed
+    tokens exactly, as a prefix (found by bisecting the sorted vocabulary)
+    or, for terms of four characters and more, with one or two typos
+    (candidates come from a trigram index and are confirmed with a bounded
+    edit distance). A document's score sums, per query term, the best match
+    times the weight of the field it was found in. Documents matching all
+    terms rank above those matching only some.
+    """
+
+    def __init__(self, documents: dict[str, dict[str, Any]]):
+        self.documents: list[dict[str, Any]] = []
+        # token -> {document position: best field weight}
+        postings: dict[str, dict[int, float]] = {}
+        for document in documents.values():
+            position = len(self.documents)
+            self.documents.append(
+                {key: document.get(key, "") for key in ("kind", "id", "title", "url")}
+            )
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in words(document.get(field)):
+                    docs = postings.setdefault(token, {})
+                    if docs.get(position, 0) < weight:
+                        docs[position] = weight
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+        self.by_trigram: dict[str, list[str]] = {}
+        for token in self.vocabulary:
+            for gram in trigrams(token):
+                self.by_trigram.setdefault(gram, []).append(token)
+        self.kinds = sorted({document["kind"] for document in self.documents})
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _prefixed(self, term: str) -> Iterable[str]:
+        start = bisect.bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            yield token
+
+    def _fuzzy(self, term: str) -> Iterable[tuple[str, int]]:
+        limit = max_typos(term)
+        if not limit:
+            return
+        grams = trigrams(term)
+        shared: dict[str, int] = {}
+        for gram in grams:
+            for token in self.by_trigram.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        # every edit destroys at most three trigrams
+        needed = max(1, len(grams) - 3 * limit)
+        for token, count in shared.items():
+            if count < needed:
+                continue
+            distance = bounded_distance(term, token, limit)
+            if 0 < distance <= limit:
+                yield token, distance
+
+    def term_matches(self, term: str, last: bool = False) -> dict[str, float]:
+        """Indexed tokens matching ``term`` with their match score.
+
+        Prefixes are matched for every term of three characters and more,
+        and for the last (still being typed) term from two characters on.
+        """
+        matches: dict[str, float] = {}
+        if term in self.postings:
+            matches[term] = EXACT
+        if len(term) >= 3 or (last and len(term) >= 2):
+            for token in self._prefixed(term):
+                matches.setdefault(token, PREFIX)
+        for token, distance in self._fuzzy(term):
+            score = FUZZY / distance
+            if matches.get(token, 0) < score:
+                matches[token] = score
+        return matches
+
+    def search(
+        self, query: str, limit: int = 10, kinds: Iterable[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """Best matching documents for ``query``, highest score first."""
+        terms = list(dict.fromkeys(words(query)))
+        if not terms:
+            return []
+        kinds = set(kinds) if kinds else None
+
+        scores: dict[int, float] = {}
+        matched_terms: dict[int, int] = {}
+        for i, term in enumerate(terms):
+            best: dict[int, float] = {}
+            for token, match_score in self.term_matches(term, last=i == len(terms) - 1).items():
+                for position, weight in self.postings[token].items():
+                    score = match_score * weight
+                    if best.get(position, 0) < score:
+                        best[position] = score
+            for position, score in best.items():
+                scores[position] = scores.get(position, 0) + score
+                matched_terms[position] = matched_terms.get(position, 0) + 1
+
+        phrase = " ".join(terms)
+        ranked = []
+        for position, score in scores.items():
+            document = self.documents[position]
+            if kinds is not None and document["kind"] not in kinds:
+                continue
+            title = fold(document["title"] or "")
+            if title.startswith(phrase):
+                score += 1.0
+            elif phrase in title:
+                score += 0.5
+            ranked.append((matched_terms[position], score, -position))
+        results = []
+        for matched, score, negative_position in heapq.nlargest(limit, ranked):
+            results.append(
+                dict(self.documents[-negative_position], score=round(score, 3), matched=matched)
+            )
+        return results
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import string
+import threading
+from typing import Any, Iterable
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.util.retry import Retry
+
+USER_AGENT = "VHP4Safety-UI/1.0 (https://platform.vhp4safety.nl)"
+
+_ENTITY_RE = re.compile(r"^[PQ]\d+$")
+_IRI_FORBIDDEN_RE = re.compile(r'[\s<>"{}|\\^`]')
+
+
+class SparqlError(RuntimeError):
+    """A SPARQL endpoint could not be reached or returned an unusable result."""
+
+
+class Term(str):
+    """A validated piece of SPARQL syntax that may be put into a template."""
+
+
+def entity(entity_id: str, prefix: str = "wd") -> Term:
+    """``wd:Q123`` (or ``<prefix>:P12``); raises ValueError for anything but an entity id."""
+    entity_id = str(entity_id).strip()
+    if not _ENTITY_RE.match(entity_id):
+        raise ValueError(f"not an entity id: {entity_id!r}")
+    return Term(f"{prefix}:{entity_id}")
+
+
+def direct(property_id: str) -> Term:
+    """``wdt:P12``, the direct-claim predicate of a property."""
+    return entity(property_id, prefix="wdt")
+
+
+def iri(value: str) -> Term:
+    """``<value>``; raises ValueError for values that would break out of the IRI."""
+    value = str(value)
+    if not value or _IRI_FORBIDDEN_RE.search(value):
+        raise ValueError(f"not a valid IRI: {value!r}")
+    return Term(f"<{value}>")
+
+
+class QueryTemplate:
+    """SPARQL text with ``$name`` placeholders that only accept ``Term`` values.
+
+    Lists of terms are joined with spaces, for ``VALUES`` clauses. Plain
+    strings are refused, so user input can only end up in a query through
+    ``entity``, ``direct`` or ``iri``, which validate it.
+    """
+
+    def __init__(self, text: str):
+        self.template = string.Template(text)
+
+    def render(self, **params: Term | Iterable[Term]) -> str:
+        rendered = {}
+        for name, value in params.items():
+            terms = [value] if isinstance(value, str) else list(value)
+            for term in terms:
+                if not isinstance(term, Term):
+                    raise TypeError(f"${name} takes Term values, not {type(term).__name__}")
+            rendered[name] = " ".join(terms)
+        return self.template.substitute(rendered)
+
+
+def decode_rows(result: dict, variables: Iterable[str] | None = None) -> list[tuple[str, ...]]:
+    """SPARQL JSON results as tuples of values, "" for unbound variables.
+
+    The tuples follow ``variables``, or the order of the result's head.
+    """
+    try:
+        if variables is None:
+            variables = result["head"]["vars"]
+        bindings = result["results"]["bindings"]
+    except (KeyError, TypeError):
+        raise SparqlError("not a SPARQL SELECT result")
+    variables = tuple(variables)
+    return [
+        tuple(row[var]["value"] if var in row else "" for var in variables)
+        for row in bindings
+    ]
+
+
+class SparqlClient:
+    """Client for one SPARQL endpoint.
+
+    Connections are pooled in one ``requests.Session`` per client and
+    shared between threads. Every request has a (connect, read) timeout;
+    connection errors, 429 and 5xx responses are retried ``retries`` times
+    with exponential backoff, honouring Retry-After. Queries are sent as a
+    POST form, or as a GET query string with ``method="GET"``.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        timeout: tuple[float, float] = (5, 30),
+        retries: int = 2,
+        backoff: float = 0.5,
+        method: str = "POST",
+        pool_size: int = 16,
+        params: dict[str, str] | None = None,
+    ):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.method = method
+        self.params = dict(params or {})
+        self.session = requests.Session()
+        self.session.headers.update(
+            {"Accept": "application/sparql-results+json", "User-Agent": USER_AGENT}
+        )
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def use_fixtures(self, directory: str, record: bool = False) -> None:
+        """Answer queries from ``FixtureAdapter(directory)`` instead of the network."""
+        network = self.session.get_adapter(self.endpoint) if record else None
+        adapter = FixtureAdapter(directory, record_with=network)
+        self.session.mount(self.endpoint, adapter)
+
+    def query(self, query: str) -> dict:
+        """Run a query and return the decoded JSON result."""
+        params = dict(self.params, query=query)
+        try:
+            if self.method == "GET":
+                resp = self.session.get(self.endpoint, params=params, timeout=self.timeout)
+            else:
+                resp = self.session.post(self.endpoint, data=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            raise SparqlError(f"{self.endpoint}: {e}") from e
+        if resp.status_code != 200:
+            raise SparqlError(f"{self.endpoint}: HTTP {resp.status_code} {resp.text[:200]}".rstrip())
+        try:
+            return resp.json()
+        except ValueError as e:
+            raise SparqlError(f"{self.endpoint}: invalid JSON result") from e
+
+    def rows(self, query: str, variables: Iterable[str] | None = None) -> list[tuple[str, ...]]:
+        """Run a SELECT query and return its rows as tuples (see ``decode_rows``)."""
+        return decode_rows(self.query(query), variables)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+def fixture_key(endpoint: str, query: str) -> str:
+    """File name stem of the fixture answering ``query`` on ``endpoint``."""
+    host = urlparse(endpoint).hostname or "local"
+    digest = hashlib.sha256(f"{endpoint}\n{normalize_query(query)}".encode()).hexdigest()
+    return f"{host}-{digest[:16]}"
+
+
+class FixtureAdapter(BaseAdapter):
+    """Transport adapter that answers SPARQL requests from JSON files.
+
+    Each query maps to ``<directory>/<fixture_key>.json`` holding the
+    endpoint's JSON result, so tests and benchmarks run the real client
+    code without network access. Unknown queries get a 404. With
+    ``record_with`` (the adapter to the real endpoint) unknown queries are
+    forwarded and successful results are saved as new fixtures.
+    """
+
+    def __init__(self, directory: str, record_with: BaseAdapter | None = None):
+        super().__init__()
+        self.directory = directory
+        self.record_with = record_with
+        self._lock = threading.Lock()
+
+    def _query(self, request) -> str:
+        parsed = urlparse(request.url)
+        params = parse_qs(parsed.query)
+        if "query" not in params and request.body:
+            body = request.body.decode() if isinstance(request.body, bytes) else request.body
+            params = parse_qs(body)
+        return params.get("query", [""])[0]
+
+    def _response(self, request, status: int, content: bytes) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response._content = content
+        response.headers["Content-Type"] = "application/sparql-results+json"
+        response.url = request.url
+        response.request = request
+        response.reason = "OK" if status == 200 else "Not Found"
+        return response
+
+    def send(self, request, **kwargs) -> requests.Response:
+        endpoint = request.url.split("?", 1)[0]
+        query = self._query(request)
+        path = os.path.join(self.directory, fixture_key(endpoint, query) + ".json")
+        try:
+            with open(path, "rb") as fh:
+                return self._response(request, 200, fh.read())
+        except OSError:
+            pass
+        if self.record_with is None:
+            message = {"error": f"no fixture for this query ({os.path.basename(path)})"}
+            return self._response(request, 404, json.dumps(message).encode())
+
+        response = self.record_with.send(request, **kwargs)
+        if response.status_code == 200:
+            with self._lock:
+                os.makedirs(self.directory, exist_ok=True)
+                with open(path, "wb") as fh:
+                    fh.write(response.content)
+                with open(path[:-5] + ".rq", "w", encoding="utf-8") as fh:
+                    fh.write(f"# {endpoint}\n{query}\n")
+        return response
+
+    def close(self) -> None:
+        if self.record_with is not None:
+            self.record_with.close()
+
+
+def fixture_results(variables: list[str], rows: Iterable[Iterable[Any]]) -> dict:
+    """SPARQL JSON results with literal values, for writing fixtures by hand."""
+    variables = list(variables)
+    return {
+        "head": {"vars": variables},
+        "results": {
+            "bindings": [
+                {var: {"type": "literal", "value": str(value)} for var, value in zip(variables, row) if value != ""}
+                for row in rows
+            ]
+        },
+    }
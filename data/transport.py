@@ -0,0 +1,45 @@
+"""Run the request flows of the repository extractors, blocking or async.
+
+An extractor writes each API operation once, as a generator (a "flow")
+that parses, filters and pages through results, and yields the requests
+it needs as ``(transport method, *args)``. The result of the call is sent
+back into the flow, and an exception it raised is thrown into it.
+``run_flow`` calls the method directly, ``run_flow_async`` awaits it, so
+the sync and async extractors differ only in their transport methods.
+"""
+
+from typing import Any, Generator
+
+Flow = Generator[tuple, Any, Any]
+
+
+def run_flow(flow: Flow) -> Any:
+    """Drive ``flow`` with blocking transport methods; returns its result."""
+    try:
+        step = next(flow)
+        while True:
+            method, *args = step
+            try:
+                result = method(*args)
+            except Exception as e:
+                step = flow.throw(e)
+            else:
+                step = flow.send(result)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_flow_async(flow: Flow) -> Any:
+    """Drive ``flow`` with async transport methods; returns its result."""
+    try:
+        step = next(flow)
+        while True:
+            method, *args = step
+            try:
+                result = await method(*args)
+            except Exception as e:
+                step = flow.throw(e)
+            else:
+                step = flow.send(result)
+    except StopIteration as stop:
+        return stop.value
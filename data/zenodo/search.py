@@ -5,8 +5,11 @@ import re
 import time
 from typing import Any
 
+import httpx
 import requests
 
+from data.transport import Flow, run_flow, run_flow_async
+
 
 class ZenodoExtractor:
     """Extractor for interacting with the Zenodo Records API.
@@ -35,7 +38,8 @@ class ZenodoExtractor:
             # Use Authorization header when token is provided
             self.headers["Authorization"] = f"Bearer {access_token}"
 
-    def validate_record_id(self, record_id: Any) -> tuple[bool, Any, str | None]:
+    @staticmethod
+    def validate_record_id(record_id: Any) -> tuple[bool, Any, str | None]:
         """Validate a Zenodo record identifier.
 
         Accepts numeric recid (int or numeric string) or DOI (10.xxxx/...).
@@ -91,8 +95,12 @@ class ZenodoExtractor:
         """Retrieve and normalize metadata for a single record.
 
         If record_id is a DOI string, perform a search for that DOI and
-        return the first match's parsed metadata.
+        return the first match's parsed metadata. Unknown records give an
+        error flagged with ``"not_found": True``.
         """
+        return run_flow(self._record_metadata_flow(record_id))
+
+    def _record_metadata_flow(self, record_id: Any) -> Flow:
         try:
             is_valid, normalized, validation_error = self.validate_record_id(record_id)
             if not is_valid:
@@ -100,32 +108,30 @@ class ZenodoExtractor:
 
             # If numeric recid, retrieve directly
             if isinstance(normalized, int):
-                url = f"{self.base_url}/{normalized}"
-                resp = self.session.get(url, headers=self.headers, timeout=30)
-                if resp.status_code == 200:
-                    try:
-                        data = resp.json()
-                        parsed = self.parse_metadata(data)
-                        parsed_url = self.build_record_url(normalized).get("url", "")
-                        return parsed | {"url": parsed_url}
-                    except json.JSONDecodeError as e:
-                        return {"error": f"Invalid JSON response from Zenodo API: {e}"}
-                elif resp.status_code == 404:
-                    return {"error": f"Record '{normalized}' not found."}
-                else:
+                resp = yield self._get, f"{self.base_url}/{normalized}"
+                if resp.status_code == 404:
+                    return {"error": f"Record '{normalized}' not found.", "not_found": True}
+                if resp.status_code != 200:
                     return {"error": f"Zenodo API returned status {resp.status_code}."}
+                try:
+                    data = resp.json()
+                except json.JSONDecodeError as e:
+                    return {"error": f"Invalid JSON response from Zenodo API: {e}"}
+                parsed = self.parse_metadata(data)
+                parsed_url = self.build_record_url(normalized).get("url", "")
+                return parsed | {"url": parsed_url}
 
             # DOI case: search for DOI
             doi = normalized
             query = f'doi:"{doi}"'
-            search = self.search_records(
+            search = yield from self._search_flow(
                 query=query, page=1, size=1, load_metadata=True
             )
-            if "error" in search:
+            if "error" in search and not search.get("not_found"):
                 return search
             hits = search.get("hits", [])
             if not hits:
-                return {"error": f"Record with DOI '{doi}' not found."}
+                return {"error": f"Record with DOI '{doi}' not found.", "not_found": True}
             # return parsed metadata from first hit
             first = hits[0]
             # parsed metadata may be under 'parsed_metadata' or 'metadata'
@@ -138,16 +144,8 @@ class ZenodoExtractor:
             )
             return parsed | {"url": parsed_url}
 
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. Zenodo server may be slow."}
-        except requests.exceptions.ConnectionError:
-            return {
-                "error": "Cannot connect to Zenodo server. Check your internet connection."
-            }
-        except requests.exceptions.RequestException as e:
-            return {"error": f"Network error: {e}"}
         except Exception as e:
-            return {"error": f"Unexpected error: {e}"}
+            return self._network_error(e)
 
     def search_records(
         self,
@@ -161,97 +159,94 @@ class ZenodoExtractor:
 
         Defaults to the configured community and record_type.
         """
+        return run_flow(self._search_flow(query, page, size, load_metadata, filters))
+
+    def _search_flow(
+        self,
+        query: str = "",
+        page: int = 1,
+        size: int = 25,
+        load_metadata: bool = True,
+        filters: tuple[tuple[str, str]] | None = None,
+    ) -> Flow:
         try:
             if not isinstance(query, str):
                 return {"error": "Query must be a string."}
 
             # If filters are provided, ensure metadata is loaded
-            filters_applied = bool(filters)
-            if filters_applied:
+            if filters:
                 load_metadata = True
 
-            params = {
-                "q": query,
-                "page": page,
-                "size": size,
-                "communities": self.community,
-                "type": self.record_type,
-            }
-
-            resp = self.session.get(
-                self.base_url, headers=self.headers, params=params, timeout=30
-            )
-            if resp.status_code == 200:
-                try:
-                    data = resp.json()
-                except json.JSONDecodeError as e:
-                    return {"error": f"Invalid JSON response from Zenodo API: {e}"}
+            resp = yield self._get, self.base_url, self._search_params(query, page, size)
+            if resp.status_code != 200:
+                return self._search_status_error(resp.status_code)
+            try:
+                data = resp.json()
+            except json.JSONDecodeError as e:
+                return {"error": f"Invalid JSON response from Zenodo API: {e}"}
 
-                hits = (
-                    data.get("hits", {}).get("hits", [])
-                    if isinstance(data.get("hits"), dict)
-                    else data.get("hits", [])
-                )
-                total = (
-                    data.get("hits", {}).get("total")
-                    if isinstance(data.get("hits"), dict)
-                    else data.get("total", 0)
-                )
+            hits, total = self._search_hits(data)
 
-                if not data or (isinstance(total, int) and total == 0):
-                    return {"error": "No results found.", "hits": []}
+            if not data or (isinstance(total, int) and total == 0):
+                return {"error": "No results found.", "hits": [], "not_found": True}
 
-                if load_metadata:
-                    hits = self._hit_metadata(hits)
+            if load_metadata:
+                hits = self._hit_metadata(hits)
 
-                hits = self._hit_url(hits)
+            hits = self._hit_url(hits)
 
-                if filters_applied:
-                    hits = self._apply_filters(hits, filters)
+            if not filters:
+                return {"total": total, "hits": hits}
 
-                    page_size_met = len(hits) >= size
-                    pages_fetched = 1
-                    if not page_size_met:
-                        hits, page_size_met, pages_fetched = (
-                            self._backfill_filtered_results(
-                                hits, page, size, filters, query
-                            )
-                        )
-
-                    return {
-                        "totalHits": total,
-                        "hits": hits,
-                        "hits_returned": len(hits),
-                        "page": page,
-                        "pageSize": size,
-                        "pages_fetched": pages_fetched,
-                        "filters_applied": True,
-                        "page_size_met": page_size_met,
-                    }
+            hits = self._apply_filters(hits, filters)
 
-                return {"total": total, "hits": hits}
+            page_size_met = len(hits) >= size
+            pages_fetched = 1
+            if not page_size_met:
+                hits, page_size_met, pages_fetched = yield from self._backfill_flow(
+                    hits, page, size, filters, query
+                )
 
-            elif resp.status_code == 400:
-                return {"error": "Bad request. Check your search parameters."}
-            elif resp.status_code == 403:
-                return {
-                    "error": "Access forbidden. Community or collection may be restricted."
-                }
-            elif resp.status_code in (500, 503):
-                return {"error": "Zenodo server error. Please try again later."}
-            else:
-                return {"error": f"Zenodo API returned status {resp.status_code}."}
-
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. Zenodo server may be slow."}
-        except requests.exceptions.ConnectionError:
             return {
-                "error": "Cannot connect to Zenodo server. Check your internet connection."
+                "totalHits": total,
+                "hits": hits,
+                "hits_returned": len(hits),
+                "page": page,
+                "pageSize": size,
+                "pages_fetched": pages_fetched,
+                "filters_applied": True,
+                "page_size_met": page_size_met,
             }
-        except requests.exceptions.RequestException as e:
-            return {"error": f"Network error: {e}"}
+
         except Exception as e:
-            return {"error": f"Unexpected error: {e}"}
+            return self._network_error(e)
+
+    def _search_params(self, query: str, page: int, size: int) -> dict[str, Any]:
+        return {
+            "q": query,
+            "page": page,
+            "size": size,
+            "communities": self.community,
+            "type": self.record_type,
+        }
+
+    def _search_hits(self, data: dict[str, Any]) -> tuple[list[dict[str, Any]], Any]:
+        """``(hits, total)`` of a search response."""
+        if isinstance(data.get("hits"), dict):
+            return data["hits"].get("hits", []), data["hits"].get("total")
+        return data.get("hits", []), data.get("total", 0)
+
+    def _search_status_error(self, status_code: int) -> dict[str, Any]:
+        """Error of a search request that did not answer 200."""
+        if status_code == 400:
+            return {"error": "Bad request. Check your search parameters."}
+        elif status_code == 403:
+            return {
+                "error": "Access forbidden. Community or collection may be restricted."
+            }
+        elif status_code in (500, 503):
+            return {"error": "Zenodo server error. Please try again later."}
+        return {"error": f"Zenodo API returned status {status_code}."}
 
     def list_records(
         self,
@@ -262,12 +257,22 @@ class ZenodoExtractor:
         filters: tuple[tuple[str, str]]|None = None,
     ) -> dict[str, Any]:
         """list records for the configured community/type (wrapper for search_records)."""
+        return run_flow(self._list_flow(page, size, include_urls, load_metadata, filters))
+
+    def _list_flow(
+        self,
+        page: int,
+        size: int,
+        include_urls: bool,
+        load_metadata: bool,
+        filters: tuple[tuple[str, str]] | None,
+    ) -> Flow:
         # If filters provided, require metadata and URLs
         if filters:
             load_metadata = True
             include_urls = True
 
-        result = self.search_records(
+        result = yield from self._search_flow(
             query="", page=page, size=size, load_metadata=load_metadata, filters=filters
         )
 
@@ -367,14 +372,14 @@ class ZenodoExtractor:
 
         return filtered
 
-    def _backfill_filtered_results(
+    def _backfill_flow(
         self,
         initial_hits: list[dict[str, Any]],
         page: int,
         page_size: int,
         filters: tuple[tuple[str, str]]|None,
         query: None | str = None,
-    ) -> tuple[list[dict[str, Any]], bool, int]:
+    ) -> Flow:
         """Fetch subsequent pages until page_size filtered results are collected or timeout.
 
         Returns (filtered_hits_trimmed, page_size_met, pages_fetched).
@@ -390,24 +395,12 @@ class ZenodoExtractor:
 
             current_page += 1
             try:
-                params = {
-                    "q": query or "",
-                    "page": current_page,
-                    "size": page_size,
-                    "communities": self.community,
-                    "type": self.record_type,
-                }
-                resp = self.session.get(
-                    self.base_url, headers=self.headers, params=params, timeout=30
+                resp = yield self._get, self.base_url, self._search_params(
+                    query or "", current_page, page_size
                 )
                 if resp.status_code != 200:
                     break
-                data = resp.json()
-                next_hits = (
-                    data.get("hits", {}).get("hits", [])
-                    if isinstance(data.get("hits"), dict)
-                    else data.get("hits", [])
-                )
+                next_hits, _ = self._search_hits(resp.json())
                 if not next_hits:
                     break
 
@@ -423,6 +416,21 @@ class ZenodoExtractor:
         page_size_met = len(filtered) >= page_size
         return filtered[:page_size], page_size_met, pages_fetched
 
+    # Transport (blocking; see AsyncZenodoExtractor)
+    def _get(self, url: str, params: dict[str, Any] | None = None) -> requests.Response:
+        return self.session.get(url, headers=self.headers, params=params, timeout=30)
+
+    def _network_error(self, e: Exception) -> dict[str, Any]:
+        if isinstance(e, requests.exceptions.Timeout):
+            return {"error": "Request timed out. Zenodo server may be slow."}
+        if isinstance(e, requests.exceptions.ConnectionError):
+            return {
+                "error": "Cannot connect to Zenodo server. Check your internet connection."
+            }
+        if isinstance(e, requests.exceptions.RequestException):
+            return {"error": f"Network error: {e}"}
+        return {"error": f"Unexpected error: {e}"}
+
     def parse_metadata(self, raw_record: dict[str, Any]) -> dict[str, Any]:
         """Normalize Zenodo record structure into a simpler metadata dict.
 
@@ -482,3 +490,56 @@ class ZenodoExtractor:
 
         except Exception as e:
             return {"error": f"Failed to parse metadata: {e}", "raw": raw_record}
+
+
+class AsyncZenodoExtractor(ZenodoExtractor):
+    """Zenodo extractor for async views, on a shared ``httpx.AsyncClient``.
+
+    Same results as ``ZenodoExtractor``, whose flows it runs with an async
+    ``_get``; Zenodo search hits carry their metadata, so only the page
+    requests themselves are awaited.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.client = client
+
+    async def get_record_metadata(self, record_id: Any) -> dict[str, Any]:
+        """Async ``ZenodoExtractor.get_record_metadata``."""
+        return await run_flow_async(self._record_metadata_flow(record_id))
+
+    async def search_records(
+        self,
+        query: str = "",
+        page: int = 1,
+        size: int = 25,
+        load_metadata: bool = True,
+        filters: tuple[tuple[str, str]] | None = None,
+    ) -> dict[str, Any]:
+        """Async ``ZenodoExtractor.search_records``."""
+        return await run_flow_async(self._search_flow(query, page, size, load_metadata, filters))
+
+    async def list_records(
+        self,
+        page: int = 1,
+        size: int = 25,
+        include_urls: bool = False,
+        load_metadata: bool = False,
+        filters: tuple[tuple[str, str]] | None = None,
+    ) -> dict[str, Any]:
+        """Async ``ZenodoExtractor.list_records``."""
+        return await run_flow_async(self._list_flow(page, size, include_urls, load_metadata, filters))
+
+    async def _get(self, url: str, params: dict[str, Any] | None = None) -> httpx.Response:
+        return await self.client.get(url, headers=self.headers, params=params)
+
+    def _network_error(self, e: Exception) -> dict[str, Any]:
+        if isinstance(e, httpx.TimeoutException):
+            return {"error": "Request timed out. Zenodo server may be slow."}
+        if isinstance(e, httpx.ConnectError):
+            return {
+                "error": "Cannot connect to Zenodo server. Check your internet connection."
+            }
+        if isinstance(e, httpx.HTTPError):
+            return {"error": f"Network error: {e}"}
+        return {"error": f"Unexpected error: {e}"}
@@ -1,4 +1,7 @@
 #!/bin/sh
 
-# Start Flask app
+# Start Flask app; with VHP_ASGI=1 under uvicorn instead (see asgi.py)
+if [ "$VHP_ASGI" = "1" ]; then
+    exec uvicorn asgi:application --host 0.0.0.0 --port 5050
+fi
 python app.py
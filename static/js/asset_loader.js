@@ -0,0 +1,84 @@
+/* ============================================================================
+   Lazy loading of heavy libraries (JSmol, marked.js)
+   ============================================================================ */
+
+// Templates declare the libraries they need with {% set page_assets = {...} %};
+// base.html turns that into window.VHP_ASSETS (see utils/assets.py). Nothing is
+// downloaded up front; each asset is fetched according to its strategy:
+//   defer   -> after the page has been parsed
+//   idle    -> when the browser is idle
+//   visible -> when an element with data-asset="<name>" scrolls into view
+//   demand  -> only when a script calls VHPAssets.load("<name>")
+// VHPAssets.load() returns a promise, so page scripts can wait for a library
+// instead of assuming it is present.
+
+(function (window, document) {
+  const manifest = window.VHP_ASSETS || {};
+  const pending = {};
+
+  function load(name) {
+    if (pending[name]) return pending[name];
+
+    const asset = manifest[name];
+    if (!asset) {
+      return Promise.reject(new Error(`[VHPAssets] "${name}" is not declared by this page`));
+    }
+    if (asset.global && window[asset.global] !== undefined) {
+      pending[name] = Promise.resolve(window[asset.global]);
+      return pending[name];
+    }
+
+    pending[name] = new Promise((resolve, reject) => {
+      const script = document.createElement("script");
+      script.src = asset.src;
+      script.async = true;
+      script.onload = () => resolve(asset.global ? window[asset.global] : undefined);
+      script.onerror = () => {
+        delete pending[name]; // allow a retry
+        reject(new Error(`[VHPAssets] failed to load ${asset.src}`));
+      };
+      document.head.appendChild(script);
+    });
+    return pending[name];
+  }
+
+  function whenVisible(element, name) {
+    const visible = new Promise((resolve) => {
+      if (!element || !("IntersectionObserver" in window)) {
+        resolve();
+        return;
+      }
+      const observer = new IntersectionObserver((entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) {
+          observer.disconnect();
+          resolve();
+        }
+      }, { rootMargin: "200px" });
+      observer.observe(element);
+    });
+    return visible.then(() => load(name));
+  }
+
+  function start() {
+    Object.entries(manifest).forEach(([name, asset]) => {
+      const report = (err) => console.warn(err.message);
+      if (asset.strategy === "defer") {
+        load(name).catch(report);
+      } else if (asset.strategy === "idle") {
+        (window.requestIdleCallback || window.setTimeout)(() => load(name).catch(report));
+      } else if (asset.strategy === "visible") {
+        document.querySelectorAll(`[data-asset~="${name}"]`).forEach((element) => {
+          whenVisible(element, name).catch(report);
+        });
+      }
+    });
+  }
+
+  if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", start);
+  } else {
+    start();
+  }
+
+  window.VHPAssets = { load, whenVisible };
+})(window, document);
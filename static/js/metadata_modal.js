@@ -4,7 +4,8 @@
  * 
  * Requirements:
  * - Bootstrap 5 (for Modal component)
- * - marked.js library (for markdown parsing)
+ * - marked.js library (for markdown parsing), fetched through VHPAssets on
+ *   first use when the page declares it in page_assets
  * 
  * HTML Structure Required:
  * - Modal with id="metadataModal"
@@ -128,10 +129,13 @@
         // Get the markdown text
         const markdownText = await response.text();
 
-        // Check if marked.js is available
+        // Load marked.js on first use (declared by the page, see utils/assets.py)
         if (typeof marked === 'undefined') {
-          console.error('[MetadataModal] marked.js library not found');
-          throw new Error('Markdown parser not available');
+          if (!window.VHPAssets) {
+            console.error('[MetadataModal] marked.js library not found');
+            throw new Error('Markdown parser not available');
+          }
+          await window.VHPAssets.load('marked');
         }
 
         // Parse markdown to HTML using marked.js
@@ -0,0 +1 @@
+# This file is intentionally left blank to make the directory a package.
@@ -0,0 +1,65 @@
+import base64
+import json
+from typing import Any, Iterable, Mapping
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class BadRequest(ValueError):
+    """An invalid query argument; the message is returned to the client."""
+
+
+def encode_cursor(state: dict[str, Any]) -> str:
+    """Opaque, URL-safe cursor for the next page."""
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> dict[str, Any]:
+    if not cursor:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (ValueError, TypeError):
+        raise BadRequest("invalid cursor")
+    if not isinstance(state, dict):
+        raise BadRequest("invalid cursor")
+    return state
+
+
+def parse_limit(value: str | None) -> int:
+    if value in (None, ""):
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise BadRequest("limit must be an integer")
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def parse_fields(value: str | None) -> list[str] | None:
+    """``fields=a,b,c`` -> ['a', 'b', 'c']; None when all fields are wanted."""
+    if not value:
+        return None
+    return [field.strip() for field in value.split(",") if field.strip()]
+
+
+def plain(value: Any) -> Any:
+    """Turn read-only catalog mappings and tuples into JSON-serializable values."""
+    if isinstance(value, Mapping):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [plain(item) for item in value]
+    return value
+
+
+def project(
+    record: Mapping[str, Any], fields: Iterable[str] | None, exclude: Iterable[str] = ()
+) -> dict[str, Any]:
+    """Keep only ``fields`` of a record; without ``fields``, all but ``exclude``."""
+    if fields is None:
+        exclude = set(exclude)
+        return {key: plain(value) for key, value in record.items() if key not in exclude}
+    return {field: plain(record[field]) for field in fields if field in record}
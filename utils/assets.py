@@ -0,0 +1,110 @@
+import hashlib
+import os
+import threading
+
+from flask import request, url_for
+
+# Heavy front-end libraries that templates load on request instead of on
+# every page. 'src' is a path under static/ or an absolute URL; 'global' is
+# the window variable the library defines, so the loader can tell when it is
+# already present.
+HEAVY_ASSETS = {
+    "jsmol": {"src": "js/JSmol.min.js", "global": "Jmol"},
+    "marked": {"src": "https://cdn.jsdelivr.net/npm/marked/marked.min.js", "global": "marked"},
+}
+
+# How a declared asset is loaded by static/js/asset_loader.js:
+#   defer   -- right after the page has been parsed
+#   idle    -- when the browser is idle
+#   visible -- when an element with data-asset="<name>" scrolls into view
+#   demand  -- only when a script calls VHPAssets.load("<name>")
+STRATEGIES = ("defer", "idle", "visible", "demand")
+
+# Declared for every page by base.html; templates may override the strategy.
+BASE_ASSETS: dict[str, str] = {}
+
+ONE_YEAR = 60 * 60 * 24 * 365
+
+
+class StaticAssets:
+    """Fingerprinted static URLs and per-template heavy asset declarations.
+
+    Every ``url_for('static', ...)`` gets a ``v=<content hash>`` argument.
+    Requests carrying the current hash are answered with a one-year immutable
+    Cache-Control header, since a changed file gets a new URL.
+    """
+
+    def __init__(self, app=None):
+        self._hashes: dict[str, tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.app = app
+        app.url_defaults(self.add_fingerprint)
+        app.after_request(self.cache_fingerprinted)
+        app.add_template_global(self.asset_manifest)
+
+    def fingerprint(self, filename: str) -> str | None:
+        """Short sha256 of a static file, recomputed when its mtime changes."""
+        path = os.path.join(self.app.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._hashes.get(filename)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        digest = hashlib.sha256()
+        with open(path, "rb") as fh:
+            for chunk in iter(lambda: fh.read(1 << 16), b""):
+                digest.update(chunk)
+        value = digest.hexdigest()[:12]
+        with self._lock:
+            self._hashes[filename] = (mtime, value)
+        return value
+
+    def add_fingerprint(self, endpoint: str, values: dict) -> None:
+        if endpoint != "static" or "v" in values or "filename" not in values:
+            return
+        fingerprint = self.fingerprint(values["filename"])
+        if fingerprint:
+            values["v"] = fingerprint
+
+    def cache_fingerprinted(self, response):
+        if request.endpoint != "static" or response.status_code not in (200, 304):
+            return response
+        version = request.args.get("v")
+        filename = (request.view_args or {}).get("filename")
+        if version and filename and version == self.fingerprint(filename):
+            response.cache_control.no_cache = None
+            response.cache_control.public = True
+            response.cache_control.max_age = ONE_YEAR
+            response.cache_control.immutable = True
+        return response
+
+    def asset_manifest(self, declared: dict | None = None) -> dict:
+        """Loader config for the heavy assets a template declared.
+
+        Args:
+            declared (dict): asset name -> loading strategy, set by the
+                template as ``{% set page_assets = {...} %}``
+
+        Returns:
+            dict: asset name -> {src, global, strategy}
+        """
+        wanted = BASE_ASSETS | (declared or {})
+        manifest = {}
+        for name, strategy in wanted.items():
+            asset = HEAVY_ASSETS.get(name)
+            if asset is None:
+                raise ValueError(f"Unknown asset '{name}'")
+            if strategy not in STRATEGIES:
+                raise ValueError(f"Unknown loading strategy '{strategy}' for asset '{name}'")
+            src = asset["src"]
+            if "://" not in src:
+                src = url_for("static", filename=src)
+            manifest[name] = {"src": src, "global": asset["global"], "strategy": strategy}
+        return manifest
@@ -0,0 +1,311 @@
+import functools
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+# Returned by CacheStats.get_memoized when nothing is cached, as None may be
+# a cached result.
+MISSING = object()
+
+# Cache keys tracked per function. Keys come from request arguments (search
+# queries, dataset and compound ids), so the least recently filled ones are
+# dropped past this; their entries are then no longer counted.
+MAX_TRACKED_ENTRIES = 10_000
+
+
+def _entry_size(value: Any) -> int:
+    """Pickled size of a cached value, which is what SimpleCache stores."""
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class FunctionCacheStats:
+    """Counters for a single memoized function"""
+
+    def __init__(self, name: str, timeout: int | None, max_entries: int = MAX_TRACKED_ENTRIES):
+        self.name = name
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.fills = 0
+        self.fill_errors = 0
+        self.fill_seconds_total = 0.0
+        self.fill_seconds_max = 0.0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # cache_key -> (expires_at, stored_bytes); expires_at is None for no expiry.
+        # Oldest fill first, at most max_entries keys.
+        self.entries: OrderedDict[str, tuple[float | None, int]] = OrderedDict()
+
+    def track(self, key: str, entry: tuple[float | None, int]) -> None:
+        """Record the entry stored for ``key``, dropping the oldest past ``max_entries``."""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def live_entries(self, now: float) -> dict[str, tuple[float | None, int]]:
+        return {
+            key: entry
+            for key, entry in self.entries.items()
+            if entry[0] is None or entry[0] > now
+        }
+
+    def prune(self, now: float) -> None:
+        """Forget entries that expired more than one timeout ago.
+
+        Recently expired entries are kept so that a refill can still be told
+        apart from an eviction.
+        """
+        grace = self.timeout or 0
+        self.entries = OrderedDict(
+            (key, entry)
+            for key, entry in self.entries.items()
+            if entry[0] is None or entry[0] + grace > now
+        )
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        live = self.live_entries(now)
+        lookups = self.hits + self.misses
+        return {
+            "function": self.name,
+            "timeout": self.timeout,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "fills": self.fills,
+            "fill_errors": self.fill_errors,
+            "fill_seconds_total": round(self.fill_seconds_total, 6),
+            "fill_seconds_avg": (
+                round(self.fill_seconds_total / self.fills, 6) if self.fills else None
+            ),
+            "fill_seconds_max": round(self.fill_seconds_max, 6),
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "entries": len(live),
+            "stored_bytes": sum(size for _, size in live.values()),
+        }
+
+
+class CacheStats:
+    """Instrumented drop-in for ``Cache.memoize``.
+
+    Wraps Flask-Caching's memoize so every lookup is counted as a hit or a
+    miss, and every fill (a call to the undecorated function) records its
+    latency and the pickled size of the stored value. A miss on a key whose
+    previous fill has not expired yet means the backend dropped it early, which
+    is counted as an eviction.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._functions: dict[str, FunctionCacheStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def memoize(
+        self, timeout: int | None = None, name: str | None = None, cache=None, **kwargs
+    ):
+        """Same signature as ``cache.memoize``; ``name`` overrides the metric label.
+
+        ``cache`` stores the results in another ``Cache`` than the one the
+        counters were created for, e.g. a backend shared between workers.
+        """
+        backend = cache or self.cache
+        response_filter = kwargs.get("response_filter")
+
+        def decorator(f: Callable) -> Callable:
+            stats = FunctionCacheStats(name or f.__name__, timeout)
+            with self._lock:
+                self._functions[stats.name] = stats
+
+            @functools.wraps(f)
+            def filler(*args, **kw):
+                start = time.perf_counter()
+                try:
+                    rv = f(*args, **kw)
+                except Exception:
+                    with self._lock:
+                        stats.fill_errors += 1
+                    raise
+                elapsed = time.perf_counter() - start
+                # Set after the call so nested memoized lookups inside f
+                # cannot clobber the flag.
+                self._local.filled = True
+                stored = response_filter is None or response_filter(rv)
+                self._record_fill(stats, memoized, args, kw, rv, elapsed, stored)
+                return rv
+
+            memoized = backend.memoize(timeout=timeout, **kwargs)(filler)
+
+            @functools.wraps(memoized)
+            def lookup(*args, **kw):
+                outer = getattr(self._local, "filled", False)
+                self._local.filled = False
+                try:
+                    rv = memoized(*args, **kw)
+                    filled = self._local.filled
+                finally:
+                    self._local.filled = outer
+                with self._lock:
+                    if filled:
+                        stats.misses += 1
+                    else:
+                        stats.hits += 1
+                return rv
+
+            lookup.cache_stats = stats
+            lookup.cache_backend = backend
+            return lookup
+
+        return decorator
+
+    def _resolve_timeout(self, memoized: Callable) -> int:
+        timeout = memoized.cache_timeout
+        if timeout is None:
+            timeout = self.cache.app.config.get("CACHE_DEFAULT_TIMEOUT") or 0
+        return timeout
+
+    def _record_fill(
+        self, stats, memoized, args, kwargs, rv, elapsed: float, stored: bool = True
+    ) -> None:
+        """Count a fill; ``stored`` is False when ``response_filter`` rejected ``rv``."""
+        if not stored:
+            with self._lock:
+                stats.fills += 1
+                stats.fill_seconds_total += elapsed
+                stats.fill_seconds_max = max(stats.fill_seconds_max, elapsed)
+            return
+        try:
+            cache_key = memoized.make_cache_key(memoized.uncached, *args, **kwargs)
+        except Exception:
+            cache_key = repr((args, sorted(kwargs.items())))
+        size = _entry_size(rv)
+        timeout = self._resolve_timeout(memoized)
+        now = time.time()
+
+        with self._lock:
+            previous = stats.entries.get(cache_key)
+            if previous is not None:
+                expires_at = previous[0]
+                if expires_at is None or expires_at > now:
+                    stats.evictions += 1
+                else:
+                    stats.expirations += 1
+            stats.fills += 1
+            stats.fill_seconds_total += elapsed
+            stats.fill_seconds_max = max(stats.fill_seconds_max, elapsed)
+            stats.track(cache_key, (now + timeout if timeout else None, size))
+
+    def delete_memoized(self, f: Callable, *args, **kwargs) -> None:
+        """``cache.delete_memoized`` that is counted as an invalidation.
+
+        Without arguments every entry of ``f`` is dropped, otherwise only the
+        one matching the arguments.
+        """
+        stats = f.cache_stats
+        f.cache_backend.delete_memoized(f, *args, **kwargs)
+        with self._lock:
+            if args or kwargs:
+                cache_key = f.make_cache_key(f.uncached, *args, **kwargs)
+                stats.invalidations += 1 if stats.entries.pop(cache_key, None) else 0
+            else:
+                stats.invalidations += len(stats.entries)
+                stats.entries.clear()
+
+    def get_memoized(self, f: Callable, *args, **kwargs) -> Any:
+        """Cached result of ``f(*args, **kwargs)``, or ``MISSING`` without filling it.
+
+        Counted as a hit or a miss like a call of ``f``. Callers that compute
+        missing values themselves store them with ``fill_memoized`` or
+        ``set_memoized(..., elapsed=...)`` so the fill is counted too.
+        """
+        cache_key = f.make_cache_key(f.uncached, *args, **kwargs)
+        value = f.cache_backend.get(cache_key)
+        found = value is not None or f.cache_backend.has(cache_key)
+        with self._lock:
+            if found:
+                f.cache_stats.hits += 1
+            else:
+                f.cache_stats.misses += 1
+        return value if found else MISSING
+
+    def fill_memoized(self, f: Callable, *args, **kwargs) -> Any:
+        """Compute ``f(*args, **kwargs)`` without a lookup and store it.
+
+        For a miss found with ``get_memoized``, e.g. to run the fill on
+        another thread; the fill is counted as in a call of ``f``.
+        """
+        rv = f.uncached(*args, **kwargs)
+        cache_key = f.make_cache_key(f.uncached, *args, **kwargs)
+        f.cache_backend.set(cache_key, rv, timeout=f.cache_timeout)
+        return rv
+
+    def set_memoized(
+        self, f: Callable, value: Any, *args, elapsed: float | None = None, **kwargs
+    ) -> None:
+        """Store ``value`` as the result of ``f(*args, **kwargs)``.
+
+        With ``elapsed``, the seconds it took to compute, this is the fill of
+        a miss found with ``get_memoized``. Without it, the cache is primed
+        with a known-fresh value instead of deleting the entry and letting
+        the next request refill it.
+        """
+        stats = f.cache_stats
+        cache_key = f.make_cache_key(f.uncached, *args, **kwargs)
+        f.cache_backend.set(cache_key, value, timeout=f.cache_timeout)
+        if elapsed is not None:
+            self._record_fill(stats, f, args, kwargs, value, elapsed)
+            return
+        size = _entry_size(value)
+        timeout = self._resolve_timeout(f)
+        now = time.time()
+        with self._lock:
+            if cache_key in stats.entries:
+                stats.invalidations += 1
+            stats.track(cache_key, (now + timeout if timeout else None, size))
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            for stats in self._functions.values():
+                stats.prune(now)
+            return {name: s.as_dict(now) for name, s in sorted(self._functions.items())}
+
+    def prometheus(self, prefix: str = "vhp_cache") -> str:
+        """Render the snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        metrics = [
+            ("hits_total", "counter", "Cache hits per memoized function.", "hits"),
+            ("misses_total", "counter", "Cache misses per memoized function.", "misses"),
+            ("fills_total", "counter", "Completed cache fills per memoized function.", "fills"),
+            ("fill_errors_total", "counter", "Fills that raised an exception.", "fill_errors"),
+            ("fill_seconds_sum", "counter", "Total time spent filling the cache.", "fill_seconds_total"),
+            ("fill_seconds_max", "gauge", "Slowest fill observed.", "fill_seconds_max"),
+            ("evictions_total", "counter", "Entries dropped by the backend before their timeout.", "evictions"),
+            ("expirations_total", "counter", "Entries refilled after their timeout ran out.", "expirations"),
+            ("invalidations_total", "counter", "Entries deleted on purpose.", "invalidations"),
+            ("entries", "gauge", "Live entries per memoized function.", "entries"),
+            ("stored_bytes", "gauge", "Pickled size of live entries.", "stored_bytes"),
+            ("timeout_seconds", "gauge", "Configured timeout per memoized function.", "timeout"),
+        ]
+        lines = []
+        for suffix, kind, help_text, field in metrics:
+            metric = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, stats in snapshot.items():
+                value = stats.get(field)
+                if value is None:
+                    continue
+                label = name.replace("\\", "\\\\").replace('"', '\\"')
+                lines.append(f'{metric}{{function="{label}"}} {value}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,269 @@
+import gzip
+import mimetypes
+import os
+import zlib
+from typing import Iterable, Iterator
+
+from flask import request, send_from_directory
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/xml",
+    "text/csv",
+    "text/markdown",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+}
+PRECOMPRESS_EXTENSIONS = (".js", ".css", ".json", ".svg", ".html", ".csv", ".txt", ".xml", ".md")
+
+# file suffix of the precompressed sibling for each Content-Encoding
+SIBLING_SUFFIX = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> list[str]:
+    """Encodings this process can produce, in order of preference."""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encodings, offered: list[str] | None = None) -> str | None:
+    """Pick the best encoding offered that the client accepts (honours q=0)."""
+    offered = offered if offered is not None else available_encodings()
+    if not offered:
+        return None
+    return accept_encodings.best_match(offered)
+
+
+def compress_bytes(data: bytes, encoding: str, level: int | None = None) -> bytes:
+    """Compress data with gzip (levels 1-9) or brotli (quality 0-11)."""
+    if encoding == "br":
+        return brotli.compress(data, quality=5 if level is None else level)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def compress_chunks(chunks: Iterable[bytes], encoding: str, level: int | None = None) -> Iterator[bytes]:
+    """Compress a streamed body, flushing after every chunk.
+
+    Each chunk can be decoded by the client as soon as it arrives, so a
+    streamed page still renders progressively.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=5 if level is None else level)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    elif encoding == "gzip":
+        # wbits 16 + 15 writes a gzip header and trailer
+        compressor = zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, finish = compressor.compress, compressor.flush
+
+        def flush() -> bytes:
+            return compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    else:
+        raise ValueError(f"Unsupported encoding: {encoding}")
+    try:
+        for chunk in chunks:
+            if chunk:
+                yield compress(chunk) + flush()
+        yield finish()
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+
+class ResponseCompressor:
+    """Compress dynamic responses and serve precompressed static files.
+
+    Dynamic text responses above ``COMPRESS_MIN_SIZE`` bytes are gzip or
+    brotli encoded depending on the client's Accept-Encoding; streamed ones
+    are encoded chunk by chunk, whatever their size. Static files
+    are served from ``.br``/``.gz`` siblings written by ``precompress_tree``
+    when they exist and are not older than the original.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+        app.config.setdefault("COMPRESS_GZIP_LEVEL", 6)
+        app.config.setdefault("COMPRESS_BR_QUALITY", 5)
+        self.app = app
+        app.after_request(self.after_request)
+        if app.has_static_folder:
+            app.view_functions["static"] = self.send_static_file
+
+    def after_request(self, response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        if response.is_streamed:
+            return self.compress_stream(response)
+        data = response.get_data()
+        if len(data) < self.app.config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        level = self._level(encoding)
+        response.set_data(compress_bytes(data, encoding, level))
+        response.headers["Content-Encoding"] = encoding
+        etag, _ = response.get_etag()
+        if etag:
+            # the representation changed, so the original ETag no longer applies
+            response.set_etag(f"{etag}-{encoding}", weak=True)
+            if request.if_none_match:
+                # revalidation of the compressed representation
+                response.make_conditional(request)
+        return response
+
+    def _level(self, encoding: str) -> int:
+        if encoding == "br":
+            return self.app.config["COMPRESS_BR_QUALITY"]
+        return self.app.config["COMPRESS_GZIP_LEVEL"]
+
+    def compress_stream(self, response):
+        """Compress a streamed response chunk by chunk (see ``compress_chunks``).
+
+        Its size is not known up front, so ``COMPRESS_MIN_SIZE`` does not apply.
+        """
+        encoding = negotiate_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+        body = response.response
+        response.response = compress_chunks(response.iter_encoded(), encoding, self._level(encoding))
+        if hasattr(body, "close"):
+            response.call_on_close(body.close)
+        response.headers["Content-Encoding"] = encoding
+        response.headers.pop("Content-Length", None)
+        return response
+
+    def send_static_file(self, filename: str):
+        folder = self.app.static_folder
+        source = safe_join(folder, filename)
+        mimetype = mimetypes.guess_type(filename)[0]
+        max_age = self.app.get_send_file_max_age(filename)
+
+        if source is not None and mimetype in COMPRESSIBLE_MIMETYPES:
+            offered = [
+                encoding
+                for encoding, suffix in SIBLING_SUFFIX.items()
+                if _fresh_sibling(source, source + suffix)
+            ]
+            encoding = negotiate_encoding(request.accept_encodings, offered)
+            if encoding is not None:
+                response = send_from_directory(
+                    folder,
+                    filename + SIBLING_SUFFIX[encoding],
+                    mimetype=mimetype,
+                    max_age=max_age,
+                )
+                response.headers["Content-Encoding"] = encoding
+                response.vary.add("Accept-Encoding")
+                return response
+
+        response = send_from_directory(folder, filename, max_age=max_age)
+        if mimetype in COMPRESSIBLE_MIMETYPES:
+            response.vary.add("Accept-Encoding")
+        return response
+
+
+def _fresh_sibling(source: str, sibling: str) -> bool:
+    try:
+        return os.stat(sibling).st_mtime >= os.stat(source).st_mtime
+    except OSError:
+        return False
+
+
+def precompress_tree(
+    folder: str,
+    extensions: tuple[str, ...] = PRECOMPRESS_EXTENSIONS,
+    min_size: int = 1024,
+    force: bool = False,
+) -> list[dict]:
+    """Write .gz (and .br when brotli is installed) siblings for static files.
+
+    Siblings that would not be smaller than the original are removed, so the
+    original is served instead. Up-to-date siblings are left alone unless
+    ``force`` is set.
+
+    Returns:
+        list: one row per source file with its raw and encoded sizes
+    """
+    rows = []
+    for root, _, files in os.walk(folder):
+        for name in sorted(files):
+            if not name.endswith(extensions):
+                continue
+            source = os.path.join(root, name)
+            size = os.path.getsize(source)
+            if size < min_size:
+                continue
+
+            row = {"path": os.path.relpath(source, folder), "raw": size}
+            data = None
+            for encoding in available_encodings():
+                sibling = source + SIBLING_SUFFIX[encoding]
+                if not force and _fresh_sibling(source, sibling):
+                    row[encoding] = os.path.getsize(sibling)
+                    continue
+                if data is None:
+                    with open(source, "rb") as fh:
+                        data = fh.read()
+                level = 11 if encoding == "br" else 9
+                encoded = compress_bytes(data, encoding, level)
+                if len(encoded) >= size:
+                    if os.path.exists(sibling):
+                        os.remove(sibling)
+                    continue
+                with open(sibling, "wb") as fh:
+                    fh.write(encoded)
+                row[encoding] = len(encoded)
+            rows.append(row)
+    return rows
+
+
+def size_report(folder: str, extensions: tuple[str, ...] = PRECOMPRESS_EXTENSIONS) -> dict[str, dict]:
+    """Sum raw and precompressed sizes per top-level directory of ``folder``.
+
+    Files without a sibling count with their raw size, which is what a client
+    downloads for them.
+    """
+    totals: dict[str, dict] = {}
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if not name.endswith(extensions):
+                continue
+            source = os.path.join(root, name)
+            rel = os.path.relpath(source, folder)
+            group = rel.split(os.sep, 1)[0] if os.sep in rel else "."
+            row = totals.setdefault(group, {"files": 0, "raw": 0, "gzip": 0, "br": 0})
+            size = os.path.getsize(source)
+            row["files"] += 1
+            row["raw"] += size
+            for encoding, suffix in SIBLING_SUFFIX.items():
+                sibling = source + suffix
+                row[encoding] += (
+                    os.path.getsize(sibling) if _fresh_sibling(source, sibling) else size
+                )
+    return totals
@@ -0,0 +1,80 @@
+import csv
+import json
+from typing import Any, Iterable, Iterator, Mapping
+
+from flask import Response
+
+from utils.api import BadRequest, parse_fields
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_format(value: str | None, accept=None) -> str:
+    """``format=`` argument, else the preferred ``Accept`` type; ndjson by default."""
+    if value:
+        if value not in EXPORT_FORMATS:
+            raise BadRequest(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+        return value
+    if accept is not None:
+        best = accept.best_match(list(EXPORT_FORMATS.values()))
+        for name, mimetype in EXPORT_FORMATS.items():
+            if mimetype == best:
+                return name
+    return "ndjson"
+
+
+def parse_columns(value: str | None, available: Iterable[str]) -> list[str]:
+    """``columns=a,b`` checked against ``available``; all of them when not given."""
+    available = list(available)
+    columns = parse_fields(value)
+    if columns is None:
+        return available
+    unknown = [column for column in columns if column not in available]
+    if unknown:
+        raise BadRequest(
+            f"unknown columns: {', '.join(unknown)}; available: {', '.join(available)}"
+        )
+    return list(dict.fromkeys(columns))
+
+
+class _Echo:
+    """File-like object for ``csv.writer`` that hands each line back."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value if item not in (None, ""))
+    return "" if value is None else value
+
+
+def ndjson_lines(rows: Iterable[Mapping[str, Any]], columns: list[str]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({column: row.get(column) for column in columns}) + "\n"
+
+
+def csv_lines(rows: Iterable[Mapping[str, Any]], columns: list[str]) -> Iterator[str]:
+    """CSV with a header line; list values are joined with "; "."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_cell(row.get(column)) for column in columns])
+
+
+def export_response(
+    rows: Iterable[Mapping[str, Any]], columns: list[str], fmt: str, name: str
+) -> Response:
+    """Stream ``rows`` as a download, one line per row.
+
+    ``rows`` is consumed lazily while the response is sent, so a generator
+    keeps memory use independent of the size of the export.
+    """
+    lines = csv_lines(rows, columns) if fmt == "csv" else ndjson_lines(rows, columns)
+    response = Response(lines, mimetype=EXPORT_FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+    return response
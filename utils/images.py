@@ -0,0 +1,286 @@
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from flask import abort, redirect, request, send_file, url_for
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is optional; without it originals are served
+    Image = None
+
+ONE_YEAR = 60 * 60 * 24 * 365
+
+# (magic bytes test, extension, mimetype) of the image types accepted
+IMAGE_TYPES = (
+    (lambda data: data.startswith(b"\x89PNG\r\n\x1a\n"), "png", "image/png"),
+    (lambda data: data.startswith(b"\xff\xd8\xff"), "jpg", "image/jpeg"),
+    (lambda data: data[:6] in (b"GIF87a", b"GIF89a"), "gif", "image/gif"),
+    (lambda data: data[:4] == b"RIFF" and data[8:12] == b"WEBP", "webp", "image/webp"),
+    (lambda data: b"<svg" in data[:1024].lower(), "svg", "image/svg+xml"),
+)
+MIMETYPES = {ext: mimetype for _, ext, mimetype in IMAGE_TYPES}
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+_GITHUB_BLOB_RE = re.compile(r"^https://github\.com/([^/]+)/([^/]+)/blob/(.+)$")
+
+
+def sniff_image(data: bytes) -> str | None:
+    """Extension of the image type ``data`` starts with, if it is one we accept."""
+    for test, ext, _ in IMAGE_TYPES:
+        if test(data):
+            return ext
+    return None
+
+
+def raw_github_url(url: str) -> str:
+    """github.com/<owner>/<repo>/blob/<path> pages -> the raw file URL."""
+    match = _GITHUB_BLOB_RE.match(url)
+    if match:
+        owner, repo, path = match.groups()
+        return f"https://raw.githubusercontent.com/{owner}/{repo}/{path}"
+    return url
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+class ImageProxy:
+    """Fetch remote images once, store them by content hash, serve thumbnails.
+
+    ``thumbnail_url(src, width)`` (a template global) returns
+    ``/img/<sha256>/<width>.<ext>`` for images already fetched; those URLs
+    never change content and are served with a one-year immutable
+    Cache-Control header. Images not fetched yet get ``/img/proxy?src=...``,
+    which fetches the image and redirects to the hashed URL.
+
+    Thumbnails are scaled to fit a ``width`` x ``width`` box and encoded as
+    WebP (PNG when Pillow lacks WebP support). Without Pillow, and for SVG
+    images, the stored original is served instead; SVGs are sandboxed by
+    their Content-Security-Policy so scripts in them cannot run on this
+    origin. Only sources passed to ``warm`` (the tool logos) on hosts
+    listed in ``IMAGE_PROXY_HOSTS`` are fetched, and nothing more is
+    stored once the store holds ``IMAGE_PROXY_MAX_STORE_BYTES``.
+    """
+
+    def __init__(self, app=None):
+        self._sources: dict[str, str] = {}
+        self._known: set[str] = set()
+        self._store_bytes = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="image-proxy")
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        app.config.setdefault("IMAGE_PROXY_DIR", os.path.join(app.instance_path, "images"))
+        app.config.setdefault(
+            "IMAGE_PROXY_HOSTS",
+            ("raw.githubusercontent.com", "github.com", "cloud.vhp4safety.nl"),
+        )
+        app.config.setdefault("IMAGE_PROXY_WIDTHS", (160, 320, 640))
+        app.config.setdefault("IMAGE_PROXY_MAX_BYTES", 10 * 1024 * 1024)
+        app.config.setdefault("IMAGE_PROXY_MAX_STORE_BYTES", 512 * 1024 * 1024)
+        self.app = app
+        self.root = app.config["IMAGE_PROXY_DIR"]
+        self._sources_path = os.path.join(self.root, "sources.json")
+        self._sources = self._read_sources()
+        self._store_bytes = self._stored_bytes()
+        app.add_url_rule("/img/proxy", "image_proxy", self.proxy_view)
+        app.add_url_rule(
+            "/img/<digest>/<int:width>.<ext>", "image_thumbnail", self.thumbnail_view
+        )
+        app.add_template_global(self.thumbnail_url)
+
+    def _read_sources(self) -> dict[str, str]:
+        try:
+            with open(self._sources_path, encoding="utf-8") as fh:
+                sources = json.load(fh)
+            return sources if isinstance(sources, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _stored_bytes(self) -> int:
+        total = 0
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(folder, name))
+                except OSError:
+                    pass
+        return total
+
+    def _reserve(self, size: int) -> bool:
+        """Count ``size`` more bytes against the store cap; False when they do not fit."""
+        with self._lock:
+            if self._store_bytes + size > self.app.config["IMAGE_PROXY_MAX_STORE_BYTES"]:
+                return False
+            self._store_bytes += size
+            return True
+
+    def _original_path(self, digest: str) -> str | None:
+        folder = os.path.join(self.root, "originals", digest[:2])
+        for _, ext, _ in IMAGE_TYPES:
+            path = os.path.join(folder, f"{digest}.{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def allowed(self, src: str) -> bool:
+        """Whether ``src`` (a raw URL) is a known logo on an allowed host."""
+        parsed = urlparse(src)
+        if parsed.scheme != "https" or parsed.hostname not in self.app.config["IMAGE_PROXY_HOSTS"]:
+            return False
+        with self._lock:
+            return src in self._known or src in self._sources
+
+    def thumbnail_format(self, digest: str) -> str:
+        """Extension thumbnails of an image are served with."""
+        original = self._original_path(digest)
+        original_ext = original.rsplit(".", 1)[1] if original else "png"
+        if Image is None or original_ext == "svg":
+            return original_ext
+        return "webp" if features.check("webp") else "png"
+
+    def resolve(self, src: str) -> str | None:
+        """Content hash of the image at ``src``, fetching it if needed."""
+        src = raw_github_url(src)
+        with self._lock:
+            digest = self._sources.get(src)
+        if digest and self._original_path(digest):
+            return digest
+        if not self.allowed(src):
+            return None
+
+        max_bytes = self.app.config["IMAGE_PROXY_MAX_BYTES"]
+        try:
+            with requests.get(src, timeout=10, stream=True) as resp:
+                if resp.status_code != 200:
+                    return None
+                data = bytearray()
+                for chunk in resp.iter_content(64 * 1024):
+                    data += chunk
+                    if len(data) > max_bytes:
+                        return None
+        except requests.RequestException:
+            return None
+        data = bytes(data)
+        ext = sniff_image(data)
+        if ext is None:
+            return None
+
+        digest = hashlib.sha256(data).hexdigest()
+        path = os.path.join(self.root, "originals", digest[:2], f"{digest}.{ext}")
+        if not os.path.exists(path):
+            if not self._reserve(len(data)):
+                return None
+            _write_atomic(path, data)
+        with self._lock:
+            self._sources[src] = digest
+            _write_atomic(self._sources_path, json.dumps(self._sources, sort_keys=True).encode())
+        return digest
+
+    def warm(self, sources) -> None:
+        """Allow ``sources`` and fetch them in the background, so pages get
+        hashed URLs right away."""
+        sources = [raw_github_url(src) for src in dict.fromkeys(sources) if src]
+        with self._lock:
+            self._known.update(sources)
+        for src in sources:
+            self._executor.submit(self.resolve, src)
+
+    def thumbnail_url(self, src: str | None, width: int = 320) -> str | None:
+        if not src:
+            return src
+        raw = raw_github_url(src)
+        if not self.allowed(raw):
+            return src
+        width = self._bounded_width(width)
+        with self._lock:
+            digest = self._sources.get(raw)
+        if digest and self._original_path(digest):
+            return url_for(
+                "image_thumbnail", digest=digest, width=width, ext=self.thumbnail_format(digest)
+            )
+        return url_for("image_proxy", src=raw, w=width)
+
+    def _bounded_width(self, width: int) -> int:
+        widths = sorted(self.app.config["IMAGE_PROXY_WIDTHS"])
+        return next((w for w in widths if w >= width), widths[-1])
+
+    def proxy_view(self):
+        src = request.args.get("src", "")
+        width = self._bounded_width(request.args.get("w", 320, type=int) or 320)
+        if not self.allowed(raw_github_url(src)):
+            abort(404)
+        digest = self.resolve(src)
+        if digest is None:
+            abort(502)
+        response = redirect(
+            url_for("image_thumbnail", digest=digest, width=width, ext=self.thumbnail_format(digest))
+        )
+        response.cache_control.public = True
+        response.cache_control.max_age = 60 * 60 * 24
+        return response
+
+    def thumbnail_view(self, digest: str, width: int, ext: str):
+        if (
+            not _DIGEST_RE.match(digest)
+            or width not in self.app.config["IMAGE_PROXY_WIDTHS"]
+            or ext != self.thumbnail_format(digest)
+        ):
+            abort(404)
+        original = self._original_path(digest)
+        if original is None:
+            abort(404)
+
+        path = original
+        if not original.endswith(".svg") and Image is not None:
+            path = os.path.join(self.root, "thumbs", digest[:2], f"{digest}-{width}.{ext}")
+            if not os.path.exists(path) and not self._make_thumbnail(original, path, width, ext):
+                path = original
+                ext = original.rsplit(".", 1)[1]
+
+        response = send_file(path, mimetype=MIMETYPES[ext], max_age=ONE_YEAR, conditional=True)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        if ext == "svg":
+            response.headers["Content-Security-Policy"] = "sandbox; default-src 'none'; style-src 'unsafe-inline'"
+        return response
+
+    def _make_thumbnail(self, original: str, path: str, width: int, ext: str) -> bool:
+        """Write the thumbnail; 415 when the original cannot be decoded.
+
+        False when the store is full, in which case the original is served.
+        """
+        try:
+            with Image.open(original) as image:
+                image.thumbnail((width, width))
+                if ext == "webp":
+                    out = io.BytesIO()
+                    image.save(out, "WEBP", quality=80, method=6)
+                else:
+                    if image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                        image = image.convert("RGBA")
+                    out = io.BytesIO()
+                    image.save(out, "PNG", optimize=True)
+        except (Image.UnidentifiedImageError, OSError, ValueError):
+            abort(415)
+        data = out.getvalue()
+        if not self._reserve(len(data)):
+            return False
+        _write_atomic(path, data)
+        return True
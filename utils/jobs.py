@@ -0,0 +1,226 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# A job reports progress with report(done, total, partial_result)
+Report = Callable[[int, int, Any], None]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_kind_key ON jobs (kind, key, created);
+"""
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    """Background jobs whose state is kept in a SQLite table.
+
+    A job is a registered function run on a worker thread with a JSON
+    payload. Its status, progress and (partial) result are written to the
+    table, so any worker process can answer for it and finished results
+    survive restarts. Submitting the same ``(kind, key)`` again returns the
+    pending job, or the finished one while it is younger than ``ttl``.
+    Jobs that were queued, or running on a process that went away, are
+    picked up again by ``resume``, which the first ``submit`` of a process
+    runs; after that ``submit`` queues a pending job again when it has
+    made no progress for ``stale`` seconds. Finished jobs older than
+    ``ttl`` are deleted by ``submit``, at most once every ``stale`` seconds.
+    """
+
+    def __init__(self, path: str, workers: int = 4, ttl: float = 60 * 60 * 24, stale: float = 5 * 60):
+        self.path = path
+        self.ttl = ttl
+        self.stale = stale
+        self._tasks: dict[str, Callable[[dict, Report], Any]] = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="jobs")
+        self._schema_lock = threading.Lock()
+        self._ready = False
+        self._resumed = False
+        self._pruned = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        if not self._ready:
+            with self._schema_lock:
+                if not self._ready:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._ready = True
+        return conn
+
+    def task(self, kind: str):
+        """Register the decorated ``func(payload, report)`` for jobs of ``kind``."""
+
+        def register(func):
+            self._tasks[kind] = func
+            return func
+
+        return register
+
+    @staticmethod
+    def _job(row: sqlite3.Row | None) -> dict[str, Any] | None:
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "key": row["key"],
+            "status": row["status"],
+            "done": row["done"],
+            "total": row["total"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created": row["created"],
+            "updated": row["updated"],
+        }
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        conn = self._connect()
+        try:
+            return self._job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+        finally:
+            conn.close()
+
+    def submit(self, kind: str, key: str, payload: dict) -> dict[str, Any]:
+        """The current job for ``(kind, key)``, queued with ``payload`` if there is none."""
+        if kind not in self._tasks:
+            raise KeyError(f"no task registered for {kind!r}")
+        if not self._resumed:
+            self._resumed = True
+            self.resume()
+        now = time.time()
+        if self._pruned + self.stale < now:
+            self._pruned = now
+            self.prune(self.ttl)
+        conn = self._connect()
+        try:
+            with conn:
+                # Take the write lock before the lookup, so two processes
+                # cannot both insert a job for the same key.
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE kind = ? AND key = ? ORDER BY created DESC LIMIT 1",
+                    (kind, key),
+                ).fetchone()
+                pending = row is not None and row["status"] in (QUEUED, RUNNING)
+                if pending and row["updated"] + self.stale < now:
+                    # left behind by a worker process that went away
+                    job_id = row["id"]
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, updated = ? WHERE id = ?", (QUEUED, now, job_id)
+                    )
+                elif pending or (
+                    row is not None and row["status"] == DONE and row["updated"] + self.ttl > now
+                ):
+                    return self._job(row)
+                else:
+                    job_id = uuid.uuid4().hex
+                    conn.execute(
+                        "INSERT INTO jobs (id, kind, key, status, payload, created, updated)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (job_id, kind, key, QUEUED, json.dumps(payload), now, now),
+                    )
+                job = self._job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+        finally:
+            conn.close()
+        self._pool.submit(self._run, job_id)
+        return job
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updated"] = time.time()
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+        finally:
+            conn.close()
+
+    def _claim(self, job_id: str) -> sqlite3.Row | None:
+        """Mark a queued job running; None when another worker already has it."""
+        conn = self._connect()
+        try:
+            with conn:
+                claimed = conn.execute(
+                    "UPDATE jobs SET status = ?, updated = ? WHERE id = ? AND status = ?",
+                    (RUNNING, time.time(), job_id, QUEUED),
+                ).rowcount
+                if not claimed:
+                    return None
+                return conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+
+    def _run(self, job_id: str) -> None:
+        row = self._claim(job_id)
+        if row is None:
+            return
+        task = self._tasks.get(row["kind"])
+        if task is None:
+            self._update(job_id, status=FAILED, error=f"no task registered for {row['kind']!r}")
+            return
+
+        def report(done: int, total: int, partial: Any = None) -> None:
+            fields = {"done": done, "total": total}
+            if partial is not None:
+                fields["result"] = partial
+            self._update(job_id, **fields)
+
+        try:
+            result = task(json.loads(row["payload"]), report)
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e))
+            return
+        self._update(job_id, status=DONE, result=result)
+
+    def resume(self) -> int:
+        """Queue jobs left queued, or running without progress for ``stale`` seconds."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ? WHERE status = ? AND updated < ?",
+                    (QUEUED, RUNNING, now - self.stale),
+                )
+                job_ids = [row["id"] for row in conn.execute("SELECT id FROM jobs WHERE status = ?", (QUEUED,))]
+        finally:
+            conn.close()
+        for job_id in job_ids:
+            self._pool.submit(self._run, job_id)
+        return len(job_ids)
+
+    def prune(self, older_than: float) -> int:
+        """Delete finished jobs last updated more than ``older_than`` seconds ago."""
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND updated < ?",
+                    (DONE, FAILED, time.time() - older_than),
+                ).rowcount
+        finally:
+            conn.close()